@@ -0,0 +1,262 @@
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from main import parseDFA, ProductConstruction, minimizeDFA, atLeast, checkOperation, resultCache, BINARY_EXTENSION
+
+"""
+Runs many product and minimization jobs listed in a manifest, in parallel.
+
+A JSON manifest is a list of jobs, or an object with a "jobs" list:
+
+    [
+        {"operands": ["dfa/dfa1.json", "dfa/dfa2.json"], "operation": "union",
+         "output": "out/dfa1_union_dfa2.json", "testStrings": ["0101", "11"]},
+        {"operands": ["dfa/dfa1.json", "dfa/dfa3.json", "dfa/dfa4.json"], "operation": "atleast",
+         "atLeast": 2, "output": "out/two_of_three.dfab"}
+    ]
+
+A CSV manifest has a header row with the same column names. Operands and
+test strings are separated by ';' within their cell.
+
+To run: python batch.py --manifest jobs.json
+"""
+
+# Operands loaded by this worker process, by path
+_operands = {}
+
+
+def readManifest(path):
+    """
+    Returns the jobs listed in a JSON or CSV manifest.
+
+    Args:
+        path (str): Path of the manifest. Files ending in '.csv' are read as CSV.
+
+    Returns:
+        list: One dict per job with 'operands', 'operation', 'atLeast',
+            'output', 'testStrings' and 'fullProduct'.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File {path} does not exist")
+
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            entries = []
+            for row in csv.DictReader(f):
+                entry = dict(row)
+                entry["operands"] = [p for p in (row.get("operands") or "").split(";") if p]
+                entry["testStrings"] = (row.get("testStrings") or "").split(";") if row.get("testStrings") else []
+                entry["fullProduct"] = (row.get("fullProduct") or "").lower() in ("1", "true", "yes")
+                atLeastText = (row.get("atLeast") or "").strip()
+                entry["atLeast"] = int(atLeastText) if atLeastText.isdecimal() else atLeastText or None
+                entries.append(entry)
+        else:
+            try:
+                entries = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}")
+            if isinstance(entries, dict):
+                entries = entries.get("jobs")
+            if not isinstance(entries, list):
+                raise ValueError(f"Expected a list of jobs in {path}")
+
+    jobs = []
+    errors = []
+    for i, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            errors.append(f"Job {i} must be an object")
+            continue
+        operands = entry.get("operands")
+        operation = entry.get("operation")
+        if not isinstance(operands, list) or not operands or not all(isinstance(p, str) for p in operands):
+            errors.append(f"Job {i} must list the paths of its operands")
+            continue
+        m = entry.get("atLeast")
+        fullProduct = entry.get("fullProduct", False)
+        if operation is None:
+            errors.append(f"Job {i} needs an operation")
+        else:
+            errors.extend(f"Job {i} {problem}" for problem in checkOperation(operation, len(operands), m, fullProduct))
+        testStrings = entry.get("testStrings") or []
+        if not isinstance(testStrings, list) or not all(isinstance(s, str) for s in testStrings):
+            errors.append(f"Test strings of job {i} must be a list of strings")
+        jobs.append({
+            "operands": operands,
+            "operation": operation,
+            "atLeast": 1 if m is None else m,
+            "output": entry.get("output") or None,
+            "testStrings": testStrings,
+            "fullProduct": fullProduct is True,
+        })
+
+    if errors:
+        raise ValueError(f"{len(errors)} errors in {path}:\n" + "\n".join(errors[:100]))
+    return jobs
+
+
+def _initWorker(cacheDirectory):
+    resultCache.enabled = cacheDirectory is not None
+    resultCache.directory = cacheDirectory
+
+
+def _convertOperand(path, binaryPath):
+    """
+    Parses an operand once and stores it as a binary file for the workers.
+
+    Args:
+        path (str): Path of the operand.
+        binaryPath (str): Path of the binary file to write.
+
+    """
+    parseDFA(path).saveBinary(binaryPath)
+
+
+def _loadOperand(path):
+    dfa = _operands.get(path)
+    if dfa is None:
+        dfa = _operands[path] = parseDFA(path)
+    return dfa
+
+
+def runJob(job):
+    """
+    Builds, minimizes, saves and tests the DFA of one job.
+
+    The output format follows the extension of the output path: '.jsonl'
+    for line-delimited JSON, '.dfab' for binary and JSON otherwise.
+
+    Args:
+        job (dict): A job from readManifest.
+
+    Returns:
+        dict: The number of states of the result, its output path and
+            whether each test string is accepted.
+    """
+    start = time.perf_counter()
+    operands = [_loadOperand(path) for path in job["operands"]]
+    operation = atLeast(job["atLeast"]) if job["operation"] == "atleast" else job["operation"]
+    resultDFA = minimizeDFA(ProductConstruction(*operands, operation=operation, full=job["fullProduct"]))
+
+    output = job["output"]
+    if output:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if output.endswith(BINARY_EXTENSION):
+            resultDFA.saveBinary(output)
+        elif output.endswith(".jsonl"):
+            resultDFA.saveJsonLines(output)
+        else:
+            resultDFA.saveJson(output)
+
+    return {
+        "output": output,
+        "states": resultDFA.compile().numStates,
+        "accepted": [bool(flag) for flag in resultDFA.acceptMany(job["testStrings"])] if job["testStrings"] else [],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def runBatch(jobs, workers=None, cacheDirectory=None):
+    """
+    Runs jobs in a pool of processes and yields their results as they finish.
+
+    Every distinct operand is parsed once, in the pool, and stored as a
+    binary file that the workers memory-map, so no operand is parsed or
+    validated twice however many jobs use it.
+
+    Args:
+        jobs (list): Jobs from readManifest.
+        workers (int): Number of processes, by default one per core.
+        cacheDirectory (str): Directory shared by the workers for resultCache,
+            or None to turn the cache off.
+
+    Yields:
+        tuple: (job number, result from runJob or None, error message or None),
+            in order of completion. Job numbers start at 1.
+    """
+    with tempfile.TemporaryDirectory() as scratch, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(cacheDirectory,)) as pool:
+        # Parse every distinct operand once
+        binaryPaths = {}
+        conversions = {}
+        for job in jobs:
+            for path in job["operands"]:
+                key = os.path.realpath(path)
+                if key in binaryPaths or key in conversions:
+                    continue
+                if path.endswith(BINARY_EXTENSION):
+                    binaryPaths[key] = path
+                    continue
+                binaryPath = os.path.join(scratch, f"{len(conversions)}{BINARY_EXTENSION}")
+                conversions[key] = (path, binaryPath, pool.submit(_convertOperand, path, binaryPath))
+
+        operandErrors = {}
+        for key, (path, binaryPath, future) in conversions.items():
+            try:
+                future.result()
+                binaryPaths[key] = binaryPath
+            except Exception as e:
+                operandErrors[key] = f"{path}: {e}"
+
+        futures = {}
+        for number, job in enumerate(jobs, start=1):
+            keys = [os.path.realpath(path) for path in job["operands"]]
+            failed = [operandErrors[key] for key in keys if key in operandErrors]
+            if failed:
+                yield number, None, "; ".join(failed)
+                continue
+            futures[pool.submit(runJob, dict(job, operands=[binaryPaths[key] for key in keys]))] = number
+
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many product constructions from a manifest in parallel")
+    parser.add_argument("--manifest", required=True, help="JSON or CSV file listing the jobs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--results", help="Also write every result as a line of JSON to this file")
+    parser.add_argument("--noCache", action="store_true", help="Do not reuse or store results in dfa/.cache")
+    args = parser.parse_args()
+
+    try:
+        jobs = readManifest(args.manifest)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    cacheDirectory = None if args.noCache else os.path.join("dfa", ".cache")
+    resultsFile = open(args.results, "w") if args.results else None
+    failures = 0
+    done = 0
+    try:
+        for number, result, error in runBatch(jobs, args.workers, cacheDirectory):
+            done += 1
+            if error is not None:
+                failures += 1
+                print(f"[{done}/{len(jobs)}] job {number} failed: {error}", flush=True)
+            else:
+                tests = " ".join(f"{s}:{'accepted' if flag else 'rejected'}" for s, flag in zip(jobs[number - 1]["testStrings"], result["accepted"]))
+                print(f"[{done}/{len(jobs)}] job {number}: {result['states']} states"
+                      f"{' -> ' + result['output'] if result['output'] else ''}{'  ' + tests if tests else ''}", flush=True)
+            if resultsFile is not None:
+                resultsFile.write(json.dumps({"job": number, "error": error, **(result or {})}) + "\n")
+                resultsFile.flush()
+    finally:
+        if resultsFile is not None:
+            resultsFile.close()
+
+    print(f"\n{done - failures} of {len(jobs)} jobs succeeded.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from array import array
+from main import DFA, Node, CompiledDFA, parseDFA, minimizeDFA, ProductConstruction, resultCache, np
+
+"""
+Objectives:
+Measure how each stage of the pipeline scales with the number of states.
+
+Stages:
+    - parse: parseDFA on a JSON file, and on a binary file (parseBinary)
+    - product: ProductConstruction of two DFAs with about sqrt(n) states each,
+      so the result has up to n states
+    - minimize: minimizeDFA on a DFA with n states
+    - accept: isAccepted on every test string, and acceptMany on all of them at once
+    - serialize: DFA.saveJson, and DFA.saveBinary (serializeBinary)
+
+Every measurement is repeated after warmup runs and reported as the median
+and percentiles of the samples. Results can be written as JSON and compared
+against a saved baseline to flag regressions.
+
+To run: python benchmark.py --sizes 100 1000 10000
+"""
+
+STAGES = ["parse", "parseBinary", "product", "minimize", "accept", "acceptMany", "serialize", "serializeBinary"]
+FAMILIES = ["random", "modcounter", "chain"]
+
+
+def generateDFA(family, n, k, acceptDensity=0.3, seed=0, prefix="s"):
+    """
+    Returns a synthetic DFA.
+
+    Args:
+        family (str): 'random' for uniformly random transitions, 'modcounter'
+            for a counter of the symbol values mod n, or 'chain' for a chain
+            that resets to the start on every symbol but the first.
+        n (int): Number of states.
+        k (int): Number of symbols.
+        acceptDensity (float): Fraction of accepting states of 'random'.
+        seed (int): Seed of the random generator.
+        prefix (str): Prefix of the state names.
+
+    Returns:
+        DFA: A DFA object.
+    """
+    if n < 1 or k < 1:
+        raise ValueError("n and k must be positive")
+    rng = random.Random(seed)
+    alphabet = [str(c) for c in range(k)] if k <= 10 else [chr(ord("a") + c) if c < 26 else chr(0x100 + c) for c in range(k)]
+    names = [f"{prefix}{i}" for i in range(n)]
+
+    stateList = {}
+    for i, name in enumerate(names):
+        if family == "random":
+            rules = {symbol: names[rng.randrange(n)] for symbol in alphabet}
+            isAccept = rng.random() < acceptDensity
+        elif family == "modcounter":
+            # Symbol c adds c to the counter; accept when the counter is 0
+            rules = {symbol: names[(i + c) % n] for c, symbol in enumerate(alphabet)}
+            isAccept = i == 0
+        elif family == "chain":
+            # The first symbol moves along the chain, the last state absorbs
+            rules = {symbol: names[0] for symbol in alphabet}
+            rules[alphabet[0]] = names[min(i + 1, n - 1)]
+            if i == n - 1:
+                rules = {symbol: names[i] for symbol in alphabet}
+            isAccept = i == n - 1
+        else:
+            raise ValueError(f"Unknown family '{family}'")
+        stateList[name] = Node(name, isAccept, rules)
+
+    return DFA(alphabet, stateList[names[0]], stateList)
+
+
+def generateStrings(dfa, count, length, seed=0):
+    """
+    Returns random strings over the alphabet of a DFA.
+
+    Args:
+        dfa (DFA): The DFA whose alphabet is used.
+        count (int): Number of strings.
+        length (int): Length of every string.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: The strings.
+    """
+    rng = random.Random(seed)
+    return ["".join(rng.choices(dfa.alphabets, k=length)) for _ in range(count)]
+
+
+def percentile(samples, q):
+    """
+    Returns a percentile of the samples, interpolating between neighbours.
+
+    Args:
+        samples (list): Measured values.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile.
+    """
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(run, repeat, warmup, setup=None):
+    """
+    Times a function over repeated runs after warmup runs.
+
+    Args:
+        run (function): The code to time. It receives the value returned by setup.
+        repeat (int): Number of timed runs.
+        warmup (int): Number of untimed runs before them.
+        setup (function): Untimed code run before every run.
+
+    Returns:
+        dict: Median, p90, p99, min and the samples, in seconds.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        run(argument)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+
+    return {
+        "median": statistics.median(samples),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        "min": min(samples),
+        "samples": samples,
+    }
+
+
+def benchmarkStage(stage, family, n, k, args, workdir):
+    """
+    Measures one stage on synthetic DFAs of one family and size.
+
+    Args:
+        stage (str): One of STAGES.
+        family (str): One of FAMILIES.
+        n (int): Number of states.
+        k (int): Number of symbols.
+        args (argparse.Namespace): Parsed command line options.
+        workdir (str): Directory for temporary files.
+
+    Returns:
+        dict: The measurement, or None if the stage cannot run here.
+    """
+    repeat = args.repeat
+    warmup = args.warmup
+    dfa = generateDFA(family, n, k, args.acceptDensity, seed=args.seed)
+
+    if stage in ("parse", "parseBinary"):
+        path = os.path.join(workdir, f"{family}_{n}_{k}" + (".dfab" if stage == "parseBinary" else ".json"))
+        if stage == "parseBinary":
+            dfa.saveBinary(path)
+        else:
+            dfa.saveJson(path)
+        # The first lookup makes the lazy binary loader touch the table
+        return measure(lambda _: parseDFA(path).isAccepted(""), repeat, warmup)
+
+    if stage == "product":
+        m = max(1, math.isqrt(n))
+        l1 = generateDFA(family, m, k, args.acceptDensity, seed=args.seed, prefix="a")
+        l2 = generateDFA(family, m + 1, k, args.acceptDensity, seed=args.seed + 1, prefix="b")
+        l1.compile()
+        l2.compile()
+        return measure(lambda _: ProductConstruction(l1, l2, "intersection"), repeat, warmup)
+
+    if stage == "minimize":
+        compiled = dfa.compile()
+
+        def freshCopy():
+            # A new table-backed DFA, like a product result, so no run reuses
+            # the analyses and symbol classes cached by an earlier one
+            return DFA.fromCompiled(CompiledDFA(compiled.alphabets, compiled.stateNames, array("i", compiled.table),
+                                                bytearray(iter(compiled.accept)), compiled.start, compiled.ranges))
+
+        return measure(minimizeDFA, repeat, warmup, setup=freshCopy)
+
+    if stage in ("accept", "acceptMany"):
+        strings = generateStrings(dfa, args.strings, args.length, seed=args.seed)
+        dfa.compile()
+        if stage == "acceptMany":
+            if np is None:
+                return None
+            return measure(lambda _: dfa.acceptMany(strings), repeat, warmup)
+        return measure(lambda _: [dfa.isAccepted(s) for s in strings], repeat, warmup)
+
+    if stage in ("serialize", "serializeBinary"):
+        path = os.path.join(workdir, "out" + (".dfab" if stage == "serializeBinary" else ".json"))
+        # Serialize a table-backed DFA, which is what pipeline results are
+        result = minimizeDFA(dfa)
+        result.compile().stateNames[0]
+        save = result.saveBinary if stage == "serializeBinary" else result.saveJson
+        return measure(lambda _: save(path), repeat, warmup)
+
+    raise ValueError(f"Unknown stage '{stage}'")
+
+
+def compareToBaseline(results, baseline, threshold):
+    """
+    Returns the measurements that got slower than in a baseline.
+
+    Args:
+        results (list): Measurements of this run.
+        baseline (list): Measurements of the baseline run.
+        threshold (float): Allowed relative slowdown of the median, e.g. 0.25.
+
+    Returns:
+        list: (result, baseline median, ratio) of every regression.
+    """
+    def key(entry):
+        return (entry["stage"], entry["family"], entry["states"], entry["symbols"])
+
+    previous = {key(entry): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        old = previous.get(key(entry))
+        if old is None or old["median"] <= 0:
+            continue
+        ratio = entry["median"] / old["median"]
+        if ratio > 1 + threshold:
+            regressions.append((entry, old["median"], ratio))
+    return regressions
+
+
+def formatSeconds(seconds):
+    """
+    Returns a duration with a readable unit.
+
+    Args:
+        seconds (float): Duration in seconds.
+
+    Returns:
+        str: The duration in s, ms or microseconds.
+    """
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the DFA pipeline")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000], help="Numbers of states to sweep")
+    parser.add_argument("--symbols", type=int, default=2, help="Number of input symbols")
+    parser.add_argument("--families", nargs="+", choices=FAMILIES, default=FAMILIES, help="DFA families to generate")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to measure")
+    parser.add_argument("--acceptDensity", type=float, default=0.3, help="Fraction of accepting states of random DFAs")
+    parser.add_argument("--strings", type=int, default=1000, help="Number of test strings for the accept stages")
+    parser.add_argument("--length", type=int, default=1000, help="Length of every test string")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--warmup", type=int, default=1, help="Number of untimed runs before them")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the DFA generator")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown of the median flagged as a regression")
+    args = parser.parse_args()
+
+    # Repeated runs would otherwise only measure cache hits
+    resultCache.enabled = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for stage in args.stages:
+            for family in args.families:
+                for n in args.sizes:
+                    measurement = benchmarkStage(stage, family, n, args.symbols, args, workdir)
+                    if measurement is None:
+                        print(f"{stage:16} {family:11} n={n:<9} skipped (NumPy is not installed)")
+                        continue
+                    entry = {"stage": stage, "family": family, "states": n, "symbols": args.symbols, **measurement}
+                    results.append(entry)
+                    print(f"{stage:16} {family:11} n={n:<9} median {formatSeconds(entry['median']):>12}"
+                          f"  p90 {formatSeconds(entry['p90']):>12}  p99 {formatSeconds(entry['p99']):>12}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__ if np is not None else None,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "strings": args.strings,
+            "length": args.length,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = compareToBaseline(results, baseline, args.threshold)
+        if not regressions:
+            print(f"\nNo regressions against {args.baseline}.")
+            return 0
+        print(f"\n{len(regressions)} regressions against {args.baseline}:")
+        for entry, oldMedian, ratio in regressions:
+            print(f"{entry['stage']:16} {entry['family']:11} n={entry['states']:<9} "
+                  f"{formatSeconds(oldMedian)} -> {formatSeconds(entry['median'])} ({ratio:.2f}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
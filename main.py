@@ -1,16 +1,138 @@
 import argparse
+import bisect
+import codecs
+import contextlib
+import hashlib
 import json
+import mmap
 import os
 import itertools
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from array import array
 from collections import deque
 from collections import defaultdict
-from graphviz import Digraph
+from collections import OrderedDict
+from collections.abc import MutableMapping
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Binary DFA files, see DFA.saveBinary
+BINARY_EXTENSION = ".dfab"
+_BINARY_MAGIC = b"DFAB"
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sIQQQ" + "QQ" * 5)
+
+
+class _Version:
+    """
+    Counts the edits made in place to the Nodes and stateList of one DFA.
+    """
+
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+def _notify(owners):
+    for version in owners:
+        version.count += 1
+
+def _adopt(node, owners):
+    """
+    Makes a Node tell the DFAs with the given versions about its edits.
+
+    Nodes of one DFA share its tuple of versions, so a Node costs nothing
+    more until it is put into a second DFA.
+    """
+    held = node._owners
+    if not held:
+        object.__setattr__(node, "_owners", owners)
+    elif held is not owners:
+        missing = tuple(version for version in owners if version not in held)
+        if missing:
+            object.__setattr__(node, "_owners", held + missing)
+
+class _WatchedDict(dict):
+    """
+    A dict that tells its owners about its changes.
+
+    The rules of a Node tell the DFAs holding the Node; the stateList of a
+    DFA tells the DFAs it belongs to, and makes the Nodes put into it
+    tell them too.
+    """
+
+    __slots__ = ("_node", "_owners")
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._node = None
+        self._owners = ()
+
+    def _changed(self):
+        _notify(self._node._owners if self._node is not None else self._owners)
+
+    def _adoptAll(self):
+        if self._node is None:
+            for value in self.values():
+                if isinstance(value, Node):
+                    _adopt(value, self._owners)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if self._node is None and isinstance(value, Node):
+            _adopt(value, self._owners)
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def __ior__(self, other):
+        dict.update(self, other)
+        self._adoptAll()
+        self._changed()
+        return self
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._adoptAll()
+        self._changed()
+
+    def pop(self, *args):
+        self._changed()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._changed()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        value = dict.setdefault(self, key, default)
+        if self._node is None and isinstance(value, Node):
+            _adopt(value, self._owners)
+        self._changed()
+        return value
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
 
 class Node:
     """
     A Node class.
 
+    Nodes have no __dict__, so a DFA with many of them stays small. Changes
+    made to a Node or its rules are seen by the DFAs holding it, which
+    rebuild their transition tables on next use; other DFAs keep theirs.
+
     Attributes:
         name (str): State name.
         acceptState (bool): True if yes, False if no.
@@ -18,6 +140,8 @@ class Node:
 
     """
 
+    __slots__ = ("name", "acceptState", "rules", "_owners")
+
     def __init__(self, name:str, acceptState:bool, rules:dict):
         """
         Initializes the Node class.
@@ -35,9 +159,25 @@ class Node:
         if not isinstance(rules, dict):
             raise TypeError("Expected a dictionary")
 
-        self.name = name
-        self.acceptState = acceptState 
-        self.rules = rules 
+        object.__setattr__(self, "_owners", ())
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "acceptState", acceptState)
+        object.__setattr__(self, "rules", self._watched(rules))
+
+    def _watched(self, rules):
+        # A dict of rules belongs to one Node, which it tells about its changes
+        if not isinstance(rules, _WatchedDict) or rules._node is not None or rules._owners:
+            rules = _WatchedDict(rules)
+        rules._node = self
+        return rules
+
+    def __setattr__(self, attribute, value):
+        if attribute == "rules":
+            if not isinstance(value, dict):
+                raise TypeError("Expected a dictionary")
+            value = self._watched(value)
+        object.__setattr__(self, attribute, value)
+        _notify(getattr(self, "_owners", ()))
 
     def getNextNode(self, c):
         """
@@ -46,74 +186,579 @@ class Node:
             c (str) : Input symbol.
         """
         return self.rules[c]
-    
-class DFA:
+
+    def setTransition(self, c, nextState):
+        """
+        Sets the next state on an input symbol.
+
+        DFA.setTransition also keeps the minimal DFA of DFA.minimized up to
+        date without minimizing again.
+
+        Args:
+            c (str) : Input symbol.
+            nextState (str) : Name of the next state.
+        """
+        if not isinstance(nextState, str):
+            raise TypeError("Expected a string")
+        self.rules[c] = nextState
+
+    def setAccepting(self, acceptState):
+        """
+        Sets whether the state is accepting.
+
+        DFA.setAccepting also keeps the minimal DFA of DFA.minimized up to
+        date without minimizing again.
+
+        Args:
+            acceptState (bool) : True if accepting.
+        """
+        if not isinstance(acceptState, bool):
+            raise TypeError("Expected a boolean")
+        self.acceptState = acceptState
+
+
+class _ColumnMap(dict):
     """
-    A DFA Class.
+    A str.translate table mapping symbol code points to column characters.
+
+    Code points that are not in the alphabet map to None, so str.translate
+    drops them and the length of the result shows whether the whole input
+    was inside the alphabet.
+    """
+
+    def __missing__(self, key):
+        return None
+
+
+class _RangeColumnMap(dict):
+    """
+    A str.translate table for an alphabet of character ranges.
+
+    The column of a code point is found by binary search over the starts of
+    the ranges the first time it is seen and then kept, so text with few
+    distinct characters is translated with plain dict lookups.
+    """
+
+    def __init__(self, ranges):
+        """
+        Initializes the _RangeColumnMap class.
+
+        Args:
+            ranges (list): Sorted (first, last) code point pairs of every column.
+
+        """
+        super().__init__()
+        spans = sorted((first, last, column) for column, pairs in enumerate(ranges) for first, last in pairs)
+        self._starts = [first for first, _, _ in spans]
+        self._spans = spans
+
+    def __missing__(self, key):
+        i = bisect.bisect_right(self._starts, key) - 1
+        column = None
+        if i >= 0 and key <= self._spans[i][1]:
+            column = chr(self._spans[i][2])
+        self[key] = column
+        return column
+
+
+class _LazyNames:
+    """
+    A sequence of state names that are only built when first read.
+
+    Engines number states with ints and keep just enough to describe each
+    state (e.g. the tuple of operand states of a product state). The name
+    strings are made on first access, which in practice means when the DFA
+    is serialized, visualized or its Node objects are needed.
+
+    Names that turn out equal are made unique by appending '#' and the state
+    number, so a name always identifies one state.
+    """
+
+    def __init__(self, count, makeName):
+        """
+        Initializes the _LazyNames class.
+
+        Args:
+            count (int): Number of states.
+            makeName (function): Returns the name of a state number.
+
+        """
+        self._count = count
+        self._makeName = makeName
+        self._names = None
+
+    def resolve(self):
+        """
+        Returns the list of names, building it on first use.
+
+        Returns:
+            list: Name of every state number.
+
+        """
+        if self._names is None:
+            names = [self._makeName(i) for i in range(self._count)]
+            seen = set()
+            for i, name in enumerate(names):
+                if name in seen:
+                    names[i] = f"{name}#{i}"
+                seen.add(names[i])
+            self._names = names
+            # The name sources (operand tables, blocks) are no longer needed
+            self._makeName = None
+        return self._names
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return self.resolve()[i]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+
+def _sizeOf(value, seen):
+    """
+    Returns the bytes held by a value and the objects it refers to.
+
+    Objects already in seen are not counted again. The buffer of a
+    memoryview, e.g. of a memory-mapped file, is not counted.
+
+    Args:
+        value: Any value.
+        seen (set): Ids of the objects counted so far, updated.
+
+    Returns:
+        int: Size in bytes.
+    """
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeOf(key, seen) + _sizeOf(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(_sizeOf(item, seen) for item in value)
+    elif isinstance(value, Node):
+        size += _sizeOf(value.name, seen) + _sizeOf(value.rules, seen)
+    return size
+
+# bytes.translate table that swaps the flags 0 and 1
+_NOT = bytes([1, 0]) + bytes(254)
+
+class _StateList(MutableMapping):
+    """
+    The stateList of a DFA backed by a transition table.
+
+    A Node is only built when its name is looked up, and then kept, so
+    edits made to it in place are seen by CompiledDFA.fromDFA. Iterating
+    the names builds no Nodes. States can be added and removed as in a
+    dict.
+    """
+
+    def __init__(self, compiled, owners=()):
+        """
+        Initializes the _StateList class.
+
+        Args:
+            compiled (CompiledDFA): The table the Nodes are built from.
+            owners (tuple): Versions of the DFAs told about edits.
+
+        """
+        self.compiled = compiled
+        self.owners = owners
+        self.nodes = {}
+        # Table states that were deleted, and states that were added, in order
+        self.removed = set()
+        self.added = {}
+
+    def __getitem__(self, name):
+        node = self.nodes.get(name)
+        if node is not None:
+            return node
+        compiled = self.compiled
+        s = compiled.stateIndex.get(name) if name not in self.removed else None
+        if s is None:
+            raise KeyError(name)
+        names = compiled.stateNames
+        k = compiled.numSymbols
+        table = compiled.table
+        rules = _WatchedDict({symbol: names[table[s * k + c]] for c, symbol in enumerate(compiled.alphabets)})
+        node = self.nodes[name] = Node(name, compiled.accept[s] == 1, rules)
+        object.__setattr__(node, "_owners", self.owners)
+        return node
+
+    def __setitem__(self, name, node):
+        if name not in self:
+            self.added[name] = None
+        self.nodes[name] = node
+        if isinstance(node, Node):
+            _adopt(node, self.owners)
+        _notify(self.owners)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self.nodes.pop(name, None)
+        if name in self.added:
+            del self.added[name]
+        else:
+            self.removed.add(name)
+        _notify(self.owners)
+
+    def __contains__(self, name):
+        return name in self.added or (name not in self.removed and name in self.compiled.stateIndex)
+
+    def __iter__(self):
+        removed = self.removed
+        for name in self.compiled.stateNames:
+            if name not in removed:
+                yield name
+        yield from list(self.added)
+
+    def __len__(self):
+        return self.compiled.numStates - len(self.removed) + len(self.added)
+
+class CompiledDFA:
+    """
+    A dense, integer-indexed form of a DFA.
+
+    States and input symbols are renumbered to small ints so a run is a
+    sequence of list lookups instead of dict lookups keyed by strings.
 
     Attributes:
-        alphabets (list): List of input symbols accepted by the language.
-        start (Node): Start state of the DFA.
-        stateList (dict): key-value pairs of state name and Node object.
+        alphabets (list): Input symbols, column i of the table belongs to alphabets[i].
+        symbolIndex (dict): Key-value pairs of input symbol and column number.
+        stateNames (list): Name of every state number, possibly built lazily.
+        stateIndex (dict): Key-value pairs of state name and state number, built on first use.
+        numStates (int): Number of states.
+        numSymbols (int): Number of input symbols.
+        table (Sequence): Row-major transition table, the next state of state s on
+            column c is table[s * numSymbols + c]. An array of C ints, or a
+            memoryview of one, takes 4 bytes per transition.
+        accept (Sequence): Accept bitmap, accept[s] is 1 if state s is
+            accepting; a bytearray takes 1 byte per state.
+        start (int): Number of the start state.
+        ranges (list): For an alphabet of character ranges, the sorted,
+            disjoint (first, last) code point pairs read by every column; None
+            if every symbol stands for itself.
     """
 
-    def __init__(self, alphabets:list, startState:Node, stateList:dict):
+    def __init__(self, alphabets:list, stateNames:list, table:list, accept:list, start:int, ranges=None):
         """
-        Initializes the DFA class.
+        Initializes the CompiledDFA class.
 
         Args:
             alphabets (list): Alphabet symbols of the language.
-            startState (Node): Start state of the DFA.
-            stateList (dict): key-value pairs of name of the state and the respective Node object. 
+            stateNames (list): Name of every state number, or a _LazyNames.
+            table (Sequence): Row-major transition table of state numbers.
+            accept (Sequence): Accept flag of every state number.
+            start (int): Number of the start state.
+            ranges (list): Code point ranges of every column, or None.
+
+        """
+        self.alphabets = alphabets
+        self.symbolIndex = {symbol: i for i, symbol in enumerate(alphabets)}
+        self.stateNames = stateNames
+        self._stateIndex = None
+        self.numStates = len(stateNames)
+        self.numSymbols = len(alphabets)
+        self.table = table
+        self.accept = accept
+        self.start = start
+        self.ranges = ranges
+
+        # Single character symbols can be translated to columns in one str.translate call
+        if ranges is not None:
+            self._columnMap = _RangeColumnMap(ranges)
+            return
+        self._columnMap = _ColumnMap()
+        for symbol, column in self.symbolIndex.items():
+            if isinstance(symbol, str) and len(symbol) == 1:
+                self._columnMap[ord(symbol)] = chr(column)
+
+    @property
+    def stateIndex(self):
+        if self._stateIndex is None:
+            self._stateIndex = {name: i for i, name in enumerate(self.stateNames)}
+        return self._stateIndex
+
+    def symbolClasses(self):
+        """
+        Returns the classes of symbols that every state treats alike.
+
+        Two columns are in one class when every state moves to the same state
+        on both, so a run or a partition refinement only needs to look at one
+        column of every class. Alphabets of 50 to 100 symbols often fall into
+        a handful of classes. The classes are computed on first use and cached.
 
         Returns:
-            DFA: A DFA object.
+            tuple: The class number of every column, and the first column of
+            every class.
 
         """
-                
-        if not isinstance(stateList, dict):
-            raise TypeError("Expected a dict")
-        if not isinstance(startState, Node):
-            raise TypeError("Expected a Node object")
-        if not isinstance(alphabets, list):
-            raise TypeError("Expected a list") 
-               
-        self.alphabets = alphabets
-        self.stateList = stateList
-        self.start = startState
+        if getattr(self, "_symbolClasses", None) is None:
+            k = self.numSymbols
+            classes = {}
+            classOf = []
+            firstColumns = []
+            for c in range(k):
+                column = array("i", self.table[c::k]).tobytes()
+                number = classes.get(column)
+                if number is None:
+                    number = classes[column] = len(firstColumns)
+                    firstColumns.append(c)
+                classOf.append(number)
+            self._symbolClasses = (classOf, firstColumns)
+        return self._symbolClasses
 
-    def inAlphabet(self, anInput):
+    def compressed(self):
         """
-        Checks whether input symbols is part of accepted input symbols.
+        Returns a CompiledDFA with one column for every symbol class.
+
+        Its symbols are the first symbol of every class. It accepts the
+        strings of the first symbols and has the same states, so a partition
+        of its states is one of this DFA too.
+
+        Returns:
+            CompiledDFA: The narrower DFA, or this DFA if no two columns are alike.
+
+        """
+        classOf, firstColumns = self.symbolClasses()
+        if len(firstColumns) == self.numSymbols:
+            return self
+        k = self.numSymbols
+        table = array("i", (self.table[s * k + c] for s in range(self.numStates) for c in firstColumns))
+        return CompiledDFA([self.alphabets[c] for c in firstColumns], self.stateNames, table, self.accept, self.start)
+
+    @classmethod
+    def fromDFA(cls, dfa):
+        """
+        Compiles a DFA into its integer transition table.
 
         Args:
-            anInput(str) : input. 
+            dfa (DFA): The DFA to compile.
 
         Returns:
-            bool: True if the input symbol is part of the language and False if it is not.
+            CompiledDFA: The compiled form of the DFA.
 
         """
-        for ch in anInput:
-            if ch not in self.alphabets:
-                return False
-    
-    def getNode(self, name):
+        stateList = dfa.stateList
+        if isinstance(stateList, _StateList) and not stateList.removed and not stateList.added \
+                and list(dfa.alphabets) == stateList.compiled.alphabets:
+            return cls._fromStateList(stateList, dfa.start.name, dfa.ranges)
+
+        stateNames = list(dfa.stateList.keys())
+        stateIndex = {name: i for i, name in enumerate(stateNames)}
+        alphabets = list(dfa.alphabets)
+
+        table = array("i")
+        accept = bytearray()
+        for name in stateNames:
+            node = dfa.stateList[name]
+            for symbol in alphabets:
+                if symbol not in node.rules:
+                    raise ValueError(f"No transition for symbol '{symbol}' in state {name}")
+                nextState = node.rules[symbol]
+                if nextState not in stateIndex:
+                    raise ValueError(f"Transition for {name} on '{symbol}' points to invalid state {nextState}")
+                table.append(stateIndex[nextState])
+            accept.append(1 if node.acceptState else 0)
+
+        if dfa.start.name not in stateIndex:
+            raise ValueError("Start state must be a defined state")
+        return cls(alphabets, stateNames, table, accept, stateIndex[dfa.start.name], dfa.ranges)
+
+    @classmethod
+    def _fromStateList(cls, stateList, startName, ranges):
         """
-        Returns the object for the state of the given name.
+        Compiles a DFA whose stateList is a view of a table.
+
+        Only the rows of the Nodes that were built, and may have been edited
+        in place, are read from Nodes; the others are copied from the table.
 
         Args:
-            name(str) : name of symbol. 
+            stateList (_StateList): The stateList of the DFA.
+            startName (str): Name of the start state.
+            ranges (list): Code point ranges of every symbol, or None.
 
         Returns:
-            Node: Returns a Node object.
+            CompiledDFA: The compiled form of the DFA.
 
         """
+        base = stateList.compiled
+        stateIndex = base.stateIndex
+        alphabets = base.alphabets
+        k = base.numSymbols
+        table = array("i", base.table)
+        accept = bytearray(iter(base.accept))
+        for name, node in stateList.nodes.items():
+            s = stateIndex[name]
+            for c, symbol in enumerate(alphabets):
+                if symbol not in node.rules:
+                    raise ValueError(f"No transition for symbol '{symbol}' in state {name}")
+                nextState = node.rules[symbol]
+                if nextState not in stateIndex:
+                    raise ValueError(f"Transition for {name} on '{symbol}' points to invalid state {nextState}")
+                table[s * k + c] = stateIndex[nextState]
+            accept[s] = 1 if node.acceptState else 0
 
-        return self.stateList[name]
-    
-    def isAccepted(self, anInput):
+        if startName not in stateIndex:
+            raise ValueError("Start state must be a defined state")
+        compiled = cls(alphabets, base.stateNames, table, accept, stateIndex[startName], ranges)
+        compiled._stateIndex = stateIndex
+        return compiled
+
+    def encode(self, anInput):
         """
-        Returns whether the input is accepted by the DFA.
+        Translates an input into the sequence of its column numbers.
+
+        With character ranges, every character of a string is read as the
+        range it falls in, while other iterables hold the names of the ranges.
+
+        Args:
+            anInput (str): Input string, or any iterable of input symbols.
+
+        Returns:
+            Sequence: Column numbers of the input, or None if a symbol is not in the alphabet.
+
+        """
+        if isinstance(anInput, str):
+            columns = anInput.translate(self._columnMap)
+            if len(columns) != len(anInput):
+                return None
+            if self.numSymbols <= 256:
+                return columns.encode("latin-1")
+            return [ord(c) for c in columns]
+
+        columns = []
+        for symbol in anInput:
+            column = self.symbolIndex.get(symbol)
+            if column is None:
+                return None
+            columns.append(column)
+        return columns
+
+    def run(self, columns, state=None):
+        """
+        Returns the state reached after reading a sequence of columns.
+
+        Args:
+            columns (Sequence): Column numbers, as returned by encode.
+            state (int): State number to start from, defaults to the start state.
+
+        Returns:
+            int: The state number reached.
+
+        """
+        table = self.table
+        k = self.numSymbols
+        if state is None:
+            state = self.start
+        for c in columns:
+            state = table[state * k + c]
+        return state
+
+    def stateAnalysis(self):
+        """
+        Returns which states are unreachable, dead or universal.
+
+        A dead state reaches no accepting state, so every run through it is
+        rejected. A universal state reaches only accepting states, so every
+        run through it that stays in the alphabet is accepted. The flags are
+        computed on first use and cached.
+
+        Returns:
+            tuple: Bytearrays with a flag per state number: reachable from
+            the start state, dead and universal.
+
+        """
+        if getattr(self, "_analysis", None) is None:
+            n = self.numStates
+            k = self.numSymbols
+            table = self.table
+            # Predecessors of state t are sources[offsets[t]:offsets[t + 1]]
+            offsets = array("i", [0]) * (n + 1)
+            for t in table:
+                offsets[t + 1] += 1
+            for t in range(n):
+                offsets[t + 1] += offsets[t]
+            fill = offsets[:-1]
+            sources = array("i", [0]) * (n * k)
+            for i, t in enumerate(table):
+                sources[fill[t]] = i // k
+                fill[t] += 1
+            del fill
+
+            reachable = bytearray(n)
+            reachable[self.start] = 1
+            stack = [self.start]
+            while stack:
+                row = stack.pop() * k
+                for t in table[row:row + k]:
+                    if not reachable[t]:
+                        reachable[t] = 1
+                        stack.append(t)
+
+            def cannotReach(targets):
+                # States with no path into targets, by a backward search from them
+                found = targets
+                stack = [s for s in range(n) if found[s]]
+                while stack:
+                    t = stack.pop()
+                    for p in sources[offsets[t]:offsets[t + 1]]:
+                        if not found[p]:
+                            found[p] = 1
+                            stack.append(p)
+                return found.translate(_NOT)
+
+            dead = cannotReach(bytearray(1 if flag == 1 else 0 for flag in self.accept))
+            universal = cannotReach(bytearray(0 if flag == 1 else 1 for flag in self.accept))
+            # Once a run enters one of these states its outcome is known
+            self._sink = bytes(a | b for a, b in zip(dead, universal))
+            self._analysis = (reachable, dead, universal)
+        return self._analysis
+
+    def _runToSink(self, columns, state):
+        """
+        Runs over columns like run, but stops early in a dead or universal state.
+
+        Dead and universal states only lead to states of the same kind, so
+        the state is checked between blocks of columns, which start short
+        and double in length, instead of after every column. The analysis
+        is only computed for an input at least as long as the table, which
+        bounds its cost by that of the run.
+
+        Args:
+            columns (Sequence): Column numbers, as returned by encode.
+            state (int): State number to start from.
+
+        Returns:
+            int: The state reached, or a dead or universal state the run entered.
+
+        """
+        if getattr(self, "_analysis", None) is None:
+            if len(columns) < self.numStates * self.numSymbols:
+                return self.run(columns, state)
+            self.stateAnalysis()
+        sink = self._sink
+        table = self.table
+        k = self.numSymbols
+        begin = 0
+        size = 16
+        while begin < len(columns) and not sink[state]:
+            for c in columns[begin:begin + size]:
+                state = table[state * k + c]
+            begin += size
+            size = min(size * 2, 1 << 16)
+        return state
+
+    def accepts(self, anInput):
+        """
+        Returns whether the input is accepted.
+
+        The run stops as soon as it enters a dead or universal state, see
+        stateAnalysis.
 
         Args:
             anInput (str): Input string.
@@ -122,258 +767,2997 @@ class DFA:
             bool: True if accepted and False if rejected.
 
         """
-        if self.inAlphabet(anInput) == False:
-            return False        
-        currentNode = self.start
-        for ch in anInput:
-            nextNodeName = currentNode.getNextNode(ch)
-            nextNode = self.getNode(nextNodeName)
-            currentNode = nextNode
+        columns = self.encode(anInput)
+        if columns is None:
+            return False
+        return self.accept[self._runToSink(columns, self.start)] == 1
 
-        if currentNode.acceptState == True:
-            return True
-        return False
+    def toNumpy(self):
+        """
+        Returns the transition table and accept bitmap as NumPy arrays.
 
-    def createJson(self, operation):
-        os.makedirs("dfa", exist_ok=True)
+        The arrays are built on first use and cached.
 
-        # Data to write
-        dfa = {
-            "alphabet": self.alphabets,
-            "states": list(self.stateList.keys()),
-            "startState": self.start.name,
-            "acceptStates": [name for name, node in self.stateList.items() if node.acceptState],
-            "transitions":  {
-                name: node.rules for name, node in self.stateList.items()
-            }
-        }
+        Returns:
+            tuple: A (numStates, numSymbols) int32 table and a bool accept vector.
 
-        # File path
-        file_path = os.path.join("dfa", "dfa_" + operation + ".json")
+        """
+        if np is None:
+            raise ImportError("NumPy is required for vectorized evaluation")
+        if getattr(self, "_numpy", None) is None:
+            table = np.asarray(self.table, dtype=np.int32).reshape(self.numStates, self.numSymbols)
+            accept = np.asarray(self.accept, dtype=bool)
 
-        # Write to the JSON file
-        with open(file_path, "w") as f:
-            json.dump(dfa, f, indent=4)
+            # Column of every code point up to the largest symbol, -1 outside the alphabet
+            if self.ranges is not None:
+                lookup = np.full(max((last for pairs in self.ranges for _, last in pairs), default=-1) + 2, -1, dtype=np.int32)
+                for column, pairs in enumerate(self.ranges):
+                    for first, last in pairs:
+                        lookup[first:last + 1] = column
+            else:
+                codePoints = [ord(symbol) for symbol in self.symbolIndex if isinstance(symbol, str) and len(symbol) == 1]
+                lookup = np.full(max(codePoints, default=-1) + 2, -1, dtype=np.int32)
+                for symbol, column in self.symbolIndex.items():
+                    if isinstance(symbol, str) and len(symbol) == 1:
+                        lookup[ord(symbol)] = column
+            # Runs read symbol classes, see symbolClasses, so the table they step through is narrower
+            classOf, firstColumns = self.symbolClasses()
+            classOf = np.asarray(classOf + [-1], dtype=np.int32)
+            # Row offset state * numClasses of every next state, for flat lookups
+            nextOffsets = (table[:, firstColumns].astype(np.int64) * len(firstColumns)).ravel()
+            self._numpy = (table, accept, classOf[lookup], nextOffsets, classOf)
+        return self._numpy[:2]
 
-        print(f"JSON file created at {file_path}")
-        
-def ProductConstruction(l1, l2, operation):
+    def _encodeMany(self, inputs):
         """
-        Returns the DFA object after product construction has been applied.
+        Translates many inputs into one flat array of symbol class numbers.
 
         Args:
-            l1 (DFA) : A DFA for a language.
-            l2 (DFA) : A DFA for a language.
-            operation (str) : 'union' or 'intersection'
-        
+            inputs (list): Input strings, or iterables of input symbols.
+
         Returns:
-            DFA: A DFA object.
+            tuple: The flat class array, the length of every input and a bool
+            array that is False for inputs with a symbol outside the alphabet.
 
         """
-        if operation not in ['union', 'intersection']:
-            raise ValueError("operation must be 'union' or 'intersection'")
-        if not isinstance(l1, DFA) or not isinstance(l2, DFA):
-            raise TypeError("Both l1 and l2 must be instances of the DFA class.")
-        
-        def getNewNodeName(node1,node2):
-            """
-            Returns the concatenation of the two node names.
+        self.toNumpy()
+        lookup = self._numpy[2]
 
-            Args:
-                node1 (Node) : A node.
-                node2 (Node) : A node.
-            
-            Returns:
-                str: New Node name .
+        if all(isinstance(anInput, str) for anInput in inputs):
+            lengths = np.fromiter(map(len, inputs), dtype=np.int64, count=len(inputs))
+            codes = np.frombuffer("".join(inputs).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+            columns = lookup[np.minimum(codes, len(lookup) - 1)]
+            valid = np.ones(len(inputs), dtype=bool)
+            bad = columns < 0
+            if bad.any():
+                valid[np.repeat(np.arange(len(inputs)), lengths)[bad]] = False
+                columns[bad] = 0
+            return columns, lengths, valid
 
-            """
-            return (node1.name + node2.name)
-        
-        def getNewAcceptState(node1, node2, op):
-            """
-            Returns whether the new node is an accepting state or not.
+        encoded = [self.encode(anInput) for anInput in inputs]
+        valid = np.fromiter((columns is not None for columns in encoded), dtype=bool, count=len(inputs))
+        encoded = [columns if columns is not None else () for columns in encoded]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(inputs))
+        columns = np.fromiter(itertools.chain.from_iterable(encoded), dtype=np.int32, count=int(lengths.sum()))
+        return self._numpy[4][columns], lengths, valid
 
-            Args:
-                node1 (Node) : A node.
-                node2 (Node) : A node.
-                op (str) : 'union'(default) or 'intersection'
-            
-            Returns:
-                List: A list of symbols.
+    def acceptsMany(self, inputs):
+        """
+        Returns whether each of many inputs is accepted.
 
-            """
-            if(op == 'union'):
-                if(node1.acceptState or node2.acceptState):
-                    return True
-                return False
-            elif(op == 'intersection'):
-                if(node1.acceptState and node2.acceptState):
-                    return True
-                return False
-            else:
-                raise ValueError("Accepted operations are 'union'(default) or 'intersection'. ")
-            
-        def getNewRules(node1, node2):
-            """
-            Returns the new rules dictionary after product construction.
+        With NumPy all inputs are translated into one flat array of symbol
+        class numbers and run together, longest first. Step j advances every input
+        longer than j with one fancy-indexing lookup into the transition
+        table, so the Python-level work depends on the longest input rather
+        than on the number of inputs. The runs stop early once every input
+        still running is in a dead or universal state. Without NumPy every
+        input is run on its own.
 
-            Args:
-                node1 (Node) : A node.
-                node2 (Node) : A node.
-            
-            Returns:
-                dict: A dictionary mapping each input symbol to the name of the next state.
-            """
+        Args:
+            inputs (iterable): Input strings.
+
+        Returns:
+            Sequence: A NumPy bool array, or a list of bools without NumPy.
+
+        """
+        inputs = list(inputs)
+        if np is None:
+            return [self.accepts(anInput) for anInput in inputs]
+
+        table, accept = self.toNumpy()
+        columns, lengths, valid = self._encodeMany(inputs)
+
+        # Inputs still running at step j form a prefix once sorted by descending length
+        order = np.argsort(-lengths, kind="stable")
+        sortedLengths = lengths[order]
+        offsets = (np.cumsum(lengths) - lengths)[order]
+
+        # Track row offsets state * numClasses, so one step is two flat take calls
+        nextOffsets = self._numpy[3]
+        k = len(nextOffsets) // self.numStates if self.numStates else 0
+        rows = np.full(len(inputs), self.start * k, dtype=np.int64)
+
+        # Inputs in dead or universal states are decided, see stateAnalysis
+        sink = None
+        if getattr(self, "_analysis", None) is not None or len(columns) >= self.numStates * self.numSymbols:
+            self.stateAnalysis()
+            sink = np.frombuffer(self._sink, dtype=np.uint8).astype(bool)
+
+        negLengths = -sortedLengths
+        for j in range(int(sortedLengths[0]) if len(inputs) else 0):
+            active = int(np.searchsorted(negLengths, -j, side="left"))
+            if sink is not None and j % 64 == 0 and sink[rows[:active] // k].all():
+                break
+            current = rows[:active]
+            current += columns.take(offsets[:active] + j)
+            rows[:active] = nextOffsets.take(current)
+        states = rows // k if k else np.full(len(inputs), self.start)
+
+        result = np.zeros(len(inputs), dtype=bool)
+        result[order] = accept[states]
+        return result & valid
+
+
+class DFA:
+    """
+    A DFA Class.
+
+    A DFA is either built from Node objects or, when it comes out of
+    ProductConstruction or minimizeDFA, backed by an integer transition
+    table whose state names are only built on first use. The stateList of
+    such a DFA builds each Node when it is first looked up.
+
+    Attributes:
+        alphabets (list): List of input symbols accepted by the language.
+        start (Node): Start state of the DFA.
+        stateList (MutableMapping): key-value pairs of state name and Node object.
+        ranges (list): For an alphabet of character ranges, the sorted (first,
+            last) code point pairs read by every symbol; otherwise None.
+    """
+
+    def __init__(self, alphabets:list, startState:Node, stateList:dict, ranges=None):
+        """
+        Initializes the DFA class.
+
+        Args:
+            alphabets (list): Alphabet symbols of the language.
+            startState (Node): Start state of the DFA.
+            stateList (dict): key-value pairs of name of the state and the respective Node object. 
+            ranges (list): Code point ranges of every symbol, or None if every symbol stands for itself.
+
+        Returns:
+            DFA: A DFA object.
+
+        """
+                
+        if not isinstance(stateList, (dict, _StateList)):
+            raise TypeError("Expected a dict")
+        if not isinstance(startState, Node):
+            raise TypeError("Expected a Node object")
+        if not isinstance(alphabets, list):
+            raise TypeError("Expected a list") 
+        if ranges is not None and len(ranges) != len(alphabets):
+            raise ValueError("Expected the ranges of every symbol")
+               
+        self._alphabets = alphabets
+        self.ranges = ranges
+        self._version = _Version()
+        self._owners = (self._version,)
+        self._versionSeen = 0
+        self._stateList = self._adoptStates(stateList)
+        _adopt(startState, self._owners)
+        self._start = startState
+        self._compiled = None
+        self._editor = None
+
+    @classmethod
+    def fromCompiled(cls, compiled:CompiledDFA):
+        """
+        Returns a DFA backed by an integer transition table.
+
+        The Node objects of such a DFA, and with them its state names, are
+        only built when stateList, start or getNode are first used.
+
+        Args:
+            compiled (CompiledDFA): The transition table of the DFA.
+
+        Returns:
+            DFA: A DFA object.
+
+        """
+        dfa = cls.__new__(cls)
+        dfa._alphabets = compiled.alphabets
+        dfa.ranges = compiled.ranges
+        dfa._stateList = None
+        dfa._start = None
+        dfa._compiled = compiled
+        dfa._editor = None
+        dfa._version = _Version()
+        dfa._owners = (dfa._version,)
+        dfa._versionSeen = 0
+        return dfa
+
+    # Replacing any part of the automaton makes the compiled table stale
+
+    @property
+    def alphabets(self):
+        return self._alphabets
+
+    @alphabets.setter
+    def alphabets(self, value):
+        self._materialize()
+        self._alphabets = value
+        self._compiled = None
+        self._editor = None
+
+    @property
+    def stateList(self):
+        self._materialize()
+        return self._stateList
+
+    @stateList.setter
+    def stateList(self, value):
+        self._materialize()
+        self._stateList = self._adoptStates(value)
+        self._compiled = None
+        self._editor = None
+
+    @property
+    def start(self):
+        self._materialize()
+        return self._start
+
+    @start.setter
+    def start(self, value):
+        self._materialize()
+        if isinstance(value, Node):
+            _adopt(value, self._owners)
+        self._start = value
+        self._compiled = None
+        self._editor = None
+
+    def _materialize(self):
+        """
+        Gives a DFA that is backed only by its table a stateList view of it.
+        """
+        if self._stateList is not None:
+            return
+
+        compiled = self.compile()
+        self._stateList = _StateList(compiled, self._owners)
+        self._start = self._stateList[compiled.stateNames[compiled.start]]
+
+    def _adoptStates(self, stateList):
+        """
+        Returns a stateList that tells this DFA about edits to it and its Nodes.
+
+        A plain dict is copied. The stateList of another DFA is shared, and
+        then tells both DFAs.
+        """
+        owners = self._owners
+        if isinstance(stateList, _StateList):
+            stateList.owners += tuple(version for version in owners if version not in stateList.owners)
+            nodes = stateList.nodes.values()
+        else:
+            if not isinstance(stateList, _WatchedDict) or stateList._node is not None:
+                stateList = _WatchedDict(stateList)
+            if not stateList._owners:
+                stateList._owners = owners
+            elif self._version not in stateList._owners:
+                stateList._owners += owners
+            nodes = stateList.values()
+        for node in nodes:
+            if isinstance(node, Node):
+                _adopt(node, owners)
+        return stateList
+
+    def compile(self):
+        """
+        Returns the integer transition table of the DFA.
+
+        The table is built on first use and cached on the DFA. Assigning
+        alphabets, stateList or start drops the cache, and so does editing
+        a Node, its rules or the stateList in place. Tables returned before
+        an edit are not changed by it.
+
+        Returns:
+            CompiledDFA: The compiled form of the DFA.
+
+        """
+        self._syncNodes()
+        if self._compiled is None:
+            if self._editor is not None:
+                self._compiled = self._editor.compiled()
+            else:
+                self._compiled = CompiledDFA.fromDFA(self)
+        return self._compiled
+
+    def _syncNodes(self):
+        """
+        Drops the table and editor if a Node or stateList was edited in place since they were built.
+        """
+        if self._versionSeen != self._version.count:
+            self._compiled = None
+            self._editor = None
+            self._versionSeen = self._version.count
+
+    def invalidate(self):
+        """
+        Drops the cached transition table.
+
+        Edits made to Nodes and the stateList drop it by themselves, so this
+        is only needed when the DFA was changed some other way.
+        """
+        # Without Node objects the table is the only copy of the DFA
+        if self._stateList is not None:
+            self._compiled = None
+            self._editor = None
+
+    def memoryReport(self):
+        """
+        Returns about how much memory every part of the DFA holds.
+
+        Objects shared by several parts, such as names used as keys of
+        stateIndex, are counted once, for the first part. Names that were
+        not built yet and tables memory-mapped from a binary file count as
+        nothing.
+
+        Returns:
+            dict: Bytes held by the 'table', 'accept' flags, state 'names',
+            'stateIndex', 'nodes', cached analyses ('caches') and the
+            'editor' used by setTransition and the other edits, and their
+            'total'.
+
+        """
+        compiled = self.compile()
+        seen = set()
+        names = compiled.stateNames
+        if isinstance(names, _LazyNames):
+            names = names._names
+        nodes = self._stateList
+        if isinstance(nodes, _StateList):
+            nodes = nodes.nodes
+        cached = ("_analysis", "_sink", "_symbolClasses", "_numpy", "_canonical", "_matcherFunction")
+        report = {
+            "table": _sizeOf(compiled.table, seen),
+            "accept": _sizeOf(compiled.accept, seen),
+            "names": _sizeOf(names, seen),
+            "stateIndex": _sizeOf(compiled._stateIndex, seen),
+            "nodes": _sizeOf(nodes, seen),
+            "caches": sum(_sizeOf(getattr(compiled, attribute, None), seen) for attribute in cached),
+            "editor": sum(_sizeOf(value, seen) for value in vars(self._editor).values()) if self._editor is not None else 0,
+        }
+        report["total"] = sum(report.values())
+        return report
+
+    def _edit(self):
+        """
+        Returns the editable copy of the DFA, creating it on first use.
+        """
+        self._syncNodes()
+        if self._editor is None:
+            self._editor = _IncrementalMinimizer(self.compile())
+        self._compiled = None
+        return self._editor
+
+    def _stateNumber(self, editor, name):
+        state = editor.stateIndex.get(name)
+        if state is None:
+            raise ValueError(f"State {name} is not defined")
+        return state
+
+    def setTransition(self, state, symbol, nextState):
+        """
+        Sets the next state of a state on an input symbol.
+
+        Args:
+            state (str): Name of the state.
+            symbol (str): Input symbol.
+            nextState (str): Name of the next state.
+
+        """
+        editor = self._edit()
+        if symbol not in editor.alphabets:
+            raise ValueError(f"Symbol '{symbol}' is not in the alphabet")
+        editor.setTransition(self._stateNumber(editor, state), editor.alphabets.index(symbol), self._stateNumber(editor, nextState))
+        if self._stateList is not None:
+            self._stateList[state].setTransition(symbol, nextState)
+            self._versionSeen = self._version.count
+
+    def setAccepting(self, state, acceptState=True):
+        """
+        Sets whether a state is accepting.
+
+        Args:
+            state (str): Name of the state.
+            acceptState (bool): True if accepting.
+
+        """
+        if not isinstance(acceptState, bool):
+            raise TypeError("Expected a boolean")
+        editor = self._edit()
+        editor.setAccepting(self._stateNumber(editor, state), acceptState)
+        if self._stateList is not None:
+            self._stateList[state].setAccepting(acceptState)
+            self._versionSeen = self._version.count
+
+    def addState(self, name, acceptState, rules):
+        """
+        Adds a state.
+
+        Args:
+            name (str): Name of the new state.
+            acceptState (bool): True if accepting.
+            rules (dict): Next state of every input symbol; may name the new state.
+
+        """
+        if not isinstance(name, str):
+            raise TypeError("Expected a string")
+        if not isinstance(acceptState, bool):
+            raise TypeError("Expected a boolean")
+        if not isinstance(rules, dict):
+            raise TypeError("Expected a dictionary")
+        editor = self._edit()
+        if name in editor.stateIndex:
+            raise ValueError(f"State {name} is already defined")
+
+        targets = []
+        for symbol in editor.alphabets:
+            if symbol not in rules:
+                raise ValueError(f"No transition for symbol '{symbol}' in state {name}")
+            nextState = rules[symbol]
+            targets.append(len(editor.names) if nextState == name else self._stateNumber(editor, nextState))
+        editor.addState(name, acceptState, targets)
+        if self._stateList is not None:
+            self._stateList[name] = Node(name, acceptState, {symbol: rules[symbol] for symbol in editor.alphabets})
+            self._versionSeen = self._version.count
+
+    def removeState(self, name):
+        """
+        Removes a state that no other state has a transition into.
+
+        Args:
+            name (str): Name of the state.
+
+        """
+        editor = self._edit()
+        state = self._stateNumber(editor, name)
+        if state == editor.start:
+            raise ValueError(f"Cannot remove the start state {name}")
+        sources = [editor.names[p] for p in editor.preds[state] if p != state]
+        if sources:
+            raise ValueError(f"Cannot remove state {name}, state {sources[0]} has a transition into it")
+        editor.removeState(state)
+        if self._stateList is not None:
+            del self._stateList[name]
+            self._versionSeen = self._version.count
+
+    def minimized(self):
+        """
+        Returns the minimal DFA, updated incrementally after edits.
+
+        The first call partitions every state. After setTransition,
+        setAccepting, addState or removeState, the next call only places
+        again the states that reach an edited state, instead of minimizing
+        the whole DFA as minimizeDFA does. The result is equal to that of
+        minimizeDFA up to the numbering of its states.
+
+        Returns:
+            DFA: A new minimized DFA equivalent to this DFA.
+
+        """
+        self._syncNodes()
+        if self._editor is None:
+            self._editor = _IncrementalMinimizer(self.compile())
+        return self._editor.minimized()
+
+    def checkMinimized(self):
+        """
+        Returns whether the incrementally kept minimal DFA matches minimizeDFA.
+
+        Meant for testing; it minimizes the whole DFA from scratch.
+
+        Returns:
+            bool: True if both group the states the same way.
+
+        """
+        self._syncNodes()
+        if self._editor is None:
+            self._editor = _IncrementalMinimizer(self.compile())
+        return self._editor.check()
+
+    def inAlphabet(self, anInput):
+        """
+        Checks whether input symbols is part of accepted input symbols.
+
+        Args:
+            anInput(str) : input.
+
+        Returns:
+            bool: True if the input symbol is part of the language and False if it is not.
+
+        """
+        return self.compile().encode(anInput) is not None
+
+    def getNode(self, name):
+        """
+        Returns the object for the state of the given name.
+
+        Args:
+            name(str) : name of symbol. 
+
+        Returns:
+            Node: Returns a Node object.
+
+        """
+
+        return self.stateList[name]
+    
+    def isAccepted(self, anInput):
+        """
+        Returns whether the input is accepted by the DFA.
+
+        Args:
+            anInput (str): Input string.
+
+        Returns:
+            bool: True if accepted and False if rejected.
+
+        """
+        if not _profileHooks:
+            return self.compile().accepts(anInput)
+        phaseStart = time.perf_counter()
+        result = self.compile().accepts(anInput)
+        _endPhase("accept", phaseStart, {"strings": 1, "symbols": len(anInput), "accepted": int(result)})
+        return result
+
+    def acceptMany(self, strings):
+        """
+        Returns whether each of many strings is accepted by the DFA.
+
+        Strings with a symbol outside the alphabet are rejected, as in isAccepted.
+
+        Args:
+            strings (iterable): Input strings.
+
+        Returns:
+            Sequence: A NumPy bool array, or a list of bools if NumPy is not installed.
+
+        """
+        if not _profileHooks:
+            return self.compile().acceptsMany(strings)
+        phaseStart = time.perf_counter()
+        result = self.compile().acceptsMany(strings)
+        _endPhase("acceptMany", phaseStart, {"strings": len(result), "accepted": int(sum(result))})
+        return result
+
+    def matcher(self, encoding="utf-8"):
+        """
+        Returns a streaming matcher that reads input in chunks.
+
+        Args:
+            encoding (str): Encoding used to decode bytes chunks.
+
+        Returns:
+            DFAMatcher: A matcher positioned at the start state.
+
+        """
+        return DFAMatcher(self, encoding)
+
+    def toPython(self, path=None, name="accepts"):
+        """
+        Returns the source of a Python module with a function that runs this DFA.
+
+        The function is specialized to this DFA, see compileMatcher, and the
+        module does not need main.py.
+
+        Args:
+            path (str): File to also write the source to, for inspection or import.
+            name (str): Name of the generated function.
+
+        Returns:
+            str: The source of the module.
+
+        """
+        source = _matcherSource(self.compile(), name)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(source)
+        return source
+
+    def isAcceptedParallel(self, source, workers=None, chunkSize=1 << 24, encoding="utf-8"):
+        """
+        Returns whether a large input is accepted, reading chunks of it in parallel.
+
+        Every chunk is turned into the map from the state a run enters the
+        chunk in to the state it leaves in, computed for all states at once
+        with NumPy in a pool of processes. The maps are then applied in
+        order from the start state. The work per chunk grows with the number
+        of states, so this pays off for small DFAs, such as minimized ones,
+        and very long inputs.
+
+        Chunks are split at byte offsets, so every symbol must be a single
+        character stored in one byte by the encoding, which must be UTF-8,
+        ASCII or Latin-1. Otherwise the input is read sequentially by a
+        DFAMatcher.
+
+        Args:
+            source (str | bytes): Path of the input file, or the input itself.
+            workers (int): Number of processes, by default one per core.
+            chunkSize (int): Number of bytes per chunk.
+            encoding (str): Encoding of the input.
+
+        Returns:
+            bool: True if accepted and False if rejected.
+
+        """
+        if np is None:
+            raise ImportError("NumPy is required for parallel acceptance")
+        isPath = isinstance(source, str)
+        if isPath and not os.path.exists(source):
+            raise FileNotFoundError(f"File {source} does not exist")
+        if not isPath and not isinstance(source, (bytes, bytearray, memoryview)):
+            raise TypeError("source must be a path or bytes")
+        if chunkSize < 1:
+            raise ValueError("chunkSize must be positive")
+
+        compiled = self.compile()
+        tables = _chunkTables(compiled, encoding)
+        if tables is None:
+            matcher = self.matcher(encoding)
+            if isPath:
+                matcher.feedFile(source)
+            else:
+                matcher.feed(bytes(source))
+            return matcher.finish()
+
+        size = os.path.getsize(source) if isPath else len(source)
+        offsets = range(0, size, chunkSize)
+        workers = min(workers or os.cpu_count() or 1, len(offsets))
+        if workers <= 1:
+            _initChunkWorker(tables)
+            if isPath:
+                maps = [_chunkStateMap(source, offset, chunkSize) for offset in offsets]
+            else:
+                view = memoryview(source).cast("B")
+                maps = [_chunkStateMap(None, 0, 0, view[offset:offset + chunkSize]) for offset in offsets]
+        else:
+            # Workers read their chunks of a file themselves; bytes are sent to them
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initChunkWorker, initargs=(tables,)) as pool:
+                if isPath:
+                    futures = [pool.submit(_chunkStateMap, source, offset, chunkSize) for offset in offsets]
+                else:
+                    view = memoryview(source).cast("B")
+                    futures = [pool.submit(_chunkStateMap, None, 0, 0, bytes(view[offset:offset + chunkSize])) for offset in offsets]
+                maps = [future.result() for future in futures]
+
+        # State numStates is the sink entered after a symbol outside the alphabet
+        state = compiled.start
+        for stateMap in maps:
+            state = int(stateMap[state])
+        return state < compiled.numStates and compiled.accept[state] == 1
+
+    def createJson(self, operation):
+        os.makedirs("dfa", exist_ok=True)
+
+        # File path
+        file_path = os.path.join("dfa", "dfa_" + operation + ".json")
+
+        # Write to the JSON file
+        self.saveJson(file_path)
+
+        print(f"JSON file created at {file_path}")
+
+    def saveJson(self, file_path):
+        """
+        Writes the DFA to a JSON file in the format read by parseDFA.
+
+        Args:
+            file_path (str): Path of the JSON file.
+
+        """
+        phaseStart = time.perf_counter() if _profileHooks else 0.0
+
+        # Names are built here, from the table, without creating Node objects
+        compiled = self.compile()
+        names = list(compiled.stateNames)
+        k = compiled.numSymbols
+
+        # Data to write
+        dfa = {
+            "alphabet": _rangesToJson(self.alphabets, compiled.ranges),
+            "states": names,
+            "startState": names[compiled.start],
+            "acceptStates": [name for name, flag in zip(names, compiled.accept) if flag],
+            "transitions":  {
+                name: {symbol: names[compiled.table[s * k + c]] for c, symbol in enumerate(compiled.alphabets)}
+                for s, name in enumerate(names)
+            }
+        }
+
+        with _replacingFile(file_path, "w") as f:
+            json.dump(dfa, f, indent=4)
+            if _profileHooks:
+                _endPhase("write", phaseStart, {"states": len(names), "bytes": f.tell()})
+
+    def createJsonLines(self, operation):
+        """
+        Writes the DFA as line-delimited JSON, one state per line.
+
+        The file can be read back with parseDFALines, which never holds the
+        whole document in memory.
+
+        Args:
+            operation (str): Name of the operation, used in the file name.
+
+        """
+        os.makedirs("dfa", exist_ok=True)
+        file_path = os.path.join("dfa", "dfa_" + operation + ".jsonl")
+        self.saveJsonLines(file_path)
+        print(f"JSON lines file created at {file_path}")
+
+    def saveJsonLines(self, file_path):
+        """
+        Writes the DFA to a line-delimited JSON file.
+
+        Args:
+            file_path (str): Path of the line-delimited JSON file.
+
+        """
+        phaseStart = time.perf_counter() if _profileHooks else 0.0
+        compiled = self.compile()
+        names = compiled.stateNames
+        k = compiled.numSymbols
+
+        with _replacingFile(file_path, "w") as f:
+            f.write(json.dumps({"alphabet": _rangesToJson(self.alphabets, compiled.ranges), "startState": names[compiled.start]}) + "\n")
+            for s, name in enumerate(names):
+                rules = {symbol: names[compiled.table[s * k + c]] for c, symbol in enumerate(compiled.alphabets)}
+                f.write(json.dumps({"state": name, "accept": compiled.accept[s] == 1, "transitions": rules}) + "\n")
+            if _profileHooks:
+                _endPhase("write", phaseStart, {"states": compiled.numStates, "bytes": f.tell()})
+
+    def createBinary(self, operation):
+        """
+        Writes the DFA in the binary format read by parseDFABinary.
+
+        Args:
+            operation (str): Name of the operation, used in the file name.
+
+        """
+        os.makedirs("dfa", exist_ok=True)
+        file_path = os.path.join("dfa", "dfa_" + operation + BINARY_EXTENSION)
+        self.saveBinary(file_path)
+        print(f"Binary file created at {file_path}")
+
+    def saveBinary(self, file_path):
+        """
+        Writes the DFA to a binary file.
+
+        The file holds a header, the symbol table, the state-name table, the
+        accept flags and the row-major int32 transition matrix, each section
+        starting on an 8-byte boundary. All integers are little-endian:
+
+            magic b'DFAB', version (uint32), numStates (uint64),
+            numSymbols (uint64), start (uint64), then the byte offset and
+            length (uint64 each) of the symbols, name offsets, names,
+            accept and table sections.
+
+        Symbols are a UTF-8 JSON list, or for an alphabet of character ranges
+        an object with the list of 'symbols' and the code point 'ranges' of
+        each. Names are UTF-8 strings located by
+        numStates + 1 uint64 offsets. Accept holds one byte per state.
+
+        Args:
+            file_path (str): Path of the binary file.
+
+        """
+        phaseStart = time.perf_counter() if _profileHooks else 0.0
+        compiled = self.compile()
+        n = compiled.numStates
+
+        symbols = compiled.alphabets
+        if compiled.ranges is not None:
+            symbols = {"symbols": symbols, "ranges": compiled.ranges}
+        symbols = json.dumps(symbols).encode("utf-8")
+        encodedNames = [name.encode("utf-8") for name in compiled.stateNames]
+        nameOffsets = array("Q", [0]) * (n + 1)
+        for i, name in enumerate(encodedNames):
+            nameOffsets[i + 1] = nameOffsets[i] + len(name)
+        accept = bytes(1 if flag else 0 for flag in compiled.accept)
+        table = compiled.table
+        if not (isinstance(table, memoryview) and table.format == "i"):
+            table = array("i", table)
+        if sys.byteorder != "little":
+            nameOffsets.byteswap()
+            table = array("i", table)
+            table.byteswap()
+
+        sections = [
+            (len(symbols), [symbols]),
+            (len(nameOffsets) * 8, [nameOffsets]),
+            (int(nameOffsets[n]), encodedNames),
+            (len(accept), [accept]),
+            (len(table) * 4, [table]),
+        ]
+
+        # Lay out every section on an 8-byte boundary after the header
+        offset = _BINARY_HEADER.size
+        layout = []
+        for length, _ in sections:
+            offset += -offset % 8
+            layout.extend((offset, length))
+            offset += length
+
+        with _replacingFile(file_path, "wb") as f:
+            f.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, n, compiled.numSymbols, compiled.start, *layout))
+            position = _BINARY_HEADER.size
+            for (length, parts), sectionOffset in zip(sections, layout[::2]):
+                f.write(b"\0" * (sectionOffset - position))
+                for part in parts:
+                    f.write(part)
+                position = sectionOffset + length
+            if _profileHooks:
+                _endPhase("write", phaseStart, {"states": n, "bytes": position})
+
+@contextlib.contextmanager
+def _replacingFile(file_path, mode):
+    """
+    Opens a temporary file that replaces file_path once it is written.
+
+    A DFA loaded from a binary file keeps the file memory-mapped, so the file
+    must not be truncated while the DFA is saved over it. The old file is
+    only replaced, never rewritten, and stays mapped until it is released.
+
+    Args:
+        file_path (str): Path of the file to write.
+        mode (str): Mode of the file, "w" or "wb".
+
+    Returns:
+        file: The temporary file, as a context manager.
+
+    """
+    temporary = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, mode) as f:
+            yield f
+        os.replace(temporary, file_path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+class DFAMatcher:
+    """
+    A resumable run of a DFA over input that arrives in chunks.
+
+    Only the current state is kept between chunks, so input of any size is
+    matched in constant memory. The run rejects as soon as a symbol outside
+    the alphabet is seen, or a dead state is entered, and ignores everything
+    fed after that. Once it enters a universal state, later input is only
+    checked against the alphabet. See CompiledDFA.stateAnalysis.
+
+    The matcher works on the compiled table of the DFA at the time it was
+    created; later changes to the DFA do not affect it.
+
+    Attributes:
+        consumed (int): Number of symbols read so far.
+    """
+
+    def __init__(self, dfa:DFA, encoding="utf-8"):
+        """
+        Initializes the DFAMatcher class.
+
+        Args:
+            dfa (DFA): The DFA to run.
+            encoding (str): Encoding used to decode bytes chunks.
+
+        """
+        if not isinstance(dfa, DFA):
+            raise TypeError("Expected a DFA object")
+
+        self._compiled = dfa.compile()
+        self._encoding = encoding
+        self.reset()
+
+    def reset(self):
+        """
+        Moves the matcher back to the start state.
+        """
+        self._state = self._compiled.start
+        self._decoder = codecs.getincrementaldecoder(self._encoding)()
+        self.consumed = 0
+
+    @property
+    def current_state(self):
+        """
+        str: Name of the current state, or None once the input was rejected.
+            After a universal state was entered, the name of that state.
+        """
+        if self._state is None:
+            return None
+        return self._compiled.stateNames[self._state]
+
+    @property
+    def rejected(self):
+        """
+        bool: True once a symbol outside the alphabet was read or a dead state was entered.
+        """
+        return self._state is None
+
+    def feed(self, chunk):
+        """
+        Advances the run over the next chunk of input.
+
+        Bytes are decoded incrementally, so a multi-byte character may be
+        split across two chunks.
+
+        Args:
+            chunk (str | bytes): The next part of the input.
+
+        """
+        if self._state is None:
+            return
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = self._decoder.decode(chunk)
+
+        compiled = self._compiled
+        columns = compiled.encode(chunk)
+        if columns is None:
+            self._state = None
+            return
+        if getattr(compiled, "_analysis", None) is None and self.consumed + len(columns) >= compiled.numStates * compiled.numSymbols:
+            # The input so far is as long as the table, so the analysis pays off
+            compiled.stateAnalysis()
+        if getattr(compiled, "_analysis", None) is None:
+            self._state = compiled.run(columns, self._state)
+        else:
+            if not compiled._sink[self._state]:
+                self._state = compiled._runToSink(columns, self._state)
+            if compiled._analysis[1][self._state]:
+                # No continuation is accepted from a dead state
+                self._state = None
+        self.consumed += len(columns)
+
+    def finish(self):
+        """
+        Returns whether the input fed so far is accepted.
+
+        Returns:
+            bool: True if accepted and False if rejected.
+
+        """
+        if self._state is not None:
+            self.feed(self._decoder.decode(b"", final=True))
+        if self._state is None:
+            return False
+        return self._compiled.accept[self._state] == 1
+
+    def feedFile(self, path, chunkSize=1 << 20, useMmap=False):
+        """
+        Feeds the contents of a file in chunks.
+
+        Reading stops early once the input is rejected.
+
+        Args:
+            path (str): Path of the input file.
+            chunkSize (int): Number of bytes read per chunk.
+            useMmap (bool): Map the file into memory instead of reading it through a buffer.
+
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist")
+        if not _profileHooks:
+            return self._feedFile(path, chunkSize, useMmap)
+
+        phaseStart = time.perf_counter()
+        consumed = self.consumed
+        self._feedFile(path, chunkSize, useMmap)
+        _endPhase("stream", phaseStart, {"bytes": os.path.getsize(path), "symbols": self.consumed - consumed})
+
+    def _feedFile(self, path, chunkSize, useMmap):
+        with open(path, "rb") as f:
+            if useMmap and os.path.getsize(path) > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, len(mapped), chunkSize):
+                        if self._state is None:
+                            return
+                        self.feed(mapped[offset:offset + chunkSize])
+                return
+
+            while self._state is not None:
+                chunk = f.read(chunkSize)
+                if not chunk:
+                    return
+                self.feed(chunk)
+
+def _chunkTables(compiled:CompiledDFA, encoding):
+    """
+    Returns the tables used to map chunks of bytes to state maps.
+
+    Bytes are translated to symbol classes, see CompiledDFA.symbolClasses,
+    with one more class for every byte that is not a symbol of the alphabet,
+    and state numStates is added as a sink entered on that class. Besides
+    the table for single classes, the state reached over every word of
+    wordLength classes is tabulated, with wordLength chosen so the word
+    table has about four million entries; fewer classes allow longer words.
+
+    Args:
+        compiled (CompiledDFA): A compiled DFA.
+        encoding (str): Encoding of the input.
+
+    Returns:
+        tuple: The class of every byte value, the (numStates + 1,
+            numClasses + 1) step table, the word table and wordLength, or
+            None if some symbol is not one byte in the encoding.
+    """
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        raise ValueError(f"Unknown encoding '{encoding}'")
+    # In these encodings every byte that decodes to a character on its own is that character
+    if name not in ("utf-8", "ascii", "iso8859-1"):
+        return None
+    limit = 128 if name in ("utf-8", "ascii") else 256
+
+    n = compiled.numStates
+    k = compiled.numSymbols
+    byteColumn = np.full(256, k, dtype=np.int64)
+    if compiled.ranges is not None:
+        for column, pairs in enumerate(compiled.ranges):
+            for first, last in pairs:
+                if last >= limit:
+                    return None
+                byteColumn[first:last + 1] = column
+    else:
+        for symbol, column in compiled.symbolIndex.items():
+            if not isinstance(symbol, str) or len(symbol) != 1 or ord(symbol) >= limit:
+                return None
+            byteColumn[ord(symbol)] = column
+
+    classOf, firstColumns = compiled.symbolClasses()
+    byteColumn = np.asarray(classOf + [len(firstColumns)], dtype=np.int64)[byteColumn]
+    k = len(firstColumns)
+    step = np.full((n + 1, k + 1), n, dtype=np.int32)
+    if n and k:
+        step[:n, :k] = compiled.toNumpy()[0][:, firstColumns]
+
+    # Column i of a word is digit i in base k + 1, so appending a column adds the highest digit
+    wordLength = 1
+    while (k + 1) ** (wordLength + 1) * (n + 1) <= 1 << 22:
+        wordLength += 1
+    words = step
+    for _ in range(wordLength - 1):
+        words = step[words].transpose(0, 2, 1).reshape(n + 1, -1)
+    return byteColumn, step, words, wordLength
+
+# Tables of the DFA run by this worker process, see DFA.isAcceptedParallel
+_chunkTablesOfWorker = None
+
+def _initChunkWorker(tables):
+    global _chunkTablesOfWorker
+    _chunkTablesOfWorker = tables
+
+def _chunkStateMap(path, offset, length, data=None):
+    """
+    Returns the state every state moves to over one chunk of input.
+
+    The chunk is read as words of columns, and the word table gives the map
+    of every word. The maps are composed pairwise, halving their number each
+    round, in blocks of about a million entries, so a block takes a
+    logarithmic number of NumPy calls. Columns after the last full word are
+    applied one at a time.
+
+    Args:
+        path (str): Path of the input file, or None if data is given.
+        offset (int): Offset of the chunk in the file.
+        length (int): Length of the chunk.
+        data (bytes): The chunk itself, instead of a file.
+
+    Returns:
+        numpy.ndarray: The state reached from every state, sink included.
+    """
+    if data is None:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _chunkStateMap(None, 0, 0, mapped[offset:offset + length])
+
+    byteColumn, step, words, wordLength = _chunkTablesOfWorker
+    chunk = np.frombuffer(data, dtype=np.uint8)
+    numRows = step.shape[0]
+    powers = step.shape[1] ** np.arange(wordLength, dtype=np.int64)
+    identity = np.arange(numRows, dtype=np.int32)[:, None]
+    stateMap = identity[:, 0]
+
+    block = max(1, (1 << 20) // numRows) * wordLength
+    end = len(chunk) - len(chunk) % wordLength
+    for start in range(0, end, block):
+        # Column j maps every state to the state after word j of the block
+        columns = byteColumn[chunk[start:min(start + block, end)]]
+        maps = words[:, columns.reshape(-1, wordLength) @ powers]
+        while maps.shape[1] > 1:
+            if maps.shape[1] % 2:
+                maps = np.concatenate((maps, identity), axis=1)
+            maps = np.take_along_axis(maps[:, 1::2], maps[:, 0::2], axis=0)
+        stateMap = maps[stateMap, 0]
+    for column in byteColumn[chunk[end:]]:
+        stateMap = step[stateMap, column]
+    return stateMap
+
+MATCHER_SKIP_SHARE = 0.75
+
+def _matcherSource(compiled:CompiledDFA, name="accepts"):
+    """
+    Returns the source of a Python module with a function that runs one DFA.
+
+    The function translates a string to symbol classes with str.translate
+    and steps through a tuple of rows per state. States that loop on at
+    least MATCHER_SKIP_SHARE of the symbols consume each run of those
+    symbols with one regular expression match instead, which pays off once
+    runs are a few symbols long. Dead and universal states return
+    at once. Unreachable states are left out. The module only imports the
+    standard library, so it can be saved and imported without main.py.
+
+    Args:
+        compiled (CompiledDFA): The compiled DFA.
+        name (str): Name of the generated function.
+
+    Returns:
+        str: The source of the module.
+
+    """
+    if not name.isidentifier():
+        raise ValueError("name must be a Python identifier")
+    trimmed, _ = _trimmed(compiled)
+    _, dead, universal = trimmed.stateAnalysis()
+    classOf = trimmed.symbolClasses()[0]
+    narrow = trimmed.compressed()
+    n = narrow.numStates
+    k = narrow.numSymbols
+    table = narrow.table
+    useBytes = k <= 256
+
+    # Plain states first, then dead, universal and skipping states, so one comparison finds them all
+    loops = [[c for c in range(k) if table[s * k + c] == s] for s in range(n)]
+    symbolsOf = [0] * k
+    for c in classOf:
+        symbolsOf[c] += 1
+    skipping = [useBytes and not dead[s] and not universal[s]
+                and sum(symbolsOf[c] for c in loops[s]) >= MATCHER_SKIP_SHARE * trimmed.numSymbols for s in range(n)]
+    kinds = [3 if skipping[s] else 1 if dead[s] else 2 if universal[s] else 0 for s in range(n)]
+    order = sorted(range(n), key=lambda s: kinds[s])
+    newId = [0] * n
+    for i, s in enumerate(order):
+        newId[s] = i
+    firstDead = sum(1 for kind in kinds if kind < 1)
+    firstUniversal = sum(1 for kind in kinds if kind < 2)
+    firstSkipping = sum(1 for kind in kinds if kind < 3)
+    start = newId[narrow.start]
+    if firstDead == firstUniversal:
+        sinkResult = "True"
+    elif firstUniversal == firstSkipping:
+        sinkResult = "False"
+    else:
+        sinkResult = f"state >= {firstUniversal}"
+
+    lines = [
+        '"""',
+        f"Matcher for a DFA with {n} states and {k} symbol classes, generated by",
+        "main.py. It does not depend on main.py and can be imported on its own.",
+        '"""',
+    ]
+    if firstSkipping < n:
+        lines += ["import re", "from operator import length_hint"]
+    if compiled.ranges is not None:
+        lines.append("from bisect import bisect_right")
+    lines.append("")
+
+    # Translation of characters, and of the symbols of other iterables, to classes
+    if compiled.ranges is None:
+        columns = {ord(symbol): chr(classOf[column]) for symbol, column in compiled.symbolIndex.items()
+                   if isinstance(symbol, str) and len(symbol) == 1}
+        lines += [
+            "class _Columns(dict):",
+            "    def __missing__(self, key):",
+            "        return None",
+            "",
+            f"_COLUMNS = _Columns({columns!r})",
+        ]
+    else:
+        spans = []
+        for first, last, column in sorted((first, last, column) for column, pairs in enumerate(compiled.ranges) for first, last in pairs):
+            if spans and spans[-1][1] + 1 == first and spans[-1][2] == classOf[column]:
+                spans[-1][1] = last
+            else:
+                spans.append([first, last, classOf[column]])
+        lines += [
+            f"_STARTS = {tuple(first for first, _, _ in spans)!r}",
+            f"_ENDS = {tuple(last for _, last, _ in spans)!r}",
+            f"_CLASSES = {''.join(chr(c) for _, _, c in spans)!r}",
+            "",
+            "class _Columns(dict):",
+            "    def __missing__(self, key):",
+            "        i = bisect_right(_STARTS, key) - 1",
+            "        column = _CLASSES[i] if i >= 0 and key <= _ENDS[i] else None",
+            "        self[key] = column",
+            "        return column",
+            "",
+            "_COLUMNS = _Columns()",
+        ]
+    symbols = {symbol: classOf[column] for symbol, column in compiled.symbolIndex.items()}
+    lines.append(f"_SYMBOLS = {symbols!r}")
+    lines.append("_ROWS = (")
+    for s in order:
+        lines.append(f"    {tuple(newId[t] for t in table[s * k:s * k + k])!r},")
+    lines.append(")")
+    lines.append(f"_ACCEPT = {tuple(bool(narrow.accept[s]) for s in order)!r}")
+    if firstSkipping < n:
+        lines.append("_SKIPS = (")
+        for s in order[firstSkipping:]:
+            pattern = b"[" + b"".join(re.escape(bytes([c])) for c in loops[s]) + b"]*"
+            lines.append(f"    re.compile({pattern!r}).match,")
+        lines.append(")")
+
+    lines += [
+        "",
+        f"def {name}(text):",
+        '    """',
+        "    Returns whether the DFA accepts a string, or an iterable of symbols.",
+        '    """',
+    ]
+    if kinds[narrow.start] == 1:
+        lines.append("    return False")
+        return "\n".join(lines) + "\n"
+    lines += [
+        "    if isinstance(text, str):",
+        "        data = text.translate(_COLUMNS)",
+        "        if len(data) != len(text):",
+        "            return False",
+        '        data = data.encode("latin-1")' if useBytes else "        data = [ord(c) for c in data]",
+        "    else:",
+        "        try:",
+        "            data = " + ("bytes([_SYMBOLS[symbol] for symbol in text])" if useBytes else "[_SYMBOLS[symbol] for symbol in text]"),
+        "        except (KeyError, TypeError):",
+        "            return False",
+    ]
+    if kinds[narrow.start] == 2:
+        lines.append("    return True")
+        return "\n".join(lines) + "\n"
+    lines += [
+        "    rows = _ROWS",
+        f"    state = {start}",
+    ]
+    if firstSkipping == n:
+        lines.append("    for c in data:")
+        lines.append("        state = rows[state][c]")
+        if firstDead < n:
+            lines.append(f"        if state >= {firstDead}:")
+            lines.append(f"            return {sinkResult}")
+        lines.append("    return _ACCEPT[state]")
+        return "\n".join(lines) + "\n"
+
+    lines += [
+        "    skips = _SKIPS",
+        "    end = len(data)",
+        "    it = iter(data)",
+        "    while True:",
+        f"        if state >= {firstDead}:",
+        f"            if state < {firstSkipping}:",
+        f"                return {sinkResult}",
+        f"            pos = skips[state - {firstSkipping}](data, end - length_hint(it)).end()",
+        "            if pos == end:",
+        "                return _ACCEPT[state]",
+        "            # Resume after the run without copying the rest of the input",
+        "            it.__setstate__(pos)",
+        "        for c in it:",
+        "            state = rows[state][c]",
+        f"            if state >= {firstDead}:",
+        "                break",
+        "        else:",
+        "            return _ACCEPT[state]",
+    ]
+    return "\n".join(lines) + "\n"
+
+def compileMatcher(dfa:DFA):
+    """
+    Returns a function generated for a DFA that tells whether it accepts a string.
+
+    The function is built from the source of DFA.toPython the first time
+    and cached with the compiled table of the DFA, so it is rebuilt after
+    the DFA is edited.
+
+    Args:
+        dfa (DFA): The DFA to match.
+
+    Returns:
+        function: Takes a string, or an iterable of symbols, and returns
+        True if the DFA accepts it.
+
+    """
+    compiled = dfa.compile()
+    function = getattr(compiled, "_matcherFunction", None)
+    if function is None:
+        namespace = {}
+        exec(compile(_matcherSource(compiled), "<generated matcher>", "exec"), namespace)
+        function = compiled._matcherFunction = namespace["accepts"]
+    return function
+
+def _canonicalForm(compiled:CompiledDFA):
+    """
+    Returns the canonical numbering of the reachable states of a compiled DFA.
+
+    States are renumbered breadth first from the start state, reading the
+    symbols in sorted order, so two DFAs get the same numbering and the same
+    digest exactly when their reachable parts are equal up to state names
+    and the order of the alphabet. The result is cached on the compiled DFA.
+
+    Args:
+        compiled (CompiledDFA): A compiled DFA.
+
+    Returns:
+        tuple: The state numbers in canonical order, the canonical number of
+        every state (-1 if unreachable) and the hex digest of the canonical form.
+    """
+    if getattr(compiled, "_canonical", None) is None:
+        n = compiled.numStates
+        k = compiled.numSymbols
+        table = compiled.table
+        symbolOrder = sorted(range(k), key=lambda c: compiled.alphabets[c])
+
+        order = [compiled.start]
+        position = [-1] * n
+        position[compiled.start] = 0
+        for s in order:
+            row = s * k
+            for c in symbolOrder:
+                t = table[row + c]
+                if position[t] < 0:
+                    position[t] = len(order)
+                    order.append(t)
+
+        # One row of accept flag and canonical next states per canonical state
+        rows = array("i")
+        for s in order:
+            row = s * k
+            rows.append(compiled.accept[s])
+            rows.extend(position[table[row + c]] for c in symbolOrder)
+        if sys.byteorder != "little":
+            rows.byteswap()
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps(sorted(compiled.alphabets)).encode("utf-8"))
+        if compiled.ranges is not None:
+            digest.update(json.dumps([compiled.ranges[c] for c in symbolOrder]).encode("utf-8"))
+        digest.update(rows.tobytes())
+        compiled._canonical = (order, position, digest.hexdigest())
+    return compiled._canonical
+
+def fingerprint(dfa:DFA):
+    """
+    Returns a fingerprint of the reachable part of a DFA.
+
+    It depends neither on state names nor on the order of the alphabet or of
+    the states, only on the structure reachable from the start state.
+
+    Args:
+        dfa (DFA): A DFA.
+
+    Returns:
+        str: A hex digest.
+    """
+    return _canonicalForm(dfa.compile())[2]
+
+class ResultCache:
+    """
+    A content-addressed cache of product and minimization results.
+
+    Keys combine the fingerprints of the operands with the operation, so a
+    result is reused whenever the same automata are combined again, whatever
+    their state names or file names. Entries are dicts of int arrays. Recent
+    entries are kept in memory up to maxEntries and maxMemoryBytes; when a
+    directory is set, entries are also written there and the least recently
+    used files are removed once the directory grows past maxBytes.
+
+    The cache is off until enabled is set, so library callers only pay for
+    fingerprints and copies of the results when they ask for it.
+
+    Attributes:
+        enabled (bool): Whether ProductConstruction and minimizeDFA use the cache.
+        maxEntries (int): Number of entries kept in memory.
+        maxMemoryBytes (int): Size limit of the entries kept in memory.
+        directory (str): Directory of the on-disk tier, or None for memory only.
+        maxBytes (int): Size limit of the on-disk tier.
+    """
+
+    def __init__(self, maxEntries=128, directory=None, maxBytes=256 * 1024 * 1024, maxMemoryBytes=64 * 1024 * 1024, enabled=False):
+        """
+        Initializes the ResultCache class.
+
+        Args:
+            maxEntries (int): Number of entries kept in memory.
+            directory (str): Directory of the on-disk tier, or None for memory only.
+            maxBytes (int): Size limit of the on-disk tier.
+            maxMemoryBytes (int): Size limit of the entries kept in memory.
+            enabled (bool): Whether ProductConstruction and minimizeDFA use the cache.
+
+        """
+        self.enabled = enabled
+        self.maxEntries = maxEntries
+        self.maxMemoryBytes = maxMemoryBytes
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self._memory = OrderedDict()
+        self._memoryBytes = 0
+
+    @staticmethod
+    def key(*parts):
+        """
+        Returns the cache key of an operation on fingerprinted operands.
+
+        Args:
+            *parts (str): The operation followed by the operand fingerprints.
+
+        Returns:
+            str: A hex digest.
+        """
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the entry stored under a key.
+
+        Args:
+            key (str): A key from ResultCache.key.
+
+        Returns:
+            dict: The entry, or None if it is not cached.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if self.directory is None:
+            return None
+
+        path = os.path.join(self.directory, key + ".bin")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        entry = self._decode(data)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores an entry under a key.
+
+        Args:
+            key (str): A key from ResultCache.key.
+            entry (dict): Names mapped to sequences of ints.
+
+        """
+        # iter() so that bytes and bytearrays are read as values, not as raw ints
+        entry = {name: values if isinstance(values, array) else array("i", iter(values)) for name, values in entry.items()}
+        self._remember(key, entry)
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, key + ".bin")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(self._encode(entry))
+        os.replace(temporary, path)
+        self._evictFiles()
+
+    def clear(self):
+        """
+        Removes every entry from memory and from the cache directory.
+        """
+        self._memory.clear()
+        self._memoryBytes = 0
+        if self.directory is not None and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".bin"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key, entry):
+        size = sum(len(values) * values.itemsize for values in entry.values())
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memoryBytes -= sum(len(values) * values.itemsize for values in old.values())
+        # An entry larger than the whole budget is only kept on disk
+        if size > self.maxMemoryBytes:
+            return
+        self._memory[key] = entry
+        self._memoryBytes += size
+        while len(self._memory) > self.maxEntries or self._memoryBytes > self.maxMemoryBytes:
+            _, old = self._memory.popitem(last=False)
+            self._memoryBytes -= sum(len(values) * values.itemsize for values in old.values())
+
+    def _evictFiles(self):
+        # Least recently used first, by modification time, which get refreshes
+        files = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin"):
+                path = os.path.join(self.directory, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, path))
+                total += info.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    @staticmethod
+    def _encode(entry):
+        # A JSON header with the length of every array, then the little-endian arrays
+        header = json.dumps({name: len(values) for name, values in entry.items()}).encode("utf-8")
+        parts = [struct.pack("<Q", len(header)), header]
+        for values in entry.values():
+            if sys.byteorder != "little":
+                values = array("i", values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @staticmethod
+    def _decode(data):
+        try:
+            (headerLength,) = struct.unpack_from("<Q", data, 0)
+            lengths = json.loads(data[8:8 + headerLength].decode("utf-8"))
+            entry = {}
+            offset = 8 + headerLength
+            for name, length in lengths.items():
+                values = array("i")
+                values.frombytes(data[offset:offset + length * 4])
+                if len(values) != length:
+                    return None
+                if sys.byteorder != "little":
+                    values.byteswap()
+                entry[name] = values
+                offset += length * 4
+            return entry
+        except (struct.error, ValueError):
+            return None
+
+# Shared by ProductConstruction and minimizeDFA, enabled by main, batch.py and server.py
+resultCache = ResultCache()
+
+# Callables told about every finished phase of the pipeline, see addProfileHook
+_profileHooks = []
+
+def addProfileHook(hook):
+    """
+    Registers a callable that is told about every finished phase of the pipeline.
+
+    The hook is called as hook(phase, seconds, counters), where phase is one
+    of 'parse', 'product', 'minimize', 'visualize', 'write', 'accept',
+    'acceptMany' or 'stream', seconds is the wall time of the phase and
+    counters is a dict of ints describing the work done, e.g. the states and
+    transitions built by a product. Phases are only timed and counted while
+    a hook is registered; otherwise each phase costs one check of an empty
+    list.
+
+    Args:
+        hook (function): Callable taking (phase, seconds, counters).
+
+    """
+    if not callable(hook):
+        raise TypeError("hook must be callable")
+    _profileHooks.append(hook)
+
+def removeProfileHook(hook):
+    """
+    Unregisters a hook added with addProfileHook.
+
+    Args:
+        hook (function): The registered hook.
+
+    """
+    _profileHooks.remove(hook)
+
+def _endPhase(phase, start, counters):
+    """
+    Reports a finished phase to every profile hook.
+
+    Args:
+        phase (str): Name of the phase.
+        start (float): time.perf_counter() at the start of the phase.
+        counters (dict): Counts of the work done in the phase.
+
+    """
+    seconds = time.perf_counter() - start
+    for hook in list(_profileHooks):
+        hook(phase, seconds, counters)
+
+class Profiler:
+    """
+    A profile hook that totals the time and counters of every phase.
+
+    Registered with addProfileHook, or for a block with 'with':
+
+        with Profiler() as profiler:
+            minimizeDFA(ProductConstruction(l1, l2, 'union'))
+        profiler.saveJson('profile.json')
+    """
+
+    def __init__(self):
+        self.phases = OrderedDict()
+        self._start = time.perf_counter()
+
+    def __call__(self, phase, seconds, counters):
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = {"calls": 0, "seconds": 0.0, "maxSeconds": 0.0, "counters": {}}
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["maxSeconds"] = max(entry["maxSeconds"], seconds)
+        totals = entry["counters"]
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+
+    def __enter__(self):
+        addProfileHook(self)
+        return self
+
+    def __exit__(self, *exc):
+        removeProfileHook(self)
+        return False
+
+    def report(self):
+        """
+        Returns the totals of every phase seen so far.
+
+        Returns:
+            dict: Seconds since the profiler was created, and the calls,
+                total and maximum seconds and summed counters of every phase.
+
+        """
+        return {"totalSeconds": time.perf_counter() - self._start, "phases": self.phases}
+
+    def saveJson(self, file_path):
+        """
+        Writes the report to a JSON file.
+
+        Args:
+            file_path (str): Path of the JSON file.
+
+        """
+        with open(file_path, "w") as f:
+            json.dump(self.report(), f, indent=4)
+
+def atLeast(m):
+    """
+    Returns an accept predicate that holds when at least m operands accept.
+
+    Args:
+        m (int) : Minimum number of accepting operands.
+
+    Returns:
+        function: A predicate taking a tuple of accept flags.
+
+    """
+    if not isinstance(m, int) or m < 0:
+        raise ValueError("m must be a non-negative integer")
+
+    def predicate(flags):
+        return sum(flags) >= m
+
+    predicate.__name__ = f"atleast{m}"
+    # Lets ResultCache tell predicates apart, which it cannot do for arbitrary callables
+    predicate.cacheKey = f"atleast{m}"
+    return predicate
+
+def getAcceptPredicate(operation, k):
+    """
+    Returns the accept predicate of a product of k DFAs.
+
+    The predicate receives a tuple with the accept flag of every operand
+    state and returns whether the product state is accepting.
+
+    Args:
+        operation (str | function) : 'union', 'intersection', 'xor', 'difference',
+            'complement' or a predicate taking a tuple of accept flags.
+        k (int) : Number of operands.
+
+    Returns:
+        function: A predicate taking a tuple of accept flags.
+
+    """
+    if callable(operation):
+        return operation
+    if operation == 'union':
+        return any
+    if operation == 'intersection':
+        return all
+    if operation == 'xor':
+        # Odd number of accepting operands, which is symmetric difference for two
+        return lambda flags: sum(flags) % 2 == 1
+    if operation == 'difference':
+        # Accepted by the first operand and none of the others
+        return lambda flags: flags[0] and not any(flags[1:])
+    if operation == 'complement':
+        if k != 1:
+            raise ValueError("'complement' takes exactly one DFA")
+        return lambda flags: not flags[0]
+    raise ValueError("operation must be 'union', 'intersection', 'xor', 'difference', 'complement' or a predicate")
+
+def _compileOperands(dfas):
+    """
+    Compiles the operands of a product and lines up their columns.
+
+    If some operand reads character ranges, the operands must read the same
+    characters, but may group them differently. The ranges are then cut at
+    every bound of every operand, and pieces that every operand reads with
+    the same columns form one symbol of the product. Otherwise the operands
+    must have the same symbols.
+
+    Args:
+        dfas (list) : DFAs over the same alphabet.
+
+    Returns:
+        tuple: The alphabet of the product, the CompiledDFA of every operand,
+        for every operand the column of each product symbol in its table, and
+        the ranges of every product symbol or None.
+
+    """
+    alphabet = dfas[0].alphabets
+    compiled = [dfa.compile() for dfa in dfas]
+    if all(c.ranges is None for c in compiled):
+        for c in compiled:
+            if set(c.alphabets) != set(alphabet):
+                raise ValueError("For product construction, the alphabets of the DFA's have to be the same.")
+        columns = [[c.symbolIndex[symbol] for symbol in alphabet] for c in compiled]
+        return alphabet, compiled, columns, None
+    symbolRanges = dict(zip(alphabet, compiled[0].ranges or ()))
+    if all(c.ranges is not None and dict(zip(c.alphabets, c.ranges)) == symbolRanges for c in compiled):
+        # The same named ranges everywhere, so the symbols are kept
+        columns = [[c.symbolIndex[symbol] for symbol in alphabet] for c in compiled]
+        return alphabet, compiled, columns, compiled[0].ranges
+
+    # Every operand as sorted (first, last, column) spans; plain symbols read themselves
+    operandSpans = []
+    for c in compiled:
+        if c.ranges is not None:
+            spans = [(first, last, column) for column, pairs in enumerate(c.ranges) for first, last in pairs]
+        elif all(isinstance(symbol, str) and len(symbol) == 1 for symbol in c.alphabets):
+            spans = [(ord(symbol), ord(symbol), column) for column, symbol in enumerate(c.alphabets)]
+        else:
+            raise ValueError("For product construction, the alphabets of the DFA's have to be the same.")
+        operandSpans.append(sorted(spans))
+
+    # Sweep the bounds of all operands; between two bounds every operand reads one column.
+    # Pieces read as the same symbol classes by every operand become one product symbol
+    operandClasses = [c.symbolClasses()[0] for c in compiled]
+    bounds = sorted({first for spans in operandSpans for first, _, _ in spans} |
+                    {last + 1 for spans in operandSpans for _, last, _ in spans})
+    symbolOf = {}
+    ranges = []
+    columns = [[] for _ in compiled]
+    positions = [0] * len(compiled)
+    for first, end in zip(bounds, bounds[1:]):
+        signature = []
+        for x, spans in enumerate(operandSpans):
+            i = positions[x]
+            while i < len(spans) and spans[i][1] < first:
+                i += 1
+            positions[x] = i
+            signature.append(spans[i][2] if i < len(spans) and spans[i][0] <= first else None)
+        if all(column is None for column in signature):
+            continue
+        if any(column is None for column in signature):
+            raise ValueError(f"For product construction, the alphabets of the DFA's have to be the same, {chr(first)!r} is not read by every DFA.")
+        key = tuple(classOf[column] for classOf, column in zip(operandClasses, signature))
+        j = symbolOf.get(key)
+        if j is None:
+            j = symbolOf[key] = len(ranges)
+            ranges.append([])
+            for x, column in enumerate(signature):
+                columns[x].append(column)
+        pairs = ranges[j]
+        if pairs and pairs[-1][1] + 1 == first:
+            pairs[-1] = (pairs[-1][0], end - 1)
+        else:
+            pairs.append((first, end - 1))
+
+    ranges = [tuple(pairs) for pairs in ranges]
+    return [_rangesName(pairs) for pairs in ranges], compiled, columns, ranges
+
+def _jointSymbolClasses(compiled, columns):
+    """
+    Returns the classes of product symbols that every operand reads alike.
+
+    Two product symbols are in one class when each operand reads them as
+    symbols of one of its own classes, see CompiledDFA.symbolClasses.
+
+    Args:
+        compiled (list) : The CompiledDFA of every operand.
+        columns (list) : For every operand, its column of each product symbol.
+
+    Returns:
+        tuple: The class number of every product symbol, and the first
+        product symbol of every class.
+
+    """
+    operandClasses = [c.symbolClasses()[0] for c in compiled]
+    classes = {}
+    classOf = []
+    firstColumns = []
+    for j in range(len(columns[0])):
+        key = tuple(classOf_[col[j]] for classOf_, col in zip(operandClasses, columns))
+        number = classes.get(key)
+        if number is None:
+            number = classes[key] = len(firstColumns)
+            firstColumns.append(j)
+        classOf.append(number)
+    return classOf, firstColumns
+
+# Largest number of tuples of states numbered with a dense array, 64 MB of ids
+PRODUCT_DENSE_TUPLES = 1 << 24
+
+# Most operands of a full product built with NumPy, whose accept predicate
+# is evaluated once for each of the 2 ** n combinations of accept flags
+PRODUCT_VECTOR_OPERANDS = 16
+
+def _fullProductArrays(compiled, columns, places, classOf, firstColumns, accepts):
+    """
+    Builds the table and accept flags of a full product with NumPy.
+
+    Tuple (s1, ..., sn) is numbered by its mixed-radix key, so its next
+    tuple on a symbol is T1[s1] * place1 + ... + Tn[sn] * placen. The rows of
+    all tuples are built by broadcasting the weighted table of one operand
+    at a time against the rows built so far, and the accept flags likewise
+    as one number of n bits per tuple, looked up in the verdicts of the
+    accept predicate.
+
+    Args:
+        compiled (list) : The CompiledDFA of every operand.
+        columns (list) : For every operand, its column of each product symbol.
+        places (list) : Place value of every operand in a key.
+        classOf (list) : Class number of every product symbol.
+        firstColumns (list) : First product symbol of every class.
+        accepts (function) : Accept predicate on a tuple of accept flags.
+
+    Returns:
+        tuple: The table as an array("i") and the accept flags as a
+        bytearray, or None without NumPy or when the product or the
+        number of operands is too large.
+
+    """
+    numTuples = places[0] * compiled[0].numStates
+    if np is None or numTuples >= 1 << 31 or len(compiled) > PRODUCT_VECTOR_OPERANDS:
+        return None
+    arity = len(compiled)
+    numClasses = len(firstColumns)
+    verdicts = np.fromiter(
+        (1 if accepts(tuple(bits >> (arity - 1 - x) & 1 == 1 for x in range(arity))) else 0
+         for bits in range(1 << arity)),
+        dtype=np.uint8, count=1 << arity)
+
+    # The rows are written straight into the buffer of the returned table
+    table = array("i", [0]) * (numTuples * len(classOf))
+    result = np.frombuffer(table, dtype=np.int32).reshape(numTuples, len(classOf))
+    rows = np.zeros((1, numClasses), dtype=np.int32)
+    bits = np.zeros(1, dtype=np.uint16)
+    for x, (c, col, place) in enumerate(zip(compiled, columns, places)):
+        n = c.numStates
+        parts = np.asarray(c.table, dtype=np.int32).reshape(n, c.numSymbols)[:, [col[j] for j in firstColumns]]
+        parts *= np.int32(place)
+        last = x == arity - 1 and numClasses == len(classOf)
+        out = result.reshape(len(rows), n, numClasses) if last else None
+        rows = np.add(rows[:, None, :], parts[None, :, :], out=out).reshape(len(rows) * n, numClasses)
+        flags = np.fromiter((flag == 1 for flag in c.accept), dtype=np.uint16, count=n)
+        bits = (bits[:, None] * 2 + flags[None, :]).reshape(len(bits) * n)
+
+    if numClasses < len(classOf):
+        # Back to one column per symbol, the column of its class
+        np.take(rows, classOf, axis=1, out=result)
+    return table, bytearray(verdicts[bits].tobytes())
+
+OPERATIONS = ["union", "intersection", "xor", "difference", "complement", "atleast"]
+
+def checkOperation(operation, numOperands, m=None, full=False):
+    """
+    Returns what is wrong with a product described by name, e.g. in a file.
+
+    Config files and manifests give the operation as one of OPERATIONS, the
+    m of 'atleast' and whether to build the full product. An operation of
+    None means the single operand is used as it is.
+
+    Args:
+        operation (str | None) : Name of the operation.
+        numOperands (int) : Number of operands.
+        m (int | None) : Minimum number of accepting operands for 'atleast', 1 if None.
+        full (bool) : Whether the full product is built.
+
+    Returns:
+        list: One message per problem, empty if the product can be built.
+
+    """
+    errors = []
+    if operation is None:
+        if numOperands != 1:
+            errors.append("needs an operation to combine its operands")
+    elif operation not in OPERATIONS:
+        errors.append(f"has unknown operation {operation!r}")
+    elif operation == "complement" and numOperands != 1:
+        errors.append("needs exactly one operand for 'complement'")
+    elif operation != "complement" and numOperands < 2:
+        errors.append(f"needs at least two operands for {operation!r}")
+    if m is not None and (isinstance(m, bool) or not isinstance(m, int) or not 0 <= m <= numOperands):
+        errors.append(f"has an invalid atLeast {m!r}, expected a number from 0 to the number of operands")
+    if not isinstance(full, bool):
+        errors.append(f"has an invalid fullProduct {full!r}, expected true or false")
+    return errors
+
+def ProductConstruction(*dfas, operation=None, full=False):
+        """
+        Returns the DFA object after product construction has been applied.
+
+        Any number of DFAs over the same alphabet can be combined in one pass.
+        A product state is a tuple with one state of every operand, and it is
+        accepting when the accept predicate holds for the tuple of their
+        accept flags. The operation may be given as the last positional
+        argument, as in ProductConstruction(l1, l2, 'union').
+
+        By default only the state tuples reachable from the tuple of start
+        states are built. Pass full=True to build the whole cartesian product,
+        which is done with a few NumPy array operations when NumPy is installed.
+        Product states are numbered with ints; their names, e.g. '(r0,q1)',
+        are only built when the result is serialized or its Nodes are used.
+
+        Args:
+            *dfas (DFA) : DFAs for languages.
+            operation (str | function) : 'union', 'intersection', 'xor', 'difference',
+                'complement', a predicate from atLeast or any predicate taking a
+                tuple of accept flags.
+            full (bool) : Build every tuple of states instead of the reachable ones.
+
+        Returns:
+            DFA: A DFA object.
+
+        """
+        dfas = list(dfas)
+        if operation is None and dfas and not isinstance(dfas[-1], DFA):
+            operation = dfas.pop()
+        if not dfas:
+            raise ValueError("At least one DFA is required")
+        for dfa in dfas:
+            if not isinstance(dfa, DFA):
+                raise TypeError("All operands must be instances of the DFA class.")
+        accepts = getAcceptPredicate(operation, len(dfas))
+        phaseStart = time.perf_counter() if _profileHooks else 0.0
+
+        newAlphabet, compiled, columns, ranges = _compileOperands(dfas)
+
+        # A tuple of operand states is numbered by its mixed-radix key
+        # s1*(n2*...*nk) + s2*(n3*...*nk) + ... + sk, so no tuples are built
+        places = []
+        place = 1
+        for c in reversed(compiled):
+            places.append(place)
+            place *= c.numStates
+        places.reverse()
+        numTuples = place
+
+        def getStates(key):
+            """
+            Returns the tuple of operand states of a key.
+
+            Args:
+                key (int) : Mixed-radix key of a tuple of states.
+
+            Returns:
+                tuple: A state number of every operand.
+            """
+            states = []
+            for c in reversed(compiled):
+                key, s = divmod(key, c.numStates)
+                states.append(s)
+            return tuple(reversed(states))
+
+        def getNewNodeName(states):
+            """
+            Returns the name of a tuple of operand states.
+
+            Args:
+                states (tuple) : A state number of every operand.
+
+            Returns:
+                str: New Node name, e.g. '(r0,q1)'.
+            """
+            if len(states) == 1:
+                return compiled[0].stateNames[states[0]]
+            return "(" + ",".join(c.stateNames[s] for c, s in zip(compiled, states)) + ")"
+
+        # Reachable products of fingerprinted operands under a named operation are cached
+        k = len(newAlphabet)
+        cacheKey = None
+        operationKey = operation if isinstance(operation, str) else getattr(accepts, "cacheKey", None)
+        if resultCache.enabled and not full and operationKey is not None:
+            canonical = [_canonicalForm(c) for c in compiled]
+            cacheKey = ResultCache.key("product", operationKey, *(form[2] for form in canonical))
+
+            # Cached tables list the symbols in sorted order
+            rank = {symbol: r for r, symbol in enumerate(sorted(newAlphabet))}
+            symbolRank = [rank[symbol] for symbol in newAlphabet]
+
+            entry = resultCache.get(cacheKey)
+            if entry is not None:
+                cachedTable = entry["table"]
+                cachedStates = entry["states"]
+                numStates = len(entry["accept"])
+                arity = len(compiled)
+                orders = [form[0] for form in canonical]
+                table = array("i", (cachedTable[s * k + r] for s in range(numStates) for r in symbolRank))
+                names = _LazyNames(numStates, lambda i: getNewNodeName(
+                    tuple(orders[x][cachedStates[i * arity + x]] for x in range(arity))))
+                if _profileHooks:
+                    _endPhase("product", phaseStart, {"operands": arity, "states": numStates, "transitions": len(table), "cacheHits": 1})
+                return DFA.fromCompiled(CompiledDFA(newAlphabet, names, table, bytearray(iter(entry["accept"])), 0, ranges))
+
+        # Symbols that every operand reads alike lead to the same tuple, so
+        # the tuples are built over one symbol of every class
+        classOf, firstColumns = _jointSymbolClasses(compiled, columns)
+        numClasses = len(firstColumns)
+        vectorized = _fullProductArrays(compiled, columns, places, classOf, firstColumns, accepts) if full else None
+
+        # Next-state part of the key of every operand state on every class
+        nextParts = [
+            [[c.table[s * c.numSymbols + col[j]] * p for s in range(c.numStates)] for j in firstColumns]
+            for c, col, p in zip(compiled, columns, places)
+        ] if vectorized is None else None
+
+        startKey = sum(c.start * p for c, p in zip(compiled, places))
+        dense = False
+        if full:
+            order = range(numTuples)
+            ids = None
+        elif numTuples <= PRODUCT_DENSE_TUPLES:
+            # Breadth first from the start tuple, numbering tuples in an array
+            # with one int per tuple, which is smaller than a dict entry per
+            # reached tuple unless few of them are reached
+            order = array("q", [startKey])
+            ids = array("i", [-1]) * numTuples
+            ids[startKey] = 0
+            dense = True
+        else:
+            # Breadth first from the start tuple, so unreachable tuples are never built
+            order = [startKey]
+            ids = {startKey: 0}
+
+        if vectorized is not None:
+            table, accept = vectorized
+        else:
+            table = array("i")
+            accept = bytearray()
+            for key in order:
+                states = getStates(key)
+                flags = tuple(c.accept[s] == 1 for c, s in zip(compiled, states))
+                accept.append(1 if accepts(flags) else 0)
+                for j in range(numClasses):
+                    nextKey = 0
+                    for parts, s in zip(nextParts, states):
+                        nextKey += parts[j][s]
+                    if ids is None:
+                        table.append(nextKey)
+                        continue
+                    nextId = ids[nextKey] if dense else ids.get(nextKey, -1)
+                    if nextId < 0:
+                        nextId = ids[nextKey] = len(order)
+                        order.append(nextKey)
+                    table.append(nextId)
+
+            if numClasses < k:
+                # Back to one column per symbol, the column of its class
+                classColumns = [table[c::numClasses] for c in range(numClasses)]
+                table = array("i", (t for row in zip(*(classColumns[c] for c in classOf)) for t in row))
+
+        if cacheKey is not None:
+            positions = [form[1] for form in canonical]
+            cachedStates = array("i")
+            for key in order:
+                cachedStates.extend(position[s] for position, s in zip(positions, getStates(key)))
+            cachedTable = array("i", [0]) * len(table)
+            for s in range(len(order)):
+                for j, r in enumerate(symbolRank):
+                    cachedTable[s * k + r] = table[s * k + j]
+            resultCache.put(cacheKey, {"table": cachedTable, "accept": accept, "states": cachedStates})
+
+        names = _LazyNames(len(order), lambda i: getNewNodeName(getStates(order[i])))
+        start = startKey if ids is None else 0
+        if _profileHooks:
+            _endPhase("product", phaseStart, {"operands": len(compiled), "states": len(order), "transitions": len(table), "symbolClasses": numClasses, "cacheHits": 0})
+        return DFA.fromCompiled(CompiledDFA(newAlphabet, names, table, accept, start, ranges))
+
+def findWitness(*dfas, operation='xor'):
+    """
+    Returns the shortest string accepted by the product of the DFAs.
+
+    The product is explored breadth first and only as far as needed: the
+    search stops at the first reachable tuple of states for which the
+    accept predicate holds. With the default 'xor', findWitness(l1, l2) is a
+    shortest string on which l1 and l2 disagree, and findWitness(dfa) is a
+    shortest string accepted by dfa.
+
+    Args:
+        *dfas (DFA) : DFAs over the same alphabet.
+        operation (str | function) : Accept predicate of the product, as in ProductConstruction.
+
+    Returns:
+        str: The shortest witness, or None if the product accepts nothing.
+
+    """
+    if not dfas:
+        raise ValueError("At least one DFA is required")
+    for dfa in dfas:
+        if not isinstance(dfa, DFA):
+            raise TypeError("All operands must be instances of the DFA class.")
+    accepts = getAcceptPredicate(operation, len(dfas))
+    alphabet, compiled, columns, ranges = _compileOperands(dfas)
+    if ranges is not None:
+        # The first character of every range stands for it
+        alphabet = [chr(pairs[0][0]) for pairs in ranges]
+    # Symbols read alike lead to the same tuples, so one of every class is enough
+    firstColumns = _jointSymbolClasses(compiled, columns)[1]
+
+    start = tuple(c.start for c in compiled)
+    # Tuple of states -> (previous tuple, symbol index), for rebuilding the path
+    parent = {start: None}
+    workList = deque([start])
+    while workList:
+        states = workList.popleft()
+        if accepts(tuple(c.accept[s] == 1 for c, s in zip(compiled, states))):
+            symbols = []
+            while parent[states] is not None:
+                states, j = parent[states]
+                symbols.append(alphabet[j])
+            return "".join(reversed(symbols))
+
+        for j in firstColumns:
+            nextStates = tuple(c.table[s * c.numSymbols + col[j]] for c, col, s in zip(compiled, columns, states))
+            if nextStates not in parent:
+                parent[nextStates] = (states, j)
+                workList.append(nextStates)
+
+    return None
+
+def isEmpty(dfa:DFA):
+    """
+    Returns whether the DFA accepts no string.
+
+    Args:
+        dfa (DFA) : A DFA.
+
+    Returns:
+        bool: True if the language of the DFA is empty.
+
+    """
+    return findWitness(dfa) is None
+
+def isSubset(l1:DFA, l2:DFA):
+    """
+    Returns whether every string accepted by l1 is accepted by l2.
+
+    Use findWitness(l1, l2, operation='difference') for a shortest string
+    accepted by l1 but not by l2.
+
+    Args:
+        l1 (DFA) : A DFA.
+        l2 (DFA) : A DFA over the same alphabet.
+
+    Returns:
+        bool: True if the language of l1 is a subset of the language of l2.
+
+    """
+    return findWitness(l1, l2, operation='difference') is None
+
+def isEquivalent(l1:DFA, l2:DFA):
+    """
+    Returns whether two DFAs accept the same language.
+
+    Use findWitness(l1, l2) for a shortest string on which they disagree.
+
+    Args:
+        l1 (DFA) : A DFA.
+        l2 (DFA) : A DFA over the same alphabet.
+
+    Returns:
+        bool: True if both DFAs accept the same strings.
+
+    """
+    return findWitness(l1, l2) is None
+
+# Most states drawn by main.py --render png or svg, unless --maxStates is given
+RENDER_MAX_STATES = 500
+
+def _symbolRanges(symbols):
+    """
+    Returns a short label for a set of input symbols, e.g. '0-9,a'.
+
+    Runs of three or more single-character symbols with consecutive code
+    points are written as ranges.
+
+    Args:
+        symbols (list) : Input symbols, in alphabet order.
+
+    Returns:
+        str: The label.
+    """
+    parts = []
+    ordered = sorted(symbols, key=lambda symbol: (len(symbol) != 1, ord(symbol) if len(symbol) == 1 else 0, symbol))
+    i = 0
+    while i < len(ordered):
+        j = i
+        if len(ordered[i]) == 1:
+            while j + 1 < len(ordered) and len(ordered[j + 1]) == 1 and ord(ordered[j + 1]) == ord(ordered[j]) + 1:
+                j += 1
+        if j - i >= 2:
+            parts.append(f"{ordered[i]}-{ordered[j]}")
+        else:
+            parts.extend(ordered[i:j + 1])
+        i = j + 1
+    return ",".join(parts)
+
+def graphView(dfa: DFA, maxStates=None, around=None, hideDead=True):
+    """
+    Returns the states and edges to draw for a DFA.
+
+    Parallel edges are merged into one edge labelled with the set of their
+    symbols, or with their character ranges for an alphabet of ranges. Dead states, from which no accepting state can be reached, are
+    left out together with the edges into them. With maxStates, only the
+    states closest to the start state, or to the state around, are kept,
+    following transitions both ways; edges to the other states are merged
+    into one stub edge per state, whose 'to' is None.
+
+    Args:
+        dfa (DFA) : A DFA.
+        maxStates (int) : Most states to keep, or None to keep every state.
+        around (str) : Name of the state to center the view on, by default the start state.
+        hideDead (bool) : True to leave out dead states.
+
+    Returns:
+        dict: 'alphabet', 'start', 'states' (name and accept flag of each
+            kept state), 'edges' (from, to and label), 'hiddenStates' and
+            'deadStates' (numbers of states left out).
+    """
+    if maxStates is not None and maxStates < 1:
+        raise ValueError("maxStates must be positive")
+    compiled = dfa.compile()
+    n = compiled.numStates
+    k = compiled.numSymbols
+    table = compiled.table
+    names = compiled.stateNames
+
+    if around is None:
+        center = compiled.start
+    else:
+        center = compiled.stateIndex.get(around)
+        if center is None:
+            raise ValueError(f"State {around} is not defined")
+
+    dead = list(compiled.stateAnalysis()[1]) if hideDead else [False] * n
+    # Keep the center and the start state even if they are dead
+    dead[center] = False
+    dead[compiled.start] = False
+    numDead = sum(dead)
+
+    if maxStates is None or maxStates >= n - numDead:
+        shown = [s for s in range(n) if not dead[s]]
+    else:
+        # Breadth-first search over transitions in both directions
+        preds = [[] for _ in range(n)]
+        for i in range(n * k):
+            preds[table[i]].append(i // k)
+        order = [center]
+        seen = {center}
+        queue = deque([center])
+        while queue and len(order) < maxStates:
+            s = queue.popleft()
+            for t in itertools.chain(table[s * k:s * k + k], preds[s]):
+                if t not in seen and not dead[t]:
+                    seen.add(t)
+                    order.append(t)
+                    queue.append(t)
+                    if len(order) == maxStates:
+                        break
+        shown = sorted(order)
+
+    def label(symbols):
+        if compiled.ranges is None:
+            return _symbolRanges([compiled.alphabets[c] for c in symbols])
+        # Ranges of different symbols that touch are written as one
+        pairs = []
+        for first, last in sorted(pair for c in symbols for pair in compiled.ranges[c]):
+            if pairs and pairs[-1][1] + 1 == first:
+                pairs[-1] = (pairs[-1][0], last)
+            else:
+                pairs.append((first, last))
+        return _rangesName(pairs)
+
+    isShown = set(shown)
+    edges = []
+    for s in shown:
+        targets = {}
+        more = []
+        for c in range(k):
+            t = table[s * k + c]
+            if dead[t]:
+                continue
+            if t in isShown:
+                targets.setdefault(t, []).append(c)
+            else:
+                more.append(c)
+        for t, symbols in targets.items():
+            edges.append({"from": names[s], "to": names[t], "label": label(symbols)})
+        if more:
+            edges.append({"from": names[s], "to": None, "label": label(more)})
+
+    return {
+        "alphabet": _rangesToJson(list(compiled.alphabets), compiled.ranges),
+        "start": names[compiled.start] if compiled.start in isShown else None,
+        "states": [{"name": names[s], "accept": bool(compiled.accept[s])} for s in shown],
+        "edges": edges,
+        "hiddenStates": n - numDead - len(shown),
+        "deadStates": numDead,
+    }
+
+def _printable(text):
+    """
+    Returns text with every character that is not printable written as an escape.
+
+    U+0000 becomes '\\x00' and U+10FFFF '\\U0010ffff', as in Python literals.
+
+    Args:
+        text (str): Any text.
+
+    Returns:
+        str: The text, with escapes for e.g. control characters and lone surrogates.
+    """
+    if text.isprintable():
+        return text
+    return "".join(char if char.isprintable() else char.encode("unicode_escape", "backslashreplace").decode("ascii")
+                   for char in text)
+
+def _dotQuote(text, limit=None):
+    if limit is not None and len(text) > limit:
+        text = text[:limit - 1] + "\u2026"
+    return '"' + _printable(text).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def toDot(dfa: DFA, maxStates=None, around=None, hideDead=True):
+    """
+    Returns the Graphviz DOT source of a DFA, without running Graphviz.
+
+    The graph is that of graphView. Stub edges lead to a node drawn as
+    '…', and long state names are shortened in the drawing.
+
+    Args:
+        dfa (DFA) : A DFA.
+        maxStates (int) : Most states to draw, or None to draw every state.
+        around (str) : Name of the state to center the view on, by default the start state.
+        hideDead (bool) : True to leave out dead states.
+
+    Returns:
+        str: The DOT source.
+
+    """
+    return _viewToDot(graphView(dfa, maxStates, around, hideDead))
+
+def _viewToDot(view):
+    ids = {state["name"]: f"s{i}" for i, state in enumerate(view["states"])}
+
+    lines = ["digraph {", "\trankdir=LR"]
+    notes = []
+    if view["deadStates"]:
+        notes.append(f"{view['deadStates']} dead states hidden")
+    if view["hiddenStates"]:
+        notes.append(f"{view['hiddenStates']} more states")
+    if notes:
+        lines.append(f"\tlabel={_dotQuote(', '.join(notes))}")
+    # Draw start node (invisible)
+    if view["start"] is not None:
+        lines.append('\tstart [shape=none, label=""]')
+        lines.append(f"\tstart -> {ids[view['start']]}")
+    for state in view["states"]:
+        shape = "doublecircle" if state["accept"] else "circle"
+        lines.append(f"\t{ids[state['name']]} [shape={shape}, label={_dotQuote(state['name'], 40)}]")
+    for i, edge in enumerate(view["edges"]):
+        if edge["to"] is None:
+            lines.append(f'\tmore{i} [shape=plaintext, label="\u2026"]')
+            target = f"more{i}"
+        else:
+            target = ids[edge["to"]]
+        lines.append(f"\t{ids[edge['from']]} -> {target} [label={_dotQuote(edge['label'])}]")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def visualize_dfa(dfa: DFA, filename="dfa_graph", format="png", maxStates=None, around=None, hideDead=True):
+    """
+    Draws a DFA.
+
+    'dot' writes the DOT source to filename.dot and 'json' the graphView
+    to filename.json; neither needs anything else or lays out the graph.
+    'png' and 'svg' render the DOT source with Graphviz, which is only
+    imported here.
+
+    Args:
+        dfa (DFA) : A DFA.
+        filename (str) : Path of the output file, without the extension.
+        format (str) : 'png', 'svg', 'dot' or 'json'.
+        maxStates (int) : Most states to draw, or None to draw every state.
+        around (str) : Name of the state to center the view on, by default the start state.
+        hideDead (bool) : True to leave out dead states.
+
+    Returns:
+        str: Path of the written file.
+
+    """
+    if format not in ("png", "svg", "dot", "json"):
+        raise ValueError(f"Unknown format '{format}'")
+    phaseStart = time.perf_counter() if _profileHooks else 0.0
+
+    view = graphView(dfa, maxStates, around, hideDead)
+    if format == "json":
+        path = filename + ".json"
+        with open(path, "w") as f:
+            json.dump(view, f, indent=4)
+    else:
+        source = _viewToDot(view)
+        if format == "dot":
+            path = filename + ".dot"
+            with open(path, "w") as f:
+                f.write(source)
+        else:
+            try:
+                from graphviz import Source
+            except ImportError:
+                raise ImportError("The graphviz package is required to render png or svg, use format 'dot' instead")
+            # Render to file (creates e.g. 'dfa_graph.png')
+            path = Source(source, format=format).render(filename, cleanup=True)
+    print(f"DFA graph saved to {path}")
+    if _profileHooks:
+        _endPhase("visualize", phaseStart, {"states": len(view["states"]), "edges": len(view["edges"])})
+    return path
+
+#Example
+#q0 = Node('q0', False, {'0':'q0', '1':'q1'})
+#q1 = Node('q1', True, {'0':'q1', '1': 'q1'})
+
+#r0 = Node('r0', False, {'0':'r1', '1':'r2'})
+#r1 = Node('r1', True, {'0':'r1', '1':'r1'})
+#r2 = Node('r2', False, {'0':'r2', '1':'r2'})
+
+#l1 = DFA(['0','1'], r0, {'r0':r0, 'r1':r1, 'r2':r2})
+#l2 = DFA(['0','1'], q0, {'q0':q0, 'q1':q1})
+
+#l3 = ProductConstruction(l1,l2, "union")
+#print(l3.isAccepted('00000002'))
+
+#l3 = ProductConstruction(l1,l2)
+#print(l3.isAccepted('1000000'))
+
+def _raiseErrors(errors, dfaPath, limit=100):
+    """
+    Raises one ValueError that lists every validation error found.
+
+    Args:
+        errors (list): Validation error messages.
+        dfaPath (str): Path of the file that was validated.
+        limit (int): Maximum number of messages included.
+
+    """
+    if not errors:
+        return
+    if len(errors) == 1:
+        raise ValueError(errors[0])
+    lines = errors[:limit]
+    if len(errors) > limit:
+        lines.append(f"... and {len(errors) - limit} more")
+    raise ValueError(f"{len(errors)} errors in {dfaPath}:\n" + "\n".join(lines))
+
+def _readAlphabet(alphabet, errors):
+    """
+    Returns the symbols and code point ranges of an alphabet read from JSON.
+
+    An alphabet is either a list of symbols, or an object mapping the name of
+    every symbol to the character ranges it reads, e.g.
+    {"digit": [["0", "9"]], "other": [["\\u0000", "/"], [":", "\\uffff"]]}.
+    A bound is one character or its code point. The ranges of different
+    symbols must not overlap.
+
+    Args:
+        alphabet (list | dict): The alphabet field.
+        errors (list): Receives validation error messages.
+
+    Returns:
+        tuple: The list of symbols and the ranges of every symbol, or None
+            for a list of symbols.
+    """
+    if isinstance(alphabet, list):
+        if not alphabet:
+            errors.append("Alphabet must be non-empty")
+        return alphabet, None
+    if not isinstance(alphabet, dict) or not alphabet:
+        errors.append("Alphabet must be non-empty")
+        return [], None
+
+    def codePoint(bound):
+        if isinstance(bound, str) and len(bound) == 1:
+            return ord(bound)
+        if isinstance(bound, int) and not isinstance(bound, bool) and 0 <= bound <= sys.maxunicode:
+            return bound
+        return None
+
+    ranges = []
+    spans = []
+    for symbol, pairs in alphabet.items():
+        merged = []
+        if not isinstance(pairs, list) or not pairs:
+            errors.append(f"Ranges of symbol '{symbol}' must be a non-empty list")
+        else:
+            bounds = []
+            for pair in pairs:
+                first, last = (codePoint(pair[0]), codePoint(pair[1])) if isinstance(pair, list) and len(pair) == 2 else (None, None)
+                if first is None or last is None or first > last:
+                    errors.append(f"Range {pair!r} of symbol '{symbol}' must be a pair of characters, the first not after the last")
+                else:
+                    bounds.append((first, last))
+            for first, last in sorted(bounds):
+                if merged and first <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+                else:
+                    merged.append((first, last))
+        ranges.append(tuple(merged))
+        spans.extend((first, last, symbol) for first, last in merged)
+
+    spans.sort()
+    for (_, last, symbol), (first, _, other) in zip(spans, spans[1:]):
+        if first <= last:
+            errors.append(f"Symbols '{symbol}' and '{other}' both read {chr(first)!r}")
+    return list(alphabet), ranges
+
+def _rangesToJson(alphabet, ranges):
+    """
+    Returns an alphabet in the form read by _readAlphabet.
+
+    Args:
+        alphabet (list): Symbols of the DFA.
+        ranges (list): Code point ranges of every symbol, or None.
+
+    Returns:
+        list | dict: The alphabet field.
+    """
+    if ranges is None:
+        return alphabet
+    return {symbol: [[chr(first), chr(last)] for first, last in pairs] for symbol, pairs in zip(alphabet, ranges)}
+
+def _rangesName(pairs):
+    """
+    Returns a name for a set of code point ranges, e.g. '0-9,a-f'.
+
+    Args:
+        pairs (list): Sorted (first, last) code point pairs.
+
+    Returns:
+        str: The name.
+    """
+    return ",".join(_printable(chr(first)) if first == last else _printable(f"{chr(first)}-{chr(last)}") for first, last in pairs)
+
+def parseDFA(dfaPath):
+    """
+    Returns the DFA defined in a JSON file.
+
+    Every check uses sets and dicts, so validation is linear in the size of
+    the file, and all validation errors are reported together. Files ending
+    in '.jsonl' are read line by line with parseDFALines, and files ending in
+    '.dfab' are memory-mapped with parseDFABinary.
+
+    Args:
+        dfaPath (str): Path of the JSON file.
+
+    Returns:
+        DFA: A DFA object.
+
+    """
+    if dfaPath.endswith(".jsonl"):
+        return parseDFALines(dfaPath)
+    if dfaPath.endswith(BINARY_EXTENSION):
+        return parseDFABinary(dfaPath)
+    if not os.path.exists(dfaPath):
+        raise FileNotFoundError(f"File {dfaPath} does not exist")
+    phaseStart = time.perf_counter() if _profileHooks else 0.0
+    
+    with open(dfaPath, 'r') as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {dfaPath}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"Expected a JSON object in {dfaPath}")
+    
+    fields = ["alphabet", "states", "startState", "acceptStates", "transitions"]
+    _raiseErrors([f"Missing required field '{field}' in {dfaPath}" for field in fields if field not in config], dfaPath)
+    
+    #required fields in json
+    alphabet = config["alphabet"]
+    states = config["states"]
+    startState = config["startState"]
+    acceptStates = config["acceptStates"]
+    transitions = config["transitions"]
+    del config
+
+    errors = []
+    alphabet, ranges = _readAlphabet(alphabet, errors)
+    if not isinstance(states, list) or not states:
+        errors.append("States must be non-empty")
+    if not isinstance(acceptStates, list):
+        errors.append("Accept states must be a list")
+    if not isinstance(transitions, dict):
+        errors.append("Transitions must be a dictionary")
+    _raiseErrors(errors, dfaPath)
+
+    # Number the states, so every membership check below is a dict lookup
+    stateIndex = {}
+    for state in states:
+        if not isinstance(state, str):
+            errors.append(f"State {state!r} must be a string")
+        elif state not in stateIndex:
+            stateIndex[state] = len(stateIndex)
+
+    if not isinstance(startState, str) or startState not in stateIndex:
+        errors.append("Start state must be a defined state")
+    accept = bytearray(len(stateIndex))
+    for state in acceptStates:
+        if not isinstance(state, str) or state not in stateIndex:
+            errors.append(f"Accept state {state} must be a defined state")
+        else:
+            accept[stateIndex[state]] = 1
+
+    table = array("i")
+    for state in stateIndex:
+        rules = transitions.get(state)
+        if rules is None:
+            errors.append(f"No transitions defined for state {state}")
+            table.extend([0] * len(alphabet))
+            continue
+        if not isinstance(rules, dict):
+            errors.append(f"Transitions for state {state} must be a dictionary")
+            table.extend([0] * len(alphabet))
+            continue
+        for symbol in alphabet:
+            if symbol not in rules:
+                errors.append(f"No transition for symbol '{symbol}' in state {state}")
+                table.append(0)
+                continue
+            nextState = rules[symbol]
+            if not isinstance(nextState, str) or nextState not in stateIndex:
+                errors.append(f"Transition for {state} on '{symbol}' points to invalid state {nextState}")
+                table.append(0)
+                continue
+            table.append(stateIndex[nextState])
+    _raiseErrors(errors, dfaPath)
+
+    compiled = CompiledDFA(alphabet, list(stateIndex), table, accept, stateIndex[startState], ranges)
+    if _profileHooks:
+        _endPhase("parse", phaseStart, {"states": compiled.numStates, "transitions": len(table), "bytes": os.path.getsize(dfaPath)})
+    return DFA.fromCompiled(compiled)
+
+def parseDFALines(dfaPath):
+    """
+    Returns the DFA defined in a line-delimited JSON file.
+
+    The first line holds the alphabet and start state, and every further
+    line holds one state:
+
+        {"alphabet": ["0", "1"], "startState": "q0"}
+        {"state": "q0", "accept": false, "transitions": {"0": "q0", "1": "q1"}}
+        {"state": "q1", "accept": true, "transitions": {"0": "q1", "1": "q1"}}
+
+    The file is read one line at a time and every state goes straight into
+    the transition table, so only the table is kept in memory. States may be
+    referred to before the line that defines them. All validation errors
+    are reported together.
+
+    Args:
+        dfaPath (str): Path of the line-delimited JSON file.
+
+    Returns:
+        DFA: A DFA object.
+
+    """
+    if not os.path.exists(dfaPath):
+        raise FileNotFoundError(f"File {dfaPath} does not exist")
+    phaseStart = time.perf_counter() if _profileHooks else 0.0
+
+    errors = []
+    decode = json.JSONDecoder().decode
+    with open(dfaPath, 'r') as f:
+        try:
+            header = decode(f.readline())
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line 1 of {dfaPath}: {e}")
+        if not isinstance(header, dict):
+            raise ValueError(f"Line 1 of {dfaPath} must be a JSON object")
+        _raiseErrors([f"Missing required field '{field}' in {dfaPath}" for field in ("alphabet", "startState") if field not in header], dfaPath)
+
+        alphabet, ranges = _readAlphabet(header["alphabet"], errors)
+        startState = header["startState"]
+        _raiseErrors(errors, dfaPath)
+        k = len(alphabet)
+
+        # States are numbered when first seen, whether defined or referred to
+        stateIndex = {}
+        names = []
+        table = array("i")
+        accept = bytearray()
+        defined = []
+        definedOrder = []
+        # First transition that refers to each state not defined yet
+        pending = {}
+
+        def getStateNumber(name):
+            state = stateIndex.get(name)
+            if state is None:
+                state = stateIndex[name] = len(names)
+                names.append(name)
+                table.extend([0] * k)
+                accept.append(0)
+                defined.append(False)
+            return state
+
+        for lineNumber, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            try:
+                entry = decode(line)
+            except json.JSONDecodeError as e:
+                errors.append(f"Invalid JSON on line {lineNumber}: {e}")
+                continue
+            if not isinstance(entry, dict) or not isinstance(entry.get("state"), str):
+                errors.append(f"Line {lineNumber} must be an object with a 'state' name")
+                continue
+
+            name = entry["state"]
+            state = stateIndex.get(name)
+            if state is None:
+                state = getStateNumber(name)
+            if defined[state]:
+                errors.append(f"State {name} is defined twice (line {lineNumber})")
+                continue
+            defined[state] = True
+            definedOrder.append(state)
+            pending.pop(state, None)
+
+            isAccept = entry.get("accept", False)
+            if not isinstance(isAccept, bool):
+                errors.append(f"Accept flag of state {name} must be a boolean")
+            accept[state] = 1 if isAccept is True else 0
+
+            rules = entry.get("transitions")
+            if not isinstance(rules, dict):
+                errors.append(f"Transitions for state {name} must be a dictionary")
+                continue
+            row = state * k
+            for c, symbol in enumerate(alphabet):
+                nextState = rules.get(symbol)
+                if nextState is None:
+                    errors.append(f"No transition for symbol '{symbol}' in state {name}")
+                    continue
+                if not isinstance(nextState, str):
+                    errors.append(f"Transition for {name} on '{symbol}' points to invalid state {nextState}")
+                    continue
+                target = stateIndex.get(nextState)
+                if target is None:
+                    target = getStateNumber(nextState)
+                if not defined[target] and target not in pending:
+                    pending[target] = (name, symbol)
+                table[row + c] = target
+
+    if not names:
+        errors.append("States must be non-empty")
+    for target, (name, symbol) in pending.items():
+        errors.append(f"Transition for {name} on '{symbol}' points to invalid state {names[target]}")
+    if not isinstance(startState, str) or startState not in stateIndex or not defined[stateIndex[startState]]:
+        errors.append("Start state must be a defined state")
+    acceptStates = header.get("acceptStates", [])
+    if not isinstance(acceptStates, list):
+        errors.append("Accept states must be a list")
+        acceptStates = []
+    for name in acceptStates:
+        if not isinstance(name, str) or name not in stateIndex or not defined[stateIndex[name]]:
+            errors.append(f"Accept state {name} must be a defined state")
+        else:
+            accept[stateIndex[name]] = 1
+    _raiseErrors(errors, dfaPath)
+
+    # Renumber the states in the order of their lines
+    if definedOrder != list(range(len(names))):
+        newId = [0] * len(names)
+        for i, state in enumerate(definedOrder):
+            newId[state] = i
+        names = [names[state] for state in definedOrder]
+        accept = bytearray(accept[state] for state in definedOrder)
+        table = array("i", (newId[table[state * k + c]] for state in definedOrder for c in range(k)))
+        stateIndex = {name: i for i, name in enumerate(names)}
+
+    compiled = CompiledDFA(alphabet, names, table, accept, stateIndex[startState], ranges)
+    if _profileHooks:
+        _endPhase("parse", phaseStart, {"states": compiled.numStates, "transitions": len(table), "bytes": os.path.getsize(dfaPath)})
+    return DFA.fromCompiled(compiled)
+
+def parseDFABinary(dfaPath):
+    """
+    Returns the DFA stored in a binary file written by DFA.saveBinary.
+
+    The file is memory-mapped, and the transition matrix and accept flags
+    are used in place as the table of the DFA without being copied. They
+    are checked once, so that every transition leads to a state. State
+    names are only decoded when they are needed.
+
+    Args:
+        dfaPath (str): Path of the binary file.
+
+    Returns:
+        DFA: A DFA object.
+
+    """
+    if not os.path.exists(dfaPath):
+        raise FileNotFoundError(f"File {dfaPath} does not exist")
+    phaseStart = time.perf_counter() if _profileHooks else 0.0
+
+    with open(dfaPath, "rb") as f:
+        if os.path.getsize(dfaPath) < _BINARY_HEADER.size:
+            raise ValueError(f"{dfaPath} is not a binary DFA file")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        n, k, start, layout, alphabets, ranges = _checkBinaryFile(mapped, dfaPath)
+    except BaseException:
+        mapped.close()
+        raise
 
-            alphabet = l1.alphabets
-            res = {}
-            for ch in alphabet:
-                res[ch] = node1.rules[ch] + node2.rules[ch] #appends the name of the new node to the dictionary  
-            # print(res)
-            return res              
+    view = memoryview(mapped)
+    sections = [view[offset:offset + length] for offset, length in zip(layout[::2], layout[1::2])]
+    _, nameOffsets, nameBytes, accept, table = sections
+    nameOffsets = nameOffsets.cast("Q")
+    table = table.cast("i")
+    if sys.byteorder != "little":
+        nameOffsets = array("Q", nameOffsets)
+        nameOffsets.byteswap()
+        table = array("i", table)
+        table.byteswap()
 
-        def getNewstateList(l1, l2):
-            """
-            Returns the a dictionary of new Node objects after product construction.
+    # Names are decoded when first read; a damaged name is escaped, not fatal
+    names = _LazyNames(n, lambda i: bytes(nameBytes[nameOffsets[i]:nameOffsets[i + 1]]).decode("utf-8", "backslashreplace"))
+    if _profileHooks:
+        _endPhase("parse", phaseStart, {"states": n, "transitions": n * k, "bytes": len(mapped)})
+    return DFA.fromCompiled(CompiledDFA(alphabets, names, table, accept, start, ranges))
 
-            Args:
-                l1 (DFA) : A DFA.
-                l2 (DFA) : A DFA.
-            
-            Returns:
-                dict: A dictionary mapping each name of state to the Node object.
-            """
-            
-            newstateList = {}
-            for node1 in l1.stateList.values():
-                for node2 in l2.stateList.values():
-                    newNodeName = getNewNodeName(node1, node2)
-                    newNodeAcceptState = getNewAcceptState(node1, node2, operation)
-                    # print("For node: ", newNodeName, "The rule list is: ")
-                    newRules = getNewRules(node1, node2)
-                    newstateList[newNodeName] = Node(newNodeName, newNodeAcceptState, newRules)
-            
-            return newstateList
-        
-        newAlphabet = l1.alphabets #does not matter since it has to be equal anyways
-        newstateList = getNewstateList(l1, l2)
-        newStartNodeName = getNewNodeName(l1.start, l2.start)
-        newStartNode = newstateList[newStartNodeName]
+def _checkBinaryFile(mapped, dfaPath):
+    """
+    Checks the header and sections of a memory-mapped binary DFA file.
 
-        newDFA = DFA(newAlphabet, newStartNode, newstateList)
-        return newDFA
+    Everything that is later used without checks is checked here once: the
+    sections lie inside the file and have the sizes of the header, name
+    offsets grow and stay inside the names, accept flags are 0 or 1 and
+    every transition and the start state are states. No buffer of the map
+    is kept, so it can be closed if the file is rejected.
 
-def visualize_dfa(dfa: DFA, filename="dfa_graph"):
-    dot = Digraph(format='png')
-    
-    # Draw start node (invisible)
-    dot.node('', shape='none')
-    dot.edge('', dfa.start.name)
+    Args:
+        mapped (mmap.mmap): The mapped file.
+        dfaPath (str): Path of the file, for messages.
 
-    for name, node in dfa.stateList.items():
-        shape = "doublecircle" if node.acceptState else "circle"
-        dot.node(name, shape=shape)
+    Returns:
+        tuple: numStates, numSymbols, start, the (offset, length) layout of
+        the sections, the symbols and their ranges or None.
 
-    for state_name, node in dfa.stateList.items():
-        for symbol, dest in node.rules.items():
-            dot.edge(state_name, dest, label=symbol)
+    """
+    corrupt = ValueError(f"Truncated or corrupt binary DFA file {dfaPath}")
+    header = _BINARY_HEADER.unpack_from(mapped, 0)
+    magic, version, n, k, start = header[:5]
+    layout = header[5:]
+    if magic != _BINARY_MAGIC:
+        raise ValueError(f"{dfaPath} is not a binary DFA file")
+    if version != _BINARY_VERSION:
+        raise ValueError(f"Unsupported binary DFA version {version} in {dfaPath}")
+    if any(offset < _BINARY_HEADER.size or offset + length > len(mapped) for offset, length in zip(layout[::2], layout[1::2])):
+        raise corrupt
+    if layout[3] != (n + 1) * 8 or layout[7] != n or layout[9] != n * k * 4 or start >= n:
+        raise corrupt
 
-    # Render to file (creates 'dfa_graph.png')
-    dot.render(filename, cleanup=True)
-    print(f"DFA graph saved to {filename}.png")
+    try:
+        alphabets = json.loads(mapped[layout[0]:layout[0] + layout[1]].decode("utf-8"))
+        ranges = None
+        if isinstance(alphabets, dict):
+            ranges = [tuple((int(first), int(last)) for first, last in pairs) for pairs in alphabets["ranges"]]
+            alphabets = alphabets["symbols"]
+    except (ValueError, TypeError, KeyError):
+        raise corrupt from None
+    if (not isinstance(alphabets, list) or len(alphabets) != k or not all(isinstance(symbol, str) for symbol in alphabets)
+            or (ranges is not None and (len(ranges) != k or not all(0 <= first <= last <= 0x10FFFF for pairs in ranges for first, last in pairs)))):
+        raise corrupt
 
-#Example
-#q0 = Node('q0', False, {'0':'q0', '1':'q1'})
-#q1 = Node('q1', True, {'0':'q1', '1': 'q1'})
+    if mapped[layout[6]:layout[6] + n].translate(None, b"\0\1"):
+        raise corrupt
 
-#r0 = Node('r0', False, {'0':'r1', '1':'r2'})
-#r1 = Node('r1', True, {'0':'r1', '1':'r1'})
-#r2 = Node('r2', False, {'0':'r2', '1':'r2'})
+    # Name offsets and the table are read in place with NumPy, or in chunks
+    if np is not None:
+        offsets = np.frombuffer(mapped, dtype="<u8", count=n + 1, offset=layout[2])
+        increasing = bool(offsets[0] == 0 and offsets[n] == layout[5] and (offsets[1:] >= offsets[:-1]).all())
+        del offsets
+    else:
+        offsets = array("Q")
+        offsets.frombytes(mapped[layout[2]:layout[2] + layout[3]])
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        increasing = offsets[0] == 0 and offsets[n] == layout[5] and all(a <= b for a, b in zip(offsets, itertools.islice(offsets, 1, None)))
+    if not increasing:
+        raise corrupt
 
-#l1 = DFA(['0','1'], r0, {'r0':r0, 'r1':r1, 'r2':r2})
-#l2 = DFA(['0','1'], q0, {'q0':q0, 'q1':q1})
+    chunk = 1 << 22
+    for first in range(layout[8], layout[8] + layout[9], chunk):
+        if np is not None:
+            values = np.frombuffer(mapped, dtype="<i4", count=min(chunk, layout[8] + layout[9] - first) // 4, offset=first)
+            low, high = int(values.min()), int(values.max())
+            del values
+        else:
+            values = array("i")
+            values.frombytes(mapped[first:min(first + chunk, layout[8] + layout[9])])
+            if sys.byteorder != "little":
+                values.byteswap()
+            low, high = min(values), max(values)
+        if low < 0 or high >= n:
+            raise corrupt
+    return n, k, start, layout, alphabets, ranges
 
-#l3 = ProductConstruction(l1,l2, "union")
-#print(l3.isAccepted('00000002'))
+def jsonToBinary(jsonPath, binaryPath):
+    """
+    Converts a JSON (or .jsonl) DFA file to the binary format.
 
-#l3 = ProductConstruction(l1,l2)
-#print(l3.isAccepted('1000000'))
+    Args:
+        jsonPath (str): Path of the JSON file.
+        binaryPath (str): Path of the binary file to write.
 
-def parseDFA(dfaPath):
-    if not os.path.exists(dfaPath):
-        raise FileNotFoundError(f"File {dfaPath} does not exist")
-    
-    with open(dfaPath, 'r') as f:
-        try:
-            config = json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in {dfaPath}: {e}")
-    
-    fields = ["alphabet", "states", "startState", "acceptStates", "transitions"]
-    for field in fields:
-        if field not in config:
-            raise ValueError(f"Missing required field '{field}' in {dfaPath}")
-    
-    #required fields in json
-    alphabet = config["alphabet"]
-    states = config["states"]
-    startState = config["startState"]
-    acceptStates = config["acceptStates"]
-    transitions = config["transitions"]
+    """
+    parseDFA(jsonPath).saveBinary(binaryPath)
 
-    if not isinstance(alphabet, list) or not alphabet:
-        raise ValueError("Alphabet must be non-empty")
-    if not isinstance(states, list) or not states:
-        raise ValueError("States must be non-empty")
-    if startState not in states:
-        raise ValueError("Start state must be a defined state")
-    if not isinstance(acceptStates, list):
-        raise ValueError("Accept states must be a list")
-    for state in acceptStates:
-        if state not in states:
-            raise ValueError(f"Accept state {state} mnust be a defined state")
-    if not isinstance(transitions, dict):
-        raise ValueError("Transitions must be a dictionary")
-    
-    stateList = {}
-    for state in states:
-        if state not in transitions:
-            raise ValueError(f"No transitions defined for state {state}")
-        rules = transitions[state]
-        if not isinstance(rules, dict):
-            raise ValueError(f"Transitions for state {state} must be a dictionary")
-        for symbol in alphabet:
-            if symbol not in rules:
-                raise ValueError(f"No transition for symbol '{symbol}' in state {state}")
-            nextState = rules[symbol]
-            if nextState not in states:
-                raise ValueError(f"Transition for {state} on '{symbol}' points to invalid state {nextState}")
-        
-        isAccept = state in acceptStates
-        stateList[state] = Node(state, isAccept, rules)
+def binaryToJson(binaryPath, jsonPath):
+    """
+    Converts a binary DFA file to the JSON format.
 
-    startNode = stateList[startState]
-    return DFA(alphabet, startNode, stateList)
+    Args:
+        binaryPath (str): Path of the binary file.
+        jsonPath (str): Path of the JSON file to write.
 
-def minimizeDFA(dfa:DFA):
     """
-    Minimizes the given Deterministic Finite Automaton (DFA) by merging equivalent states.
+    parseDFABinary(binaryPath).saveJson(jsonPath)
 
-    This function uses the standard table-filling algorithm to determine distinguishable 
-    state pairs, then applies union-find to group equivalent (indistinguishable) states.
-    It constructs and returns a new DFA with the minimal number of states that recognizes 
-    the same language as the input DFA.
+def _tableFillingGroups(dfa:DFA, stats=None):
+    """
+    Groups equivalent states with the pairwise table-filling algorithm.
 
     Args:
         dfa (DFA): The DFA to be minimized.
+        stats (dict): If given, receives the number of 'refinementRounds' and 'pairsMarked'.
 
     Returns:
-        DFA: A new minimized DFA equivalent to the input DFA.
+        list: Lists of the names of equivalent states.
     """
 
-    if not isinstance(dfa, DFA):
-        raise TypeError("dfa must be of type DFA")
-
     # Get list of all DFA states
     states = list(dfa.stateList.values())
 
@@ -398,7 +3782,9 @@ def minimizeDFA(dfa:DFA):
     } - distinguishable
 
     # Iteratively mark more distinguishable pairs by propagating through transitions
+    rounds = 0
     while True:
+        rounds += 1
         change = False
         new_marks = set()
         for pair in undistinguishable:
@@ -416,6 +3802,10 @@ def minimizeDFA(dfa:DFA):
         distinguishable.update(new_marks)
         undistinguishable -= new_marks
 
+    if stats is not None:
+        stats["refinementRounds"] = rounds
+        stats["pairsMarked"] = len(distinguishable)
+
     # Union-Find initialization to group equivalent states
     parent = {name: name for name in dfa.stateList}
 
@@ -438,42 +3828,886 @@ def minimizeDFA(dfa:DFA):
         union(a, b)
 
     # Group states by their representative (leader)
-    grouped_states = defaultdict(set)
+    grouped_states = defaultdict(list)
     for state_name in dfa.stateList:
         leader = find(state_name)
-        grouped_states[leader].add(state_name)
-
-    # Map old state names to new merged names
-    name_map = {}
-    for leader, members in grouped_states.items():
-        new_name = "_".join(sorted(members))
-        for member in members:
-            name_map[member] = new_name
-
-    # Construct the new minimized DFA state dictionary
-    new_state_dict = {}
-    for merged_name in set(name_map.values()):
-        sample_state_name = next(k for k, v in name_map.items() if v == merged_name)
-        sample_node = dfa.stateList[sample_state_name]
-        
-        # Build transitions using mapped merged state names
-        new_rules = {
-            symbol: name_map[sample_node.rules[symbol]] for symbol in dfa.alphabets
-        }
+        grouped_states[leader].append(state_name)
+
+    return list(grouped_states.values())
+
+def _hopcroftBlocks(compiled:CompiledDFA, stats=None, initial=None):
+    """
+    Computes the coarsest partition of equivalent states by Hopcroft's algorithm.
+
+    The partition is kept as one array of states in which every block is a
+    contiguous slice, so splitting a block only moves the marked states to
+    its front. A block is refined by the predecessors of a splitter block on
+    one symbol, and after a split only the smaller half is added as a new
+    splitter, which bounds the work by O(n*k*log n).
+
+    Args:
+        compiled (CompiledDFA): The compiled DFA to partition.
+        stats (dict): If given, receives the number of 'refinementRounds',
+            one per splitter processed, and of 'blocksSplit'.
+        initial (list): Label of every state number. States start in one
+            block per label instead of by their accept flags.
+
+    Returns:
+        array: Block number of every state number.
+    """
+
+    n = compiled.numStates
+    k = compiled.numSymbols
+    table = compiled.table
+    accept = compiled.accept
+
+    # Predecessors on every symbol, stored as offsets into one flat array per
+    # symbol; per-state data is kept in C int arrays, 4 bytes per entry
+    predOffsets = []
+    predSources = []
+    for c in range(k):
+        offsets = array("i", [0]) * (n + 1)
+        for s in range(n):
+            offsets[table[s * k + c] + 1] += 1
+        for t in range(n):
+            offsets[t + 1] += offsets[t]
+        fill = offsets[:-1]
+        sources = array("i", [0]) * n
+        for s in range(n):
+            t = table[s * k + c]
+            sources[fill[t]] = s
+            fill[t] += 1
+        predOffsets.append(offsets)
+        predSources.append(sources)
+
+    # Initial partition: accepting and non-accepting states, or the given labels
+    if initial is None:
+        groups = [[s for s in range(n) if accept[s]], [s for s in range(n) if not accept[s]]]
+    else:
+        groupOf = {}
+        for s in range(n):
+            groupOf.setdefault(initial[s], []).append(s)
+        groups = list(groupOf.values())
+    elems = array("i")
+    first = array("i")
+    end = array("i")
+    for group in groups:
+        if group:
+            first.append(len(elems))
+            elems.extend(group)
+            end.append(len(elems))
+    del groups
+    loc = array("i", [0]) * n
+    for i, s in enumerate(elems):
+        loc[s] = i
+
+    blockOf = array("i", [0]) * n
+    for b in range(len(first)):
+        for i in range(first[b], end[b]):
+            blockOf[elems[i]] = b
+    marked = array("i", [0]) * len(first)
+
+    # Every splitter (block, symbol) waiting to be processed, as block * k + symbol,
+    # and a flag per splitter; all blocks but the largest to start
+    waiting = deque()
+    inWaiting = bytearray(len(first) * k)
+    if len(first) > 1:
+        largest = max(range(len(first)), key=lambda b: end[b] - first[b])
+        for b in range(len(first)):
+            if b != largest:
+                for c in range(k):
+                    waiting.append(b * k + c)
+                    inWaiting[b * k + c] = 1
+
+    initialBlocks = len(first)
+    rounds = 0
+    while waiting:
+        rounds += 1
+        key = waiting.popleft()
+        inWaiting[key] = 0
+        splitter, c = divmod(key, k)
+
+        # Collect the predecessors before any block, the splitter included, is changed
+        offsets = predOffsets[c]
+        sources = predSources[c]
+        predecessors = []
+        for i in range(first[splitter], end[splitter]):
+            t = elems[i]
+            predecessors.extend(sources[offsets[t]:offsets[t + 1]])
+
+        # Move every predecessor to the marked front of its block
+        touched = []
+        for s in predecessors:
+            b = blockOf[s]
+            i = loc[s]
+            j = first[b] + marked[b]
+            if i < j:
+                continue
+            if marked[b] == 0:
+                touched.append(b)
+            other = elems[j]
+            elems[i], elems[j] = other, s
+            loc[other], loc[s] = i, j
+            marked[b] += 1
+
+        # Split every block that is only partly marked
+        for b in touched:
+            size = end[b] - first[b]
+            count = marked[b]
+            marked[b] = 0
+            if count == size:
+                continue
+            newBlock = len(first)
+            first.append(first[b])
+            end.append(first[b] + count)
+            marked.append(0)
+            inWaiting.extend(bytes(k))
+            first[b] += count
+            for i in range(first[newBlock], end[newBlock]):
+                blockOf[elems[i]] = newBlock
+
+            for d in range(k):
+                if inWaiting[b * k + d]:
+                    waiting.append(newBlock * k + d)
+                    inWaiting[newBlock * k + d] = 1
+                else:
+                    smaller = newBlock if count <= size - count else b
+                    waiting.append(smaller * k + d)
+                    inWaiting[smaller * k + d] = 1
+
+    if stats is not None:
+        stats["refinementRounds"] = rounds
+        stats["blocksSplit"] = len(first) - initialBlocks
+    return blockOf
+
+def _cachedHopcroftBlocks(compiled:CompiledDFA, stats=None):
+    """
+    Returns the Hopcroft partition of a compiled DFA, consulting resultCache.
+
+    Only DFAs whose states are all reachable are cached, since the
+    fingerprint covers just the reachable part. Blocks are stored by
+    canonical state number and mapped back to this DFA's numbering.
+
+    Args:
+        compiled (CompiledDFA): The compiled DFA to partition.
+        stats (dict): Passed to _hopcroftBlocks; also receives 'cacheHits'.
+
+    Returns:
+        array: Block number of every state number.
+    """
+    # Refining by one symbol of every class gives the same partition
+    narrow = compiled.compressed()
+    if stats is not None:
+        stats["symbolClasses"] = narrow.numSymbols
+    if not resultCache.enabled:
+        return _hopcroftBlocks(narrow, stats)
+    order, position, digest = _canonicalForm(compiled)
+    if len(order) != compiled.numStates:
+        return _hopcroftBlocks(narrow, stats)
+
+    cacheKey = ResultCache.key("minimize", digest)
+    entry = resultCache.get(cacheKey)
+    if entry is not None:
+        if stats is not None:
+            stats["cacheHits"] = 1
+        blocks = entry["blocks"]
+        return array("i", (blocks[p] for p in position))
+
+    blockOf = _hopcroftBlocks(narrow, stats)
+    resultCache.put(cacheKey, {"blocks": array("i", (blockOf[s] for s in order))})
+    return blockOf
+
+def _trimmed(compiled:CompiledDFA):
+    """
+    Returns the part of a compiled DFA that minimization has to refine.
+
+    States that cannot be reached from the start state are dropped, and all
+    reachable dead states, which are equivalent, are merged into one sink.
+
+    Args:
+        compiled (CompiledDFA): A compiled DFA.
+
+    Returns:
+        tuple: The trimmed CompiledDFA, or compiled itself if nothing was
+        trimmed, and the number in it of every state of compiled, -1 for
+        dropped states.
+    """
+    reachable, dead, _ = compiled.stateAnalysis()
+    n = compiled.numStates
+    k = compiled.numSymbols
+    newId = array("i", [-1]) * n
+    kept = array("i")
+    sink = -1
+    for s in range(n):
+        if not reachable[s]:
+            continue
+        if dead[s]:
+            if sink < 0:
+                sink = len(kept)
+                kept.append(s)
+            newId[s] = sink
+        else:
+            newId[s] = len(kept)
+            kept.append(s)
+    if len(kept) == n:
+        return compiled, newId
+
+    table = compiled.table
+    trimmedTable = array("i", (newId[t] for s in kept for t in table[s * k:s * k + k]))
+    stateNames = compiled.stateNames
+    names = _LazyNames(len(kept), lambda i: stateNames[kept[i]])
+    trimmed = CompiledDFA(compiled.alphabets, names, trimmedTable, bytearray(compiled.accept[s] for s in kept),
+                          newId[compiled.start], compiled.ranges)
+    return trimmed, newId
+
+def _quotientDFA(compiled:CompiledDFA, blockOf):
+    """
+    Returns the DFA that merges every block of equivalent states into one state.
+
+    Merged states are numbered in the order of their first member. Their
+    names join the sorted names of the members with '_' and are only built
+    when needed. States in block -1 are left out; no kept state may lead
+    to them. If the state analysis of compiled is known, the result gets
+    its own without another pass.
+
+    Args:
+        compiled (CompiledDFA): The compiled DFA that was partitioned.
+        blockOf (list): Block number of every state number.
+
+    Returns:
+        DFA: The DFA of the blocks.
+    """
+    # Number the blocks in the order of their first state
+    newId = array("i", [-1]) * (max(blockOf, default=-1) + 1)
+    firstMember = array("i")
+    sizes = array("i")
+    accept = bytearray()
+    for state, block in enumerate(blockOf):
+        if block < 0:
+            continue
+        merged = newId[block]
+        if merged < 0:
+            merged = newId[block] = len(firstMember)
+            firstMember.append(state)
+            sizes.append(0)
+            accept.append(0)
+        sizes[merged] += 1
+        # Merged states accept if any member does
+        if compiled.accept[state]:
+            accept[merged] = 1
+
+    # Members of merged state i are members[offsets[i]:offsets[i + 1]]
+    offsets = array("i", [0]) * (len(sizes) + 1)
+    for i, size in enumerate(sizes):
+        offsets[i + 1] = offsets[i] + size
+    fill = offsets[:-1]
+    members = array("i", [0]) * offsets[-1]
+    for state, block in enumerate(blockOf):
+        if block >= 0:
+            merged = newId[block]
+            members[fill[merged]] = state
+            fill[merged] += 1
+    del fill, sizes
+
+    # Build transitions from one member, mapped to the merged states
+    k = compiled.numSymbols
+    table = array("i")
+    for state in firstMember:
+        table.extend(newId[blockOf[t]] for t in compiled.table[state * k:state * k + k])
+
+    stateNames = compiled.stateNames
+    names = _LazyNames(len(firstMember), lambda i: "_".join(sorted(stateNames[state] for state in members[offsets[i]:offsets[i + 1]])))
+    start = newId[blockOf[compiled.start]]
+    result = CompiledDFA(compiled.alphabets, names, table, accept, start, compiled.ranges)
+
+    analysis = getattr(compiled, "_analysis", None)
+    if analysis is not None:
+        # Equivalent states are alike in being dead or universal
+        result._analysis = tuple(bytearray(flags[state] for state in firstMember) for flags in analysis)
+        result._sink = bytes(compiled._sink[state] for state in firstMember)
+    return DFA.fromCompiled(result)
+
+def minimizeDFA(dfa:DFA, method="hopcroft"):
+    """
+    Minimizes the given Deterministic Finite Automaton (DFA) by merging equivalent states.
+
+    By default equivalent states are found with Hopcroft's partition refinement,
+    which runs in O(n*k*log n). method='table' selects the standard table-filling
+    algorithm, which determines distinguishable state pairs and then applies
+    union-find to group equivalent states; it is kept for cross-checking.
+    Both construct and return a new DFA with the minimal number of states that
+    recognizes the same language as the input DFA. States that cannot be
+    reached from the start state are left out, and dead states, from which
+    no accepting state can be reached, are merged into one before the
+    refinement starts.
+
+    Args:
+        dfa (DFA): The DFA to be minimized.
+        method (str): 'hopcroft'(default) or 'table'.
 
-        # Determine if any of the merged states were accepting
-        group_members = grouped_states[find(sample_state_name)]
-        is_accepting = any(dfa.stateList[name].acceptState for name in group_members)
+    Returns:
+        DFA: A new minimized DFA equivalent to the input DFA.
+    """
 
-        # Create the new Node for the merged state
-        new_state_dict[merged_name] = Node(merged_name, is_accepting, new_rules)
+    if not isinstance(dfa, DFA):
+        raise TypeError("dfa must be of type DFA")
 
-    # Define the new start state
-    new_start_node = new_state_dict[name_map[dfa.start.name]]
+    phaseStart = time.perf_counter() if _profileHooks else 0.0
+    stats = {"cacheHits": 0} if _profileHooks else None
+    compiled = dfa.compile()
+    if method == "hopcroft":
+        trimmed, newId = _trimmed(compiled)
+        blocks = _cachedHopcroftBlocks(trimmed, stats)
+        blockOf = array("i", (blocks[i] if i >= 0 else -1 for i in newId))
+        if stats is not None:
+            stats["statesTrimmed"] = compiled.numStates - trimmed.numStates
+    elif method == "table":
+        blockOf = [0] * compiled.numStates
+        for block, members in enumerate(_tableFillingGroups(dfa, stats)):
+            for name in members:
+                blockOf[compiled.stateIndex[name]] = block
+        reachable = compiled.stateAnalysis()[0]
+        blockOf = [block if reachable[s] else -1 for s, block in enumerate(blockOf)]
+    else:
+        raise ValueError("method must be 'hopcroft' or 'table'")
 
-    # Return the minimized DFA
-    return DFA(dfa.alphabets, new_start_node, new_state_dict)
+    result = _quotientDFA(compiled, blockOf)
+    if stats is not None:
+        after = result.compile().numStates
+        stats.update(statesBefore=compiled.numStates, statesAfter=after, statesMerged=compiled.numStates - after)
+        _endPhase("minimize", phaseStart, stats)
+    return result
     
+class _IncrementalMinimizer:
+    """
+    An editable copy of a DFA that keeps its minimal DFA up to date.
+
+    The minimal DFA is kept as a partition of the states into blocks of
+    equivalent states, with one transition row per block and a dict from
+    every row (accept flag and next blocks) to its block. In a minimal DFA
+    no two blocks have the same row, so a state whose next states are all
+    in known blocks joins the block with its row or, if there is none,
+    starts a new block.
+
+    An edit can only change the language of the states that reach an edited
+    state. When the minimal DFA is next needed, only those affected states
+    are taken out of their blocks and placed again; every other block keeps
+    its members and its row. The affected states are partitioned among
+    themselves with Hopcroft's algorithm, treating the blocks they lead
+    into as fixed, and every resulting class is then matched by its row.
+    Classes on cycles are matched by walking them next to a candidate block
+    that enters the same known block on the same symbol. Only a new closed
+    cycle that leads into no known block is compared against all blocks.
+    If more than half of the states reach an edited state, as in a strongly
+    connected DFA, the partition is built again from scratch instead.
+
+    Blocks are numbered 0 to numBlocks - 1; a deleted block is replaced by
+    the last one.
+    """
+
+    def __init__(self, compiled:CompiledDFA):
+        """
+        Initializes the _IncrementalMinimizer class.
+
+        Args:
+            compiled (CompiledDFA): The DFA to copy.
+
+        """
+        self.alphabets = compiled.alphabets
+        self.ranges = compiled.ranges
+        self.k = compiled.numSymbols
+        self.names = list(compiled.stateNames)
+        self.stateIndex = {name: i for i, name in enumerate(self.names)}
+        self.table = list(compiled.table)
+        self.accept = [1 if flag else 0 for flag in compiled.accept]
+        self.start = compiled.start
+
+        # Sources of the transitions into every state, with their number of symbols
+        self.preds = [{} for _ in self.names]
+        k = self.k
+        for s in range(len(self.names)):
+            for t in self.table[s * k:s * k + k]:
+                self.preds[t][s] = self.preds[t].get(s, 0) + 1
+
+        # The partition is built on the first call of minimized
+        self.blockOf = None
+        self.dirty = set()
+
+    def compiled(self):
+        """
+        Returns a copy of the edited DFA as a CompiledDFA.
+
+        Returns:
+            CompiledDFA: The compiled DFA.
+        """
+        return CompiledDFA(self.alphabets, list(self.names), array("i", self.table), bytearray(self.accept), self.start, self.ranges)
+
+    # Edits
+
+    def setTransition(self, s, c, t):
+        k = self.k
+        old = self.table[s * k + c]
+        if old == t:
+            return
+        self.table[s * k + c] = t
+        self._removePred(old, s)
+        self.preds[t][s] = self.preds[t].get(s, 0) + 1
+        if self.blockOf is not None:
+            self.dirty.add(s)
+
+    def setAccepting(self, s, flag):
+        flag = 1 if flag else 0
+        if self.accept[s] == flag:
+            return
+        self.accept[s] = flag
+        if self.blockOf is not None:
+            self.dirty.add(s)
+
+    def addState(self, name, flag, targets):
+        s = len(self.names)
+        self.names.append(name)
+        self.stateIndex[name] = s
+        self.accept.append(1 if flag else 0)
+        self.table.extend(targets)
+        self.preds.append({})
+        for t in targets:
+            self.preds[t][s] = self.preds[t].get(s, 0) + 1
+        if self.blockOf is not None:
+            self.blockOf.append(-1)
+            self.dirty.add(s)
+        return s
+
+    def removeState(self, s):
+        k = self.k
+        if self.blockOf is not None:
+            # Block rows are only up to date after a refresh. No other state
+            # enters s, so its removal changes no language, but its block
+            # may have to go.
+            self._refresh()
+            b = self.blockOf[s]
+            self.members[b].discard(s)
+            if not self.members[b]:
+                self._deleteBlocks({b})
+        for t in self.table[s * k:s * k + k]:
+            self._removePred(t, s)
+
+        # Move the last state into the freed number
+        last = len(self.names) - 1
+        del self.stateIndex[self.names[s]]
+        if s != last:
+            for p in self.preds[last]:
+                if p != last:
+                    for i in range(p * k, p * k + k):
+                        if self.table[i] == last:
+                            self.table[i] = s
+            row = self.table[last * k:last * k + k]
+            for t in set(row) - {last}:
+                self.preds[t][s] = self.preds[t].pop(last)
+            self.table[s * k:s * k + k] = [s if t == last else t for t in row]
+            self.preds[s] = {(s if p == last else p): count for p, count in self.preds[last].items()}
+            self.accept[s] = self.accept[last]
+            self.names[s] = self.names[last]
+            self.stateIndex[self.names[s]] = s
+            if self.start == last:
+                self.start = s
+            if self.blockOf is not None:
+                b = self.blockOf[last]
+                self.blockOf[s] = b
+                self.members[b].discard(last)
+                self.members[b].add(s)
+        del self.table[last * k:]
+        self.accept.pop()
+        self.names.pop()
+        self.preds.pop()
+        if self.blockOf is not None:
+            self.blockOf.pop()
+
+    def _removePred(self, t, s):
+        count = self.preds[t][s] - 1
+        if count:
+            self.preds[t][s] = count
+        else:
+            del self.preds[t][s]
+
+    # Blocks
+
+    def _build(self):
+        """
+        Partitions every state from scratch.
+        """
+        blockOf = _hopcroftBlocks(self.compiled())
+        self.blockOf = [-1] * len(blockOf)
+        self.members = []
+        self.blockTable = []
+        self.blockAccept = []
+        self.blockPreds = []
+        self.rows = {}
+        newId = {}
+        for s, b in enumerate(blockOf):
+            if b not in newId:
+                newId[b] = self._newBlock()
+        k = self.k
+        for s, b in enumerate(blockOf):
+            block = newId[b]
+            if not self.members[block]:
+                self._setRow(block, self.accept[s], [newId[blockOf[t]] for t in self.table[s * k:s * k + k]])
+            self._join(block, [s])
+
+    def _newBlock(self):
+        self.members.append(set())
+        self.blockTable.extend([0] * self.k)
+        self.blockAccept.append(0)
+        self.blockPreds.append({})
+        return len(self.members) - 1
+
+    def _setRow(self, b, flag, row):
+        k = self.k
+        self.blockTable[b * k:b * k + k] = row
+        self.blockAccept[b] = flag
+        for t in row:
+            self.blockPreds[t][b] = self.blockPreds[t].get(b, 0) + 1
+        self.rows[self._rowKey(b)] = b
+
+    def _rowKey(self, b):
+        k = self.k
+        return (self.blockAccept[b],) + tuple(self.blockTable[b * k:b * k + k])
+
+    def _join(self, b, states):
+        self.members[b].update(states)
+        for s in states:
+            self.blockOf[s] = b
+
+    def _deleteBlocks(self, blocks):
+        """
+        Deletes empty blocks, renumbering the last blocks into their numbers.
+
+        Only deleted blocks may lead into a deleted block.
+        """
+        k = self.k
+        for b in blocks:
+            del self.rows[self._rowKey(b)]
+            for t in self.blockTable[b * k:b * k + k]:
+                count = self.blockPreds[t][b] - 1
+                if count:
+                    self.blockPreds[t][b] = count
+                else:
+                    del self.blockPreds[t][b]
+
+        for b in sorted(blocks, reverse=True):
+            last = len(self.members) - 1
+            if b != last:
+                # Rows that lead into the last block change, and with them their keys
+                for p in self.blockPreds[last]:
+                    if p != last:
+                        del self.rows[self._rowKey(p)]
+                        for i in range(p * k, p * k + k):
+                            if self.blockTable[i] == last:
+                                self.blockTable[i] = b
+                        self.rows[self._rowKey(p)] = p
+                del self.rows[self._rowKey(last)]
+                row = self.blockTable[last * k:last * k + k]
+                for t in set(row) - {last}:
+                    self.blockPreds[t][b] = self.blockPreds[t].pop(last)
+                self.blockTable[b * k:b * k + k] = [b if t == last else t for t in row]
+                self.blockAccept[b] = self.blockAccept[last]
+                self.blockPreds[b] = {(b if p == last else p): count for p, count in self.blockPreds[last].items()}
+                self.members[b] = self.members[last]
+                for s in self.members[b]:
+                    self.blockOf[s] = b
+                self.rows[self._rowKey(b)] = b
+            del self.blockTable[last * k:]
+            self.blockAccept.pop()
+            self.blockPreds.pop()
+            self.members.pop()
+
+    # Placing the affected states
+
+    def _refresh(self):
+        """
+        Places the states affected by the edits since the last call in blocks.
+        """
+        if self.blockOf is None:
+            self._build()
+            return
+        if not self.dirty:
+            return
+
+        # Only states that reach an edited state can have changed language
+        affected = set(self.dirty)
+        self.dirty = set()
+        stack = list(affected)
+        limit = len(self.names) // 2
+        while stack:
+            for p in self.preds[stack.pop()]:
+                if p not in affected:
+                    affected.add(p)
+                    stack.append(p)
+            if len(affected) > limit:
+                # Most of the DFA reaches the edits, so start from scratch
+                self._build()
+                return
+
+        emptied = set()
+        for s in affected:
+            b = self.blockOf[s]
+            if b >= 0:
+                self.members[b].discard(s)
+                if not self.members[b]:
+                    emptied.add(b)
+                self.blockOf[s] = -1
+        self._deleteBlocks(emptied)
+
+        pending = sorted(affected)
+        while pending:
+            classes = self._classes(pending)
+            if not self._placeByRow(classes) and not self._placeByWalk(classes):
+                break
+            pending = [s for s in pending if self.blockOf[s] < 0]
+        if pending:
+            self._placeNew(pending)
+
+    def _classes(self, states):
+        """
+        Partitions states whose block is not known yet.
+
+        Next states in known blocks are treated as fixed, distinct states.
+
+        Args:
+            states (list): State numbers without a block.
+
+        Returns:
+            tuple: The states of every class, the accept flag of every class,
+            and the flat rows of the classes, where an entry b >= 0 is a block
+            and an entry -1 - i is class i.
+        """
+        k = self.k
+        local = {s: i for i, s in enumerate(states)}
+        fixed = {}
+        table = []
+        for s in states:
+            for t in self.table[s * k:s * k + k]:
+                i = local.get(t)
+                if i is None:
+                    b = self.blockOf[t]
+                    i = fixed.get(b)
+                    if i is None:
+                        i = fixed[b] = len(states) + len(fixed)
+                table.append(i)
+        labels = [self.accept[s] for s in states] + [2 + j for j in range(len(fixed))]
+        for i in range(len(fixed)):
+            table.extend([len(states) + i] * k)
+        blockOf = _hopcroftBlocks(CompiledDFA(self.alphabets, labels, table, labels, 0), initial=labels)
+
+        fixedBlock = {i: b for b, i in fixed.items()}
+        classOf = {}
+        members = []
+        for i, s in enumerate(states):
+            c = classOf.get(blockOf[i])
+            if c is None:
+                c = classOf[blockOf[i]] = len(members)
+                members.append([])
+            members[c].append(s)
+        accept = []
+        rows = []
+        for group in members:
+            i = local[group[0]]
+            accept.append(self.accept[group[0]])
+            for t in table[i * k:i * k + k]:
+                rows.append(fixedBlock[t] if t in fixedBlock else -1 - classOf[blockOf[t]])
+        return members, accept, rows
+
+    def _placeByRow(self, classes):
+        """
+        Places every class whose next states all have blocks by its row.
+
+        Returns:
+            bool: True if some class was placed.
+        """
+        members, accept, rows = classes
+        k = self.k
+        waitingOn = [0] * len(members)
+        dependents = [[] for _ in members]
+        for c in range(len(members)):
+            for t in set(rows[c * k:c * k + k]):
+                if t < 0:
+                    waitingOn[c] += 1
+                    dependents[-1 - t].append(c)
+
+        ready = [c for c in range(len(members)) if waitingOn[c] == 0]
+        placed = [-1] * len(members)
+        while ready:
+            c = ready.pop()
+            row = [t if t >= 0 else placed[-1 - t] for t in rows[c * k:c * k + k]]
+            b = self.rows.get((accept[c],) + tuple(row))
+            if b is None:
+                b = self._newBlock()
+                self._setRow(b, accept[c], row)
+            self._join(b, members[c])
+            placed[c] = b
+            for d in dependents[c]:
+                waitingOn[d] -= 1
+                if waitingOn[d] == 0:
+                    ready.append(d)
+        return any(b >= 0 for b in placed)
+
+    def _placeByWalk(self, classes):
+        """
+        Places classes on cycles that are equivalent to existing blocks.
+
+        A block equivalent to a class enters the same block on the same
+        symbol, so the candidates come from the predecessors of that block.
+        A candidate is accepted if walking the class and the block side by
+        side pairs every class with one block and never disagrees.
+
+        Returns:
+            bool: True if some class was placed.
+        """
+        members, accept, rows = classes
+        k = self.k
+
+        def walk(c, b):
+            pairs = {c: b}
+            stack = [c]
+            while stack:
+                c = stack.pop()
+                b = pairs[c]
+                if accept[c] != self.blockAccept[b]:
+                    return None
+                for j in range(k):
+                    t = rows[c * k + j]
+                    target = self.blockTable[b * k + j]
+                    if t >= 0:
+                        if t != target:
+                            return None
+                    elif -1 - t in pairs:
+                        if pairs[-1 - t] != target:
+                            return None
+                    else:
+                        pairs[-1 - t] = target
+                        stack.append(-1 - t)
+            return pairs
+
+        for c in range(len(members)):
+            exits = [(j, rows[c * k + j]) for j in range(k) if rows[c * k + j] >= 0]
+            if not exits:
+                continue
+            j, r = exits[0]
+            for b in self.blockPreds[r]:
+                if self.blockTable[b * k + j] != r or self.blockAccept[b] != accept[c]:
+                    continue
+                pairs = walk(c, b)
+                if pairs is not None:
+                    for d, b in pairs.items():
+                        self._join(b, members[d])
+                    return True
+        return False
+
+    def _placeNew(self, states):
+        """
+        Places states that are not equivalent to any existing block, after
+        checking closed cycles against all blocks.
+
+        Args:
+            states (list): State numbers without a block.
+        """
+        members, accept, rows = self._classes(states)
+        k = self.k
+
+        # A class that leads into a known block was matched and found new,
+        # and so is every class that reaches one; the rest are closed cycles
+        isNew = [any(t >= 0 for t in rows[c * k:c * k + k]) for c in range(len(members))]
+        dependents = [[] for _ in members]
+        for c in range(len(members)):
+            for t in rows[c * k:c * k + k]:
+                if t < 0:
+                    dependents[-1 - t].append(c)
+        stack = [c for c in range(len(members)) if isNew[c]]
+        while stack:
+            for d in dependents[stack.pop()]:
+                if not isNew[d]:
+                    isNew[d] = True
+                    stack.append(d)
+
+        closed = [c for c in range(len(members)) if not isNew[c]]
+        if closed:
+            # Partition the closed classes together with every block
+            numBlocks = len(self.members)
+            index = {c: numBlocks + i for i, c in enumerate(closed)}
+            table = list(self.blockTable)
+            for c in closed:
+                table.extend(index[-1 - t] for t in rows[c * k:c * k + k])
+            labels = self.blockAccept + [accept[c] for c in closed]
+            blockOf = _hopcroftBlocks(CompiledDFA(self.alphabets, labels, table, labels, 0))
+            blockOfPart = {}
+            for b in range(numBlocks):
+                blockOfPart[blockOf[b]] = b
+            for c in closed:
+                b = blockOfPart.get(blockOf[index[c]])
+                if b is not None:
+                    self._join(b, members[c])
+            states = [s for s in states if self.blockOf[s] < 0]
+            if not states:
+                return
+            members, accept, rows = self._classes(states)
+
+        # No class is equivalent to an existing block now, so the classes are exact
+        blocks = [self._newBlock() for _ in members]
+        for c, b in enumerate(blocks):
+            self._setRow(b, accept[c], [t if t >= 0 else blocks[-1 - t] for t in rows[c * k:c * k + k]])
+            self._join(b, members[c])
+
+    def minimized(self):
+        """
+        Returns the minimal DFA of the edited DFA.
+
+        Returns:
+            DFA: A DFA with one state per block of equivalent states that
+                can be reached from the start state.
+        """
+        self._refresh()
+        names = list(self.names)
+        blockOf = list(self.blockOf)
+        groups = []
+
+        def getName(b):
+            if not groups:
+                groups.extend([] for _ in range(len(self.blockAccept)))
+                for s, block in enumerate(blockOf):
+                    groups[block].append(names[s])
+            return "_".join(sorted(groups[b]))
+
+        compiled = CompiledDFA(self.alphabets, _LazyNames(len(self.blockAccept), getName),
+                               array("i", self.blockTable), bytearray(self.blockAccept), self.blockOf[self.start], self.ranges)
+        reachable = compiled.stateAnalysis()[0]
+        if not all(reachable):
+            # Edits may leave blocks behind that the start block no longer reaches
+            return _quotientDFA(compiled, [b if reachable[b] else -1 for b in range(compiled.numStates)])
+        return DFA.fromCompiled(compiled)
+
+    def check(self):
+        """
+        Returns whether the blocks match a minimization from scratch.
+
+        Returns:
+            bool: True if the blocks are the partition found by minimizeDFA
+                and every block row matches the transitions of its members.
+        """
+        self._refresh()
+        k = self.k
+        for s, b in enumerate(self.blockOf):
+            if b < 0 or s not in self.members[b] or self.blockAccept[b] != self.accept[s]:
+                return False
+            if self.blockTable[b * k:b * k + k] != [self.blockOf[t] for t in self.table[s * k:s * k + k]]:
+                return False
+        if len(self.rows) != len(self.members) or any(self._rowKey(b) not in self.rows for b in range(len(self.members))):
+            return False
+
+        def firstSeen(blocks):
+            numbers = {}
+            return [numbers.setdefault(b, len(numbers)) for b in blocks]
+
+        return firstSeen(self.blockOf) == firstSeen(_hopcroftBlocks(self.compiled()))
+
 def test_minimize_dfa():
     q0 = Node('q0', False, {'0': 'q0', '1': 'q1'})
     q1 = Node('q1', True,  {'0': 'q1', '1': 'q0'})
@@ -534,36 +4768,108 @@ def test_minimize_dfa():
             print(f"  {symbol} → {target}")
 
             
+def testFile(dfa:DFA, path, batchSize=100000):
+    """
+    Prints whether each line of a file is accepted by the DFA.
+
+    Lines are classified in batches with DFA.acceptMany, so the DFA is built
+    once for the whole file.
+
+    Args:
+        dfa (DFA): The DFA to test against.
+        path (str): Path of a file with one string per line.
+        batchSize (int): Number of lines classified together.
+
+    Returns:
+        int: Number of accepted lines.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File {path} does not exist")
+
+    print()
+    accepted = 0
+    total = 0
+    with open(path, "r") as f:
+        while True:
+            lines = [line.rstrip("\r\n") for line in itertools.islice(f, batchSize)]
+            if not lines:
+                break
+            for line, isAccepted in zip(lines, dfa.acceptMany(lines)):
+                print(f"{'accepted' if isAccepted else 'rejected'}\t{line}")
+                accepted += bool(isAccepted)
+            total += len(lines)
+
+    print(f"\n{accepted} of {total} strings in {path} are accepted by the resulting DFA.")
+    return accepted
+
 def main():
-    parser = argparse.ArgumentParser(description="Product construction on two DFAs")
+    parser = argparse.ArgumentParser(description="Product construction on DFAs")
     parser.add_argument("--dfa1", required = True, help = "Path for DFA 1")
-    parser.add_argument("--dfa2", required = True, help = "Path for DFA 2")
-    parser.add_argument("--operation", required = True, choices = ["union", "intersection"], help = "Operation: 'union' or 'intersection'")
-    parser.add_argument("--testString", required = True, help = "String to test on result DFA")
+    parser.add_argument("--dfa2", help = "Path for DFA 2, not used by 'complement'")
+    parser.add_argument("--extra", nargs = "+", default = [], help = "Paths for further DFAs combined in the same product")
+    parser.add_argument("--operation", required = True, choices = OPERATIONS, help = "Operation: 'union', 'intersection', 'xor', 'difference', 'complement' or 'atleast'")
+    parser.add_argument("--atLeast", type = int, default = 1, help = "Number of DFAs that must accept for 'atleast'")
+    parser.add_argument("--testString", help = "String to test on result DFA")
+    parser.add_argument("--testFile", help = "File with one string per line to test on result DFA")
+    parser.add_argument("--fullProduct", action = "store_true", help = "Build every pair of states instead of only the reachable ones")
+    parser.add_argument("--noCache", action = "store_true", help = "Do not reuse or store results in dfa/.cache")
+    parser.add_argument("--outputFormat", choices = ["json", "jsonl", "binary"], default = "json", help = "Format of the resulting DFA file")
+    parser.add_argument("--profile", help = "Write the time and counters of every phase to this JSON file")
+    parser.add_argument("--render", nargs = "?", const = "png", choices = ["png", "svg", "dot", "json"], help = "Draw the resulting DFA to min_graph.<format>; 'dot' and 'json' do not need Graphviz")
+    parser.add_argument("--maxStates", type = int, help = f"Most states to draw, nearest to the start state first (default {RENDER_MAX_STATES} for png and svg, all for dot and json)")
+    parser.add_argument("--around", help = "Draw the states nearest to this state instead of the start state")
     args = parser.parse_args()
 
-    try:
-        l1 = parseDFA(args.dfa1)
-        l2 = parseDFA(args.dfa2)
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        addProfileHook(profiler)
+
+    # The cache is off for library callers and on for the command line
+    resultCache.enabled = not args.noCache
+    if resultCache.enabled:
+        resultCache.directory = os.path.join("dfa", ".cache")
 
-        if l1.alphabets != l2.alphabets:
-            print("\nError: For product construction, the alphabets of the two DFA's have to be the same.\n")
+    try:
+        paths = [args.dfa1] + ([args.dfa2] if args.dfa2 else []) + args.extra
+        if args.operation == "complement" and len(paths) != 1:
+            print("\nError: 'complement' takes only --dfa1.\n")
             return
-        
-        resultDFA = minimizeDFA(ProductConstruction(l1, l2, args.operation))
-        #Comment out next line to run program without Graphviz
-        visualize_dfa(resultDFA, filename="min_graph")
-        resultDFA.createJson(args.operation)
+        if args.operation != "complement" and len(paths) < 2:
+            print(f"\nError: '{args.operation}' needs --dfa2.\n")
+            return
+        operands = [parseDFA(path) for path in paths]
+
+        operation = atLeast(args.atLeast) if args.operation == "atleast" else args.operation
+        resultDFA = minimizeDFA(ProductConstruction(*operands, operation = operation, full = args.fullProduct))
+        if args.outputFormat == "binary":
+            resultDFA.createBinary(args.operation)
+        elif args.outputFormat == "jsonl":
+            resultDFA.createJsonLines(args.operation)
+        else:
+            resultDFA.createJson(args.operation)
+        if args.render:
+            maxStates = args.maxStates
+            if maxStates is None and args.render in ("png", "svg"):
+                maxStates = RENDER_MAX_STATES
+            visualize_dfa(resultDFA, filename="min_graph", format=args.render, maxStates=maxStates, around=args.around)
         
         if args.testString:
             isAccepted = resultDFA.isAccepted(args.testString)
             print(f"\nString '{args.testString}' is "
                   f"{'accepted' if isAccepted else 'rejected'} by the resulting DFA.")
-        else:
+        if args.testFile:
+            testFile(resultDFA, args.testFile)
+        if not args.testString and not args.testFile:
             print("\nNo test string provided.")
     except Exception as e:
         print(f"Error: {e}")
         return
+    finally:
+        if profiler is not None:
+            removeProfileHook(profiler)
+            profiler.saveJson(args.profile)
+            print(f"\nProfile saved to {args.profile}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+from main import parseDFA, ProductConstruction, minimizeDFA, atLeast, checkOperation, resultCache
+
+"""
+Answers membership queries on DFAs that are built once and kept in memory.
+
+The DFAs to serve are listed in a JSON config that maps a name to a DFA
+file or to a product of DFA files:
+
+    {
+        "even": "dfa/dfa1.json",
+        "either": {"operands": ["dfa/dfa1.json", "dfa/dfa2.json"], "operation": "union"},
+        "two": {"operands": ["dfa/dfa1.json", "dfa/dfa3.json", "dfa/dfa4.json"],
+                "operation": "atleast", "atLeast": 2}
+    }
+
+Every DFA is built and minimized at start-up, and again when one of its
+files changes. Clients connect over TCP or a Unix socket and send one JSON
+request per line:
+
+    {"id": 1, "dfa": "even", "input": "0101"}
+    {"id": 2, "dfa": "either", "inputs": ["0", "11"]}
+
+Every request gets one JSON line in reply, in the order of the requests:
+
+    {"id": 1, "accepted": true}
+    {"id": 2, "accepted": [false, true]}
+
+or {"id": ..., "error": "..."} if it cannot be answered. A client may send
+many requests before reading the replies.
+
+To run: python server.py --config served.json --port 8765
+"""
+
+
+def readConfig(path):
+    """
+    Returns the DFAs listed in a server config.
+
+    Args:
+        path (str): Path of the JSON config.
+
+    Returns:
+        dict: One dict per name with 'operands', 'operation', 'atLeast' and
+            'fullProduct'. 'operation' is None for a single DFA file.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File {path} does not exist")
+
+    with open(path, "r") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"Expected an object mapping names to DFAs in {path}")
+
+    entries = {}
+    errors = []
+    for name, entry in config.items():
+        if isinstance(entry, str):
+            entry = {"operands": [entry]}
+        if not isinstance(entry, dict):
+            errors.append(f"{name!r} must be a path or an object")
+            continue
+        operands = entry.get("operands")
+        operation = entry.get("operation")
+        if not isinstance(operands, list) or not operands or not all(isinstance(p, str) for p in operands):
+            errors.append(f"{name!r} must list the paths of its operands")
+            continue
+        m = entry.get("atLeast")
+        fullProduct = entry.get("fullProduct", False)
+        errors.extend(f"{name!r} {problem}" for problem in checkOperation(operation, len(operands), m, fullProduct))
+        entries[name] = {
+            "operands": operands,
+            "operation": operation,
+            "atLeast": 1 if m is None else m,
+            "fullProduct": fullProduct is True,
+        }
+
+    if errors:
+        raise ValueError(f"{len(errors)} errors in {path}:\n" + "\n".join(errors[:100]))
+    return entries
+
+
+def buildEntry(entry):
+    """
+    Builds and minimizes the DFA of a config entry.
+
+    Args:
+        entry (dict): An entry from readConfig.
+
+    Returns:
+        DFA: The minimal DFA, compiled and ready to test strings.
+    """
+    operands = [parseDFA(path) for path in entry["operands"]]
+    if entry["operation"] is None:
+        resultDFA = minimizeDFA(operands[0])
+    else:
+        operation = atLeast(entry["atLeast"]) if entry["operation"] == "atleast" else entry["operation"]
+        resultDFA = minimizeDFA(ProductConstruction(*operands, operation=operation, full=entry["fullProduct"]))
+    resultDFA.compile()
+    return resultDFA
+
+
+def _modificationTimes(entry):
+    times = []
+    for path in entry["operands"]:
+        try:
+            times.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            times.append(None)
+    return times
+
+
+class AcceptanceServer:
+    """
+    Holds the served DFAs and answers queries on them in batches.
+
+    Queries on the same DFA that arrive within a short window are tested
+    together with one call to acceptMany, which steps all their strings
+    through the table at once. The call runs in a thread of the default
+    executor, so the event loop keeps reading requests meanwhile.
+
+    Attributes:
+        dfas (dict): The DFA served under every name.
+        batches (int): Number of batches tested so far.
+        queries (int): Number of strings tested so far.
+    """
+
+    def __init__(self, entries, window=0.002, maxBatch=4096):
+        """
+        Initializes the AcceptanceServer class and builds every DFA.
+
+        Args:
+            entries (dict): Entries from readConfig, by name.
+            window (float): Seconds to wait for more queries before testing a batch.
+            maxBatch (int): Number of strings that tests a batch without waiting.
+
+        """
+        if window < 0:
+            raise ValueError("window must not be negative")
+        if maxBatch < 1:
+            raise ValueError("maxBatch must be at least 1")
+        self.entries = entries
+        self.window = window
+        self.maxBatch = maxBatch
+        self.dfas = {}
+        self._mtimes = {}
+        for name, entry in entries.items():
+            self._mtimes[name] = _modificationTimes(entry)
+            self.dfas[name] = buildEntry(entry)
+        # Waiting queries, the number of their strings and the timer, by name
+        self._pending = {}
+        self.batches = 0
+        self.queries = 0
+
+    def query(self, name, strings):
+        """
+        Queues strings to be tested on a served DFA.
+
+        Must be called from the event loop.
+
+        Args:
+            name (str): Name of the DFA.
+            strings (list): Input strings.
+
+        Returns:
+            asyncio.Future: Resolves to a list with whether each string is accepted.
+        """
+        if not isinstance(name, str):
+            raise TypeError("name must be a string")
+        if name not in self.dfas:
+            raise KeyError(f"unknown DFA {name!r}")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.get(name)
+        if pending is None:
+            pending = self._pending[name] = [[], 0, loop.call_later(self.window, self._flush, name)]
+        pending[0].append((strings, future))
+        pending[1] += len(strings)
+        if pending[1] >= self.maxBatch:
+            self._flush(name)
+        return future
+
+    def _flush(self, name):
+        pending = self._pending.pop(name, None)
+        if pending is None:
+            return
+        waiting, count, timer = pending
+        timer.cancel()
+        strings = [s for batch, _ in waiting for s in batch]
+        tested = asyncio.get_running_loop().run_in_executor(None, self.dfas[name].acceptMany, strings)
+        tested.add_done_callback(lambda tested: self._answer(waiting, count, tested))
+
+    def _answer(self, waiting, count, tested):
+        if tested.cancelled():
+            for _, future in waiting:
+                future.cancel()
+            return
+        if tested.exception() is not None:
+            for _, future in waiting:
+                if not future.done():
+                    future.set_exception(tested.exception())
+            return
+        results = tested.result()
+        self.batches += 1
+        self.queries += count
+        start = 0
+        for batch, future in waiting:
+            if not future.done():
+                future.set_result([bool(flag) for flag in results[start:start + len(batch)]])
+            start += len(batch)
+
+    async def watch(self, interval=1.0):
+        """
+        Rebuilds a DFA whenever one of its files changes.
+
+        The new DFA is built in a thread, and the old one answers queries
+        until it is ready. If the build fails the old one is kept.
+
+        Args:
+            interval (float): Seconds between checks of the files.
+
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for name, entry in self.entries.items():
+                times = _modificationTimes(entry)
+                if times == self._mtimes[name]:
+                    continue
+                self._mtimes[name] = times
+                try:
+                    self.dfas[name] = await loop.run_in_executor(None, buildEntry, entry)
+                    print(f"Reloaded {name}: {self.dfas[name].compile().numStates} states", flush=True)
+                except Exception as e:
+                    print(f"Reloading {name} failed, keeping the old DFA: {e}", flush=True)
+
+    def _parseRequest(self, line):
+        """
+        Returns the reply to a request line, or the query it asks for.
+
+        Args:
+            line (bytes): One request line.
+
+        Returns:
+            tuple: The request id, whether a single input was sent, and the
+                future from query or the error message.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return None, True, f"invalid JSON: {e}"
+        if not isinstance(request, dict):
+            return None, True, "a request must be an object"
+        requestId = request.get("id")
+        name = request.get("dfa")
+        single = "inputs" not in request
+        strings = [request.get("input")] if single else request["inputs"]
+        if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+            return requestId, single, "'input' must be a string and 'inputs' a list of strings"
+        if not isinstance(name, str):
+            return requestId, single, "'dfa' must be the name of a served DFA"
+        try:
+            return requestId, single, self.query(name, strings)
+        except KeyError as e:
+            return requestId, single, e.args[0]
+
+    async def handle(self, reader, writer):
+        """
+        Answers the requests of one connection until it is closed.
+
+        Requests are read as fast as they arrive, so queries on one
+        connection are batched together too; the replies are written in
+        the order of the requests.
+
+        Args:
+            reader (asyncio.StreamReader): Reads the requests.
+            writer (asyncio.StreamWriter): Writes the replies.
+
+        """
+        replies = asyncio.Queue()
+        sender = asyncio.create_task(self._sendReplies(replies, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    replies.put_nowait((None, True, "request line is too long"))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    replies.put_nowait(self._parseRequest(line))
+        except ConnectionError:
+            pass
+        finally:
+            replies.put_nowait(None)
+            await sender
+            writer.close()
+
+    async def _sendReplies(self, replies, writer):
+        while True:
+            item = await replies.get()
+            if item is None:
+                break
+            requestId, single, result = item
+            if isinstance(result, str):
+                reply = {"id": requestId, "error": result}
+            else:
+                try:
+                    accepted = await result
+                    reply = {"id": requestId, "accepted": accepted[0] if single else accepted}
+                except Exception as e:
+                    reply = {"id": requestId, "error": str(e)}
+            writer.write((json.dumps(reply) + "\n").encode())
+            if replies.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+
+
+async def serve(server, host="127.0.0.1", port=8765, unixPath=None, reloadInterval=1.0, maxLine=1 << 24):
+    """
+    Serves queries on the DFAs of an AcceptanceServer until cancelled or sent SIGTERM.
+
+    Args:
+        server (AcceptanceServer): The DFAs to serve.
+        host (str): Address to listen on over TCP.
+        port (int): Port to listen on over TCP.
+        unixPath (str): Path of a Unix socket to listen on instead of TCP.
+        reloadInterval (float): Seconds between checks for changed DFA files, 0 to never reload.
+        maxLine (int): Longest request line accepted, in bytes.
+
+    """
+    if unixPath:
+        listener = await asyncio.start_unix_server(server.handle, path=unixPath, limit=maxLine)
+        address = unixPath
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=maxLine)
+        address = f"{host}:{port}"
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):
+        # Not available on Windows
+        pass
+    watcher = asyncio.create_task(server.watch(reloadInterval)) if reloadInterval > 0 else None
+    print(f"Serving {', '.join(server.dfas)} on {address}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer membership queries on DFAs kept in memory")
+    parser.add_argument("--config", help="JSON file mapping names to DFA files or products")
+    parser.add_argument("--dfa", nargs="+", default=[], metavar="NAME=PATH", help="Also serve single DFA files under these names")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--window", type=float, default=0.002, help="Seconds to wait for more queries before testing a batch")
+    parser.add_argument("--maxBatch", type=int, default=4096, help="Number of strings that tests a batch without waiting")
+    parser.add_argument("--reloadInterval", type=float, default=1.0, help="Seconds between checks for changed DFA files, 0 to never reload")
+    parser.add_argument("--noCache", action="store_true", help="Do not reuse or store results in dfa/.cache")
+    args = parser.parse_args()
+
+    resultCache.enabled = not args.noCache
+    if resultCache.enabled:
+        resultCache.directory = os.path.join("dfa", ".cache")
+
+    try:
+        entries = readConfig(args.config) if args.config else {}
+        for item in args.dfa:
+            name, separator, path = item.partition("=")
+            if not separator or not name or not path:
+                raise ValueError(f"Expected NAME=PATH, got {item!r}")
+            entries[name] = {"operands": [path], "operation": None, "atLeast": 1, "fullProduct": False}
+        if not entries:
+            raise ValueError("Nothing to serve; give --config or --dfa")
+        server = AcceptanceServer(entries, args.window, args.maxBatch)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix, args.reloadInterval))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    print(f"\nTested {server.queries} strings in {server.batches} batches.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
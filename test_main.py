@@ -0,0 +1,374 @@
+import random
+import struct
+
+import pytest
+
+import main
+from main import DFA, Node, ResultCache, Profiler, parseDFA, minimizeDFA, ProductConstruction, checkOperation, isEquivalent, graphView, compileMatcher
+
+"""
+Randomized cross-checks of main.py.
+
+To run: python -m pytest test_main.py
+"""
+
+def randomDFA(rng, numStates, alphabets, prefix="s", density=0.3):
+    """
+    Returns a DFA with random transitions and accept states.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        numStates (int): Number of states.
+        alphabets (list): Input symbols.
+        prefix (str): Prefix of the state names.
+        density (float): Share of accepting states.
+
+    Returns:
+        DFA: A DFA whose start state is the first state.
+
+    """
+    names = [f"{prefix}{i}" for i in range(numStates)]
+    stateList = {
+        name: Node(name, rng.random() < density, {symbol: rng.choice(names) for symbol in alphabets})
+        for name in names
+    }
+    return DFA(list(alphabets), stateList[names[0]], stateList)
+
+def randomStrings(rng, alphabets, count=100, maxLength=30):
+    """
+    Returns random strings over an alphabet of one-character symbols.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        alphabets (list): Input symbols.
+        count (int): Number of strings.
+        maxLength (int): Longest string.
+
+    Returns:
+        list: The strings.
+
+    """
+    return ["".join(rng.choice(alphabets) for _ in range(rng.randrange(maxLength + 1))) for _ in range(count)]
+
+def test_save_binary_over_loaded_file(tmp_path):
+    rng = random.Random(10)
+    path = str(tmp_path / "dfa.dfab")
+    original = randomDFA(rng, 50, ["0", "1"])
+    original.saveBinary(path)
+
+    loaded = parseDFA(path)
+    loaded.saveBinary(path)
+    loaded.saveJson(path)
+    loaded.saveBinary(path)
+
+    for anInput in randomStrings(rng, ["0", "1"]):
+        assert loaded.isAccepted(anInput) == original.isAccepted(anInput)
+        assert parseDFA(path).isAccepted(anInput) == original.isAccepted(anInput)
+    assert [p.name for p in tmp_path.iterdir()] == ["dfa.dfab"]
+
+def test_hopcroft_matches_table_filling():
+    rng = random.Random(3)
+    for _ in range(200):
+        alphabets = ["0", "1", "2"][:rng.randint(1, 3)]
+        dfa = randomDFA(rng, rng.randint(1, 25), alphabets, density=rng.choice([0.1, 0.3, 0.6]))
+        hopcroft = minimizeDFA(dfa)
+        table = minimizeDFA(dfa, method="table")
+
+        assert hopcroft.compile().numStates == table.compile().numStates
+        assert isEquivalent(hopcroft, table)
+        for anInput in randomStrings(rng, alphabets, count=30):
+            assert hopcroft.isAccepted(anInput) == dfa.isAccepted(anInput) == table.isAccepted(anInput)
+        # A minimal DFA cannot be made smaller
+        assert minimizeDFA(hopcroft).compile().numStates == hopcroft.compile().numStates
+
+def test_incremental_minimization_matches_minimizeDFA():
+    rng = random.Random(16)
+    for t in range(60):
+        alphabets = ["0", "1"]
+        dfa = randomDFA(rng, rng.randint(1, 30), alphabets)
+        dfa.minimized()
+        for step in range(20):
+            names = list(dfa.compile().stateNames)
+            edit = rng.random()
+            if edit < 0.5:
+                dfa.setTransition(rng.choice(names), rng.choice(alphabets), rng.choice(names))
+            elif edit < 0.75:
+                dfa.setAccepting(rng.choice(names), rng.random() < 0.5)
+            else:
+                name = f"new{t}_{step}"
+                dfa.addState(name, rng.random() < 0.4, {symbol: rng.choice(names + [name]) for symbol in alphabets})
+                dfa.setTransition(rng.choice(names), rng.choice(alphabets), name)
+
+            if step % 4 == 3:
+                incremental = dfa.minimized()
+                full = minimizeDFA(dfa)
+                assert dfa.checkMinimized()
+                assert incremental.compile().numStates == full.compile().numStates
+                assert isEquivalent(incremental, full)
+
+def relabeled(rng, dfa, prefix):
+    """
+    Returns a copy of a DFA with new state names, stored in a random order.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        dfa (DFA): A DFA.
+        prefix (str): Prefix of the new state names.
+
+    Returns:
+        DFA: The relabeled DFA.
+
+    """
+    names = list(dfa.stateList)
+    rng.shuffle(names)
+    newName = {name: f"{prefix}{i}" for i, name in enumerate(names)}
+    stateList = {}
+    for name in names:
+        node = dfa.stateList[name]
+        stateList[newName[name]] = Node(newName[name], node.acceptState, {symbol: newName[t] for symbol, t in node.rules.items()})
+    return DFA(list(dfa.alphabets), stateList[newName[dfa.start.name]], stateList)
+
+def test_cache_hits_for_relabeled_operands(monkeypatch, tmp_path):
+    rng = random.Random(11)
+    monkeypatch.setattr(main, "resultCache", ResultCache(directory=str(tmp_path), enabled=True))
+    for t in range(30):
+        l1 = randomDFA(rng, rng.randint(1, 15), ["0", "1"], prefix="p")
+        l2 = randomDFA(rng, rng.randint(1, 15), ["0", "1"], prefix="q")
+        operation = rng.choice(["union", "intersection", "xor", "difference"])
+        first = minimizeDFA(ProductConstruction(l1, l2, operation))
+        if t % 2:
+            # Read back from the directory
+            main.resultCache._memory.clear()
+
+        with Profiler() as profiler:
+            second = minimizeDFA(ProductConstruction(relabeled(rng, l1, "a"), relabeled(rng, l2, "b"), operation))
+        phases = profiler.report()["phases"]
+        assert phases["product"]["counters"]["cacheHits"] == 1
+        assert phases["minimize"]["counters"]["cacheHits"] == 1
+
+        main.resultCache.enabled = False
+        uncached = minimizeDFA(ProductConstruction(l1, l2, operation))
+        main.resultCache.enabled = True
+        assert second.compile().numStates == uncached.compile().numStates == first.compile().numStates
+        assert isEquivalent(second, uncached)
+
+def test_file_formats_round_trip(tmp_path):
+    rng = random.Random(9)
+    letters = [(ord("a"), ord("m")), (ord("n"), ord("z"))]
+    for t in range(40):
+        if t % 2:
+            dfa = randomDFA(rng, rng.randint(1, 20), ["lower", "upper"])
+            dfa = DFA(dfa.alphabets, dfa.start, dfa.stateList, ranges=[(letters[0],), (letters[1],)])
+            alphabets = list("abmnyz")
+        else:
+            alphabets = ["0", "1", "2"]
+            dfa = randomDFA(rng, rng.randint(1, 20), alphabets)
+        strings = randomStrings(rng, alphabets, count=40)
+
+        for extension in (".json", ".jsonl", ".dfab"):
+            path = str(tmp_path / f"dfa{t}{extension}")
+            if extension == ".json":
+                dfa.saveJson(path)
+            elif extension == ".jsonl":
+                dfa.saveJsonLines(path)
+            else:
+                dfa.saveBinary(path)
+            loaded = parseDFA(path)
+            assert list(loaded.compile().stateNames) == list(dfa.compile().stateNames)
+            assert isEquivalent(loaded, dfa)
+            for anInput in strings:
+                assert loaded.isAccepted(anInput) == dfa.isAccepted(anInput)
+
+def test_graph_view_keeps_the_language():
+    rng = random.Random(18)
+    # Labels write the code points that are not printable as escapes, e.g. U+0000 as '\\x00'
+    rangesOf = {"nul": ((0, 0),), "controls": ((1, 8),), "letters": ((97, 102),), "last": ((0x10FFFE, 0x10FFFF),)}
+    for t in range(100):
+        if t % 2:
+            alphabets = list(rangesOf)
+            ranges = list(rangesOf.values())
+            symbolOf = {code: symbol for symbol, pairs in rangesOf.items() for first, last in pairs for code in range(first, last + 1)}
+        else:
+            alphabets = list("abcdef")
+            ranges = None
+            symbolOf = {ord(symbol): symbol for symbol in alphabets}
+        dfa = randomDFA(rng, rng.randint(1, 20), alphabets, density=0.15)
+        dfa = DFA(alphabets, dfa.start, dfa.stateList, ranges=ranges)
+        view = graphView(dfa)
+        assert all(line.isprintable() for line in main.toDot(dfa).replace("\t", "").splitlines())
+
+        # Rebuild the DFA from the drawn edges; missing edges lead to a dead state
+        rules = {state["name"]: {} for state in view["states"]}
+        drawnCodes = {state["name"]: set() for state in view["states"]}
+        for edge in view["edges"]:
+            assert edge["to"] is not None and edge["label"].isprintable()
+            for part in edge["label"].split(","):
+                first, _, last = part.encode("ascii").decode("unicode_escape").partition("-")
+                for code in range(ord(first), ord(last or first) + 1):
+                    assert code not in drawnCodes[edge["from"]]
+                    drawnCodes[edge["from"]].add(code)
+                    rules[edge["from"]][symbolOf[code]] = edge["to"]
+        stateList = {"dead": Node("dead", False, {symbol: "dead" for symbol in alphabets})}
+        for state in view["states"]:
+            stateList[state["name"]] = Node(state["name"], state["accept"],
+                                            {symbol: rules[state["name"]].get(symbol, "dead") for symbol in alphabets})
+        drawn = DFA(alphabets, stateList[view["start"]], stateList, ranges=ranges)
+        assert isEquivalent(drawn, dfa)
+
+        maxStates = rng.randint(1, 5)
+        part = graphView(dfa, maxStates=maxStates)
+        assert len(part["states"]) <= maxStates
+        assert len(part["states"]) + part["hiddenStates"] == len(view["states"])
+
+def test_accept_many_matches_is_accepted(monkeypatch):
+    rng = random.Random(4)
+    for t in range(100):
+        if t == 50:
+            # The same check without NumPy
+            monkeypatch.setattr(main, "np", None)
+        alphabets = ["0", "1", "2"][:rng.randint(1, 3)]
+        dfa = randomDFA(rng, rng.randint(1, 20), alphabets)
+        if t % 3 == 0:
+            dfa = minimizeDFA(ProductConstruction(dfa, randomDFA(rng, 5, alphabets, prefix="q"), "xor"))
+        strings = randomStrings(rng, alphabets + ["x"] * (t % 2), count=60, maxLength=100)
+        assert list(dfa.acceptMany(strings)) == [dfa.isAccepted(anInput) for anInput in strings]
+
+def test_compiled_matcher_matches_is_accepted():
+    rng = random.Random(23)
+    alphabets = list("abcdefghij")
+    for t in range(60):
+        dfa = randomDFA(rng, rng.randint(1, 12), alphabets)
+        # States that loop on most symbols are matched with regular expressions
+        for node in dfa.stateList.values():
+            if rng.random() < 0.6:
+                for symbol in alphabets:
+                    if rng.random() < 0.9:
+                        node.rules[symbol] = node.name
+        strings = randomStrings(rng, alphabets + ["z"] * (t % 2), count=60, maxLength=80)
+
+        accepts = compileMatcher(dfa)
+        namespace = {}
+        exec(dfa.toPython(name="generated"), namespace)
+        for anInput in strings:
+            assert accepts(anInput) == namespace["generated"](anInput) == dfa.isAccepted(anInput)
+
+def test_parallel_acceptance_matches_is_accepted(tmp_path):
+    pytest.importorskip("numpy")
+    rng = random.Random(15)
+    for t in range(20):
+        alphabets = ["0", "1", "2"][:rng.randint(1, 3)]
+        dfa = minimizeDFA(randomDFA(rng, rng.randint(1, 15), alphabets))
+        strings = randomStrings(rng, alphabets + ["x"] * (t % 4 == 0), count=3, maxLength=3000)
+        for anInput in strings:
+            expected = dfa.isAccepted(anInput)
+            assert dfa.isAcceptedParallel(anInput.encode("utf-8"), workers=1, chunkSize=rng.randint(1, 700)) == expected
+        path = tmp_path / "input.txt"
+        path.write_text(strings[0])
+        assert dfa.isAcceptedParallel(str(path), workers=2 if t == 0 else 1, chunkSize=256) == dfa.isAccepted(strings[0])
+
+def test_damaged_binary_file_is_rejected(tmp_path):
+    rng = random.Random(12)
+    path = str(tmp_path / "dfa.dfab")
+    randomDFA(rng, 20, ["0", "1"]).saveBinary(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    layout = main._BINARY_HEADER.unpack_from(data, 0)[5:]
+
+    damages = [
+        (layout[8], struct.pack("<i", 20)),  # a transition past the last state
+        (layout[8] + 4, struct.pack("<i", -1)),  # a negative transition
+        (24, struct.pack("<Q", 20)),  # the start state
+        (layout[2] + 8, struct.pack("<Q", layout[5] + 1)),  # a name past the names section
+        (layout[2] + 16, struct.pack("<Q", 0)),  # name offsets going back
+        (40, struct.pack("<Q", len(data))),  # the symbols section past the end
+    ]
+    for offset, value in damages:
+        damaged = str(tmp_path / "damaged.dfab")
+        with open(damaged, "wb") as f:
+            f.write(data[:offset] + value + data[offset + len(value):])
+        with pytest.raises(ValueError, match="corrupt"):
+            parseDFA(damaged)
+
+def test_truncated_or_fuzzed_binary_file_raises_value_error(tmp_path):
+    rng = random.Random(13)
+    path = str(tmp_path / "dfa.dfab")
+    dfa = randomDFA(rng, 12, ["0", "1", "2"])
+    dfa = DFA(dfa.alphabets, dfa.start, dfa.stateList, ranges=[((ord(a), ord(a)),) for a in dfa.alphabets])
+    dfa.saveBinary(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    damaged = str(tmp_path / "damaged.dfab")
+    for length in range(len(data)):
+        with open(damaged, "wb") as f:
+            f.write(data[:length])
+        with pytest.raises(ValueError):
+            parseDFA(damaged)
+
+    # Damage anywhere either raises ValueError or leaves a usable DFA
+    strings = randomStrings(rng, dfa.alphabets, count=20)
+    for _ in range(500):
+        raw = bytearray(data)
+        for _ in range(rng.randint(1, 4)):
+            raw[rng.randrange(len(raw))] = rng.randrange(256)
+        with open(damaged, "wb") as f:
+            f.write(raw)
+        try:
+            loaded = parseDFA(damaged)
+        except ValueError:
+            continue
+        loaded.acceptMany(strings)
+        assert all(loaded.stateList[name].rules is not None for name in loaded.stateList)
+
+def test_node_edits_only_invalidate_their_own_dfa():
+    rng = random.Random(1)
+    dfa = randomDFA(rng, 30, ["0", "1"])
+    other = randomDFA(rng, 3, ["0", "1"])
+    table = dfa.compile()
+    otherTable = other.compile()
+
+    # Edits to another DFA, or to a Node of no DFA, keep the table
+    other.stateList["s0"].acceptState = not other.stateList["s0"].acceptState
+    other.stateList["s1"].rules["0"] = "s2"
+    Node("loose", False, {"0": "loose"}).acceptState = True
+    assert dfa.compile() is table
+    assert other.compile() is not otherTable
+
+    # A table-backed DFA keeps its table when its Nodes are only looked at
+    product = minimizeDFA(ProductConstruction(dfa, other, "xor"))
+    productTable = product.compile()
+    start = product.start
+    assert all(product.stateList[name] is not None for name in product.stateList)
+    assert product.compile() is productTable
+
+    # Edits in place are seen by the DFA holding the Node
+    accepted = product.isAccepted("")
+    start.acceptState = not start.acceptState
+    assert product.compile() is not productTable
+    assert product.isAccepted("") != accepted
+    node = dfa.stateList["s0"]
+    node.rules["1"] = "s0"
+    node.rules["0"] = "s0"
+    node.acceptState = True
+    assert dfa.compile() is not table
+    assert dfa.isAccepted("0101")
+
+def test_check_operation_accepts_only_buildable_products():
+    assert checkOperation("atleast", 3, 0, True) == []
+    assert checkOperation("atleast", 3, 3) == []
+    assert checkOperation("complement", 1) == []
+    assert checkOperation(None, 1) == []
+    for operation, numOperands, m, full in [
+        ("nand", 2, None, False),
+        (None, 2, None, False),
+        ("complement", 2, None, False),
+        ("union", 1, None, False),
+        ("atleast", 3, 4, False),
+        ("atleast", 3, -1, False),
+        ("atleast", 3, True, False),
+        ("atleast", 3, "2", False),
+        ("atleast", 3, 1.0, False),
+        ("union", 2, None, "yes"),
+        ("union", 2, None, 1),
+    ]:
+        assert len(checkOperation(operation, numOperands, m, full)) == 1
@@ -14,6 +14,8 @@ After product construction (union, intersection)
     - after minimization
 
 To run: python test_minimization.py
+
+For timings across DFA sizes, see benchmark.py.
 """
 
 def main():
@@ -184,34 +186,34 @@ def main():
 
     #before minimization
     total_time_before_minimization_union = 0
-    for dfa in union_list:
+    for dfa, tests in zip(union_list, union_tests):
         start_time = time.perf_counter()
-        for test in union_tests:
+        for test in tests:
             result = dfa.isAccepted(test)
         end_time = time.perf_counter()
         total_time_before_minimization_union += (end_time - start_time)
 
     total_time_before_minimization_intersection = 0
-    for dfa in intersection_list:
+    for dfa, tests in zip(intersection_list, intersection_tests):
         start_time = time.perf_counter()
-        for test in intersection_tests:
+        for test in tests:
             result = dfa.isAccepted(test)
         end_time = time.perf_counter()
         total_time_before_minimization_intersection += (end_time - start_time)
 
     #after minimization
     total_time_after_minimization_union = 0
-    for dfa in minimized_union_list:
+    for dfa, tests in zip(minimized_union_list, union_tests):
         start_time = time.perf_counter()
-        for test in union_tests:
+        for test in tests:
             result = dfa.isAccepted(test)
         end_time = time.perf_counter()
         total_time_after_minimization_union += (end_time - start_time)
 
     total_time_after_minimization_intersection = 0
-    for dfa in minimized_intersection_list:
+    for dfa, tests in zip(minimized_intersection_list, intersection_tests):
         start_time = time.perf_counter()
-        for test in intersection_tests:
+        for test in tests:
             result = dfa.isAccepted(test)
         end_time = time.perf_counter()
         total_time_after_minimization_intersection += (end_time - start_time)
@@ -222,8 +224,8 @@ def main():
     percent_change_union = round(((total_time_after_minimization_union-total_time_before_minimization_union)/total_time_before_minimization_union) * 100,2)
     percent_change_intersection = round(((total_time_after_minimization_intersection-total_time_before_minimization_intersection)/total_time_before_minimization_intersection) * 100,2)
 
-    print(f"Total time before minimization on union: {round(total_time_before_minimization_union*100000,2)} microseconds \nTotal time after minimization on union: {round(total_time_after_minimization_union*100000,2)} microseconds\nPercent change = {percent_change_union}%. \n")
-    print(f"Total time before minimization on intersection: {round(total_time_before_minimization_intersection*100000,2)} microseconds \nTotal time after minimization on intersection: {round(total_time_after_minimization_intersection*100000,2)} microseconds\nPercent change = {percent_change_intersection}%. \n")
+    print(f"Total time before minimization on union: {round(total_time_before_minimization_union*1e6,2)} microseconds \nTotal time after minimization on union: {round(total_time_after_minimization_union*1e6,2)} microseconds\nPercent change = {percent_change_union}%. \n")
+    print(f"Total time before minimization on intersection: {round(total_time_before_minimization_intersection*1e6,2)} microseconds \nTotal time after minimization on intersection: {round(total_time_after_minimization_intersection*1e6,2)} microseconds\nPercent change = {percent_change_intersection}%. \n")
     
     
             
@@ -1,26 +1,16 @@
-import json
 import argparse
-import os
+from main import parseDFA, ProductConstruction, minimizeDFA
 
 def load_dfa(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    return parseDFA(file_path)
     
 def compute_xor_dfa(union_dfa, intersection_dfa):
-    union_accepts = set(union_dfa['acceptStates'])
-    intersection_accepts = set(intersection_dfa['acceptStates'])
-    xor_accepts = list(union_accepts - intersection_accepts)
-    
-    xor_dfa = union_dfa.copy()
-    xor_dfa['acceptStates'] = xor_accepts
-    
-    return xor_dfa
+    # A string is in the XOR exactly when it is in the union but not in the intersection.
+    # Building the difference as a product works for any two DFAs, whatever their state names.
+    return minimizeDFA(ProductConstruction(union_dfa, intersection_dfa, 'difference'))
 
 def save_dfa(dfa):
-    os.makedirs("dfa", exist_ok=True)
-    output_path = os.path.join("dfa", "dfa_xor.json")
-    with open(output_path, 'w') as f:
-        json.dump(dfa, f, indent=4)
+    dfa.createJson("xor")
     print(f"XOR DFA saved!")
     
 def main():